@@ -0,0 +1,149 @@
+"""Benchmark the entity update path of a grid reward frame.
+
+Run from the repository root:
+
+    python -m benchmarks.frame_parsing [flex_devices]
+
+The sensor and binary sensor platforms set up their real entities, with
+the trackers they read stubbed out and state writes counted instead of
+sent to a state machine. Each frame then takes the dispatcher's path: it
+is parsed once into a GridRewardSnapshot, every grid reward entity is
+updated with the snapshot, and every flex device entity with its own
+device. The frames alternate between two states, so half of them change
+the entities and half are skipped as unchanged.
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import timeit
+import tracemalloc
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from custom_components.tibber_grid_reward import binary_sensor, sensor
+from custom_components.tibber_grid_reward.const import DOMAIN
+from custom_components.tibber_grid_reward.models import GridRewardSnapshot
+from custom_components.tibber_grid_reward.state_time import StateTimeTracker
+
+ENTRY_ID = "entry"
+
+
+def make_frame(flex_devices: int, state: str) -> dict:
+    """Return a gridRewardStatus frame with the given number of vehicles."""
+    return {
+        "__typename": "GridReward",
+        "homeId": "home",
+        "state": {"__typename": state, "reason": "peak"},
+        "rewardCurrency": "EUR",
+        "rewardCurrentMonth": 12.34,
+        "rewardAllTime": 567.89,
+        "flexDevices": [
+            {
+                "__typename": "GridRewardVehicle",
+                "kind": "vehicle",
+                "vehicleId": f"vehicle{index}",
+                "shortName": f"Car {index}",
+                "isPluggedIn": True,
+                "isSmartChargingEnabled": True,
+                "state": {"__typename": state, "kind": "vehicle"},
+            }
+            for index in range(flex_devices)
+        ],
+    }
+
+
+def setup_entities(flex_devices: int) -> dict:
+    """Set up the sensor and binary sensor entities of one entry."""
+    devices = [
+        {"id": f"vehicle{index}", "type": "vehicle", "name": f"Car {index}"}
+        for index in range(flex_devices)
+    ]
+    histogram = MagicMock(version=0)
+    histogram.forecast.return_value = []
+    histogram.delivering_probability.return_value = 0.5
+    session_tracker = MagicMock(
+        last_session=None, current_session_reward=0.0, reward_rate=None
+    )
+    session_tracker.rollups.current.return_value = {}
+    entry_data = {
+        "api": None,
+        "public_api": None,
+        "flex_devices": devices,
+        "daily_tracker": SimpleNamespace(daily_reward=1.234),
+        "session_tracker": session_tracker,
+        "state_tracker": StateTimeTracker(MagicMock(data={})),
+        "histogram": histogram,
+        "planner": None,
+        "grid_reward_devices": [],
+        "price_devices": [],
+        "plan_devices": [],
+        "flex_device_entities": {device["id"]: [] for device in devices},
+    }
+    hass = SimpleNamespace(data={DOMAIN: {ENTRY_ID: entry_data}})
+    entry = SimpleNamespace(entry_id=ENTRY_ID, data={"home_id": "home"})
+    entities = []
+    for platform in (sensor, binary_sensor):
+        asyncio.run(platform.async_setup_entry(hass, entry, entities.extend))
+    for entity in entities:
+        entity.writes = 0
+        entity.async_write_ha_state = _count_write(entity)
+    return entry_data
+
+
+def _count_write(entity):
+    """Return a state write that only counts."""
+
+    def async_write_ha_state() -> None:
+        entity.writes += 1
+
+    return async_write_ha_state
+
+
+def update_entities(entry_data: dict, frame: dict) -> None:
+    """Update the entities with a frame, the way the dispatcher does."""
+    snapshot = GridRewardSnapshot.from_payload(frame)
+    for entity in entry_data["grid_reward_devices"]:
+        entity.update_data(snapshot)
+    for device in snapshot.flex_devices:
+        for entity in entry_data["flex_device_entities"].get(device.id, ()):
+            entity.update_data(device)
+
+
+def measure(entry_data: dict, frames: list[dict], number: int) -> tuple[float, int]:
+    """Return the microseconds and peak bytes allocated per frame."""
+
+    def replay() -> None:
+        for frame in frames:
+            update_entities(entry_data, frame)
+
+    seconds = min(timeit.repeat(replay, number=number, repeat=5))
+    tracemalloc.start()
+    replay()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds / number / len(frames) * 1e6, peak
+
+
+def main(flex_devices: int = 10) -> None:
+    """Print the cost per frame of the entity update path."""
+    entry_data = setup_entities(flex_devices)
+    frames = [
+        make_frame(flex_devices, state)
+        for state in ("GridRewardAvailable", "GridRewardDelivering")
+    ]
+    micros, peak = measure(entry_data, frames, 500)
+    entities = entry_data["grid_reward_devices"] + [
+        entity
+        for device_entities in entry_data["flex_device_entities"].values()
+        for entity in device_entities
+    ]
+    print(
+        f"{len(entities)} entities: {micros:8.2f} us/frame, {peak:6d} B peak, "
+        f"{sum(entity.writes for entity in entities)} writes, "
+        f"{sum(entity.skipped_writes for entity in entities)} skipped"
+    )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,161 @@
+"""Run the integration in a Home Assistant test instance for the benchmarks.
+
+The instance keeps its configuration, and so its .storage directory, in a
+temporary directory, and the integration connects to the fake Tibber server
+of the tests. Probes wrap the TibberAPI callbacks, to wait for a frame to
+be handled and to time it.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+from contextlib import AsyncExitStack
+from time import perf_counter
+from typing import Any, Self
+from unittest.mock import patch
+
+# The core is imported before the loader, which cannot be imported first.
+from homeassistant import core, loader
+from homeassistant.helpers.storage import STORAGE_DIR
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.tibber_grid_reward.client import TibberAPI
+from custom_components.tibber_grid_reward.const import DOMAIN
+from tests.fake_tibber import HOME_ID, PASSWORD, USERNAME, FakeTibber
+
+
+def vehicle_id(index: int) -> str:
+    """Return the id of a vehicle."""
+    return f"vehicle{index}"
+
+
+class Probe:
+    """Record when the wrapped callbacks of TibberAPI return."""
+
+    def __init__(self):
+        """Initialize the probe."""
+        self.done: list[float] = []
+        self._event = asyncio.Event()
+
+    def wrap(self, target):
+        """Return a callback that records its end time."""
+
+        def timed(payload):
+            target(payload)
+            self.done.append(perf_counter())
+            self._event.set()
+
+        return timed
+
+    async def wait_for(self, count: int, timeout: float = 60) -> None:
+        """Wait until the callbacks returned a number of times."""
+        async with asyncio.timeout(timeout):
+            while len(self.done) < count:
+                self._event.clear()
+                await self._event.wait()
+
+
+class Harness:
+    """A Home Assistant test instance with the fake Tibber server."""
+
+    def __init__(self, vehicles: int, options: dict[str, Any] | None = None):
+        """Initialize the harness."""
+        self.vehicles = vehicles
+        self.options = options or {}
+        self.fake = FakeTibber()
+        self.grid_reward = Probe()
+        self.vehicle_state = Probe()
+        self.config_dir = ""
+        self.hass: core.HomeAssistant | None = None
+        self.entry: MockConfigEntry | None = None
+        self._stack = AsyncExitStack()
+
+    async def __aenter__(self) -> Self:
+        """Start the fake server and Home Assistant."""
+        stack = self._stack
+        self.config_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        await stack.enter_async_context(self.fake)
+        http_client = await stack.enter_async_context(self.fake.http_client())
+        self.hass = await stack.enter_async_context(async_test_home_assistant())
+        # The keyword that sets the directory differs between releases of
+        # pytest-homeassistant-custom-component, the attribute does not.
+        self.hass.config.config_dir = self.config_dir
+        self.hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+
+        register_grid_reward_callback = TibberAPI.register_grid_reward_callback
+        register_vehicle_callback = TibberAPI.register_vehicle_callback
+
+        def register_timed_grid_reward_callback(api, target):
+            register_grid_reward_callback(api, self.grid_reward.wrap(target))
+
+        def register_timed_vehicle_callback(api, vehicle_id, target):
+            register_vehicle_callback(api, vehicle_id, self.vehicle_state.wrap(target))
+
+        stack.enter_context(self.fake.patch_client())
+        stack.enter_context(
+            patch(
+                "custom_components.tibber_grid_reward.get_async_client",
+                return_value=http_client,
+            )
+        )
+        stack.enter_context(
+            patch.object(
+                TibberAPI,
+                "register_grid_reward_callback",
+                register_timed_grid_reward_callback,
+            )
+        )
+        stack.enter_context(
+            patch.object(
+                TibberAPI, "register_vehicle_callback", register_timed_vehicle_callback
+            )
+        )
+        stack.push_async_callback(self.async_unload_entry)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Unload the entry, and stop Home Assistant and the fake server."""
+        await self._stack.aclose()
+
+    async def async_setup_entry(self) -> None:
+        """Set up the integration and wait for the first frames."""
+        self.entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                "username": USERNAME,
+                "password": PASSWORD,
+                "home_id": HOME_ID,
+                "flex_devices": [
+                    {"id": vehicle_id(index), "type": "vehicle", "name": f"Car {index}"}
+                    for index in range(self.vehicles)
+                ],
+            },
+            options=self.options,
+        )
+        self.entry.add_to_hass(self.hass)
+        await self.hass.config_entries.async_setup(self.entry.entry_id)
+        if self.fake.grid_reward is not None:
+            await self.grid_reward.wait_for(1)
+        await self.vehicle_state.wait_for(self.vehicles)
+        await self.hass.async_block_till_done()
+
+    async def async_unload_entry(self) -> None:
+        """Unload the integration, if it was set up."""
+        if self.entry is not None:
+            await self.hass.config_entries.async_unload(self.entry.entry_id)
+            await self.hass.async_block_till_done()
+            self.entry = None
+
+    def storage_sizes(self) -> dict[str, int]:
+        """Return the size of each file in the .storage directory."""
+        storage_dir = os.path.join(self.config_dir, STORAGE_DIR)
+        if not os.path.isdir(storage_dir):
+            return {}
+        return {
+            name: os.path.getsize(os.path.join(storage_dir, name))
+            for name in sorted(os.listdir(storage_dir))
+        }
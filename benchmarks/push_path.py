@@ -0,0 +1,193 @@
+"""Benchmark the push path from a websocket frame to the entity states.
+
+Run from the repository root, with the test requirements installed:
+
+    python -m benchmarks.push_path [--devices 1 10 100] [--frames 500] [--output FILE]
+
+Each scale sets up the integration in a Home Assistant test instance with
+that many vehicles, connected to the fake Tibber server of the tests. A
+frame is timed from the moment the server sends it until the callback has
+returned: the frame has then been received by TibberAPI, parsed and passed
+through the trackers, and every affected entity has written its state.
+
+Latency is measured with one frame in flight, and throughput with all frames
+sent at once. Memory is what tracemalloc sees still allocated by the
+integration once the entry is set up and the first frames are handled; the
+per vehicle figure is the growth over the smallest scale. The results are
+printed as JSON, to be compared between releases.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import tracemalloc
+from time import perf_counter
+from typing import Any
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.core import callback
+
+from benchmarks.harness import Harness, Probe, vehicle_id
+from tests.fake_tibber import HOME_ID
+
+DEPARTURE_TIME_MONDAY = "online.vehicle.smartCharging.departureTimes.monday"
+DEPARTURE_TIMES = ("07:00", "08:00")
+
+# Memory is attributed to the integration when any frame of the allocating
+# call stack is in it, which leaves out the fake server's side of the sockets.
+INTEGRATION_FILES = "*/custom_components/tibber_grid_reward/*"
+TRACEBACK_LIMIT = 64
+
+
+def make_frame(vehicles: int, seq: int) -> dict[str, Any]:
+    """Return a gridRewardStatus frame that differs from the previous one.
+
+    The reward grows with every frame, and the state changes every tenth
+    frame, so the throttled sensors also see transitions.
+    """
+    state = "GridRewardDelivering" if seq // 10 % 2 else "GridRewardAvailable"
+    return {
+        "__typename": "GridReward",
+        "homeId": HOME_ID,
+        "state": {"__typename": state, "reason": "peak"},
+        "rewardCurrency": "EUR",
+        "rewardCurrentMonth": seq / 100,
+        "rewardAllTime": 500 + seq / 100,
+        "flexDevices": [
+            {
+                "__typename": "GridRewardVehicle",
+                "kind": "vehicle",
+                "vehicleId": vehicle_id(index),
+                "shortName": f"Car {index}",
+                "isPluggedIn": bool((seq + index) // 50 % 2),
+                "isSmartChargingEnabled": True,
+                "state": {"__typename": state},
+            }
+            for index in range(vehicles)
+        ],
+    }
+
+
+async def timed_frames(probe: Probe, send, frames: int) -> dict[str, float]:
+    """Measure the latency of frames sent one at a time, and the throughput
+    of frames sent back to back."""
+    latencies = []
+    for seq in range(1, frames + 1):
+        count = len(probe.done) + 1
+        start = perf_counter()
+        await send(seq)
+        await probe.wait_for(count)
+        latencies.append(probe.done[-1] - start)
+
+    count = len(probe.done) + frames
+    start = perf_counter()
+    for seq in range(frames + 1, 2 * frames + 1):
+        await send(seq)
+    await probe.wait_for(count)
+    elapsed = probe.done[-1] - start
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "frames_per_second": round(frames / elapsed, 1),
+        "latency_p50_us": round(percentiles[49] * 1e6, 1),
+        "latency_p99_us": round(percentiles[98] * 1e6, 1),
+    }
+
+
+async def run_scale(vehicles: int, frames: int) -> dict[str, Any]:
+    """Benchmark the push path with a number of vehicles."""
+    writes = 0
+
+    async with Harness(vehicles) as harness:
+        hass = harness.hass
+        fake = harness.fake
+        fake.grid_reward = make_frame(vehicles, 0)
+
+        @callback
+        def count_write(event):
+            nonlocal writes
+            writes += 1
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, count_write)
+
+        tracemalloc.start(TRACEBACK_LIMIT)
+        await harness.async_setup_entry()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(True, INTEGRATION_FILES, all_frames=True)]
+        )
+        tracemalloc.stop()
+        memory = sum(stat.size for stat in snapshot.statistics("filename"))
+
+        async def send_grid_reward(seq):
+            await fake.push_grid_reward(make_frame(vehicles, seq))
+
+        async def send_vehicle_state(seq):
+            vehicle = vehicle_id(seq % vehicles)
+            fake.vehicle_settings[vehicle] = {
+                DEPARTURE_TIME_MONDAY: DEPARTURE_TIMES[seq // vehicles % 2]
+            }
+            await fake.push_vehicle_state(vehicle)
+
+        writes = 0
+        grid_reward = await timed_frames(harness.grid_reward, send_grid_reward, frames)
+        await hass.async_block_till_done()
+        grid_reward["writes_per_frame"] = round(writes / (2 * frames), 1)
+
+        writes = 0
+        vehicle_state = await timed_frames(
+            harness.vehicle_state, send_vehicle_state, frames
+        )
+        await hass.async_block_till_done()
+        vehicle_state["writes_per_frame"] = round(writes / (2 * frames), 1)
+
+    return {
+        "vehicles": vehicles,
+        "grid_reward": grid_reward,
+        "vehicle_state": vehicle_state,
+        "memory_bytes": memory,
+    }
+
+
+async def run(scales: list[int], frames: int) -> dict[str, Any]:
+    """Benchmark all scales, after a warm up that loads the platforms."""
+    await run_scale(scales[0], 10)
+    results = [await run_scale(vehicles, frames) for vehicles in scales]
+    base = results[0]
+    for result in results[1:]:
+        result["memory_per_vehicle_bytes"] = round(
+            (result["memory_bytes"] - base["memory_bytes"])
+            / (result["vehicles"] - base["vehicles"])
+        )
+    return {
+        "benchmark": "push_path",
+        "python": platform.python_version(),
+        "homeassistant": HA_VERSION,
+        "frames": frames,
+        "results": results,
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print or write the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--output", help="write the results to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    report = json.dumps(asyncio.run(run(sorted(args.devices), args.frames)), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
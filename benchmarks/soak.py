@@ -0,0 +1,356 @@
+"""Soak the integration with a year of frames on a simulated clock.
+
+Run from the repository root, with the test requirements installed:
+
+    python -m benchmarks.soak [--days 365] [--step 15] [--vehicles 1] [--output FILE]
+
+The integration runs in a Home Assistant test instance against the fake
+Tibber server. One clock drives the wall time, the event loop and the time
+trackers of Home Assistant, so a year of frames, hourly statistics and
+availability ticks, midnight and month rollovers, session compaction and
+delayed store writes passes in minutes. A gridRewardStatus frame is sent
+every step, with a grid reward session on every third evening, the
+departure times change every morning, and the server drops all connections
+once a week.
+
+At the end of every simulated month the memory held by the process, the
+size of every file in .storage and the number of asyncio tasks are
+recorded. The run fails when, after the warm up, memory grows faster than
+MEMORY_GROWTH_PER_MONTH, when storage grows faster than
+STORAGE_GROWTH_PER_MONTH once sessions older than the retention are
+compacted away, or when tasks are left behind by the reconnects.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import math
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.helpers import event as event_helper
+from homeassistant.util import dt as dt_util
+from websockets.asyncio.connection import Connection
+
+from benchmarks.harness import Harness, vehicle_id
+from custom_components.tibber_grid_reward.charging_planner import (
+    DEPARTURE_TIME_KEY,
+    WEEKDAYS,
+)
+from tests.fake_tibber import GRID_REWARD, HOME_ID, VEHICLE_STATE
+
+RETENTION_DAYS = 90
+WARMUP_MONTHS = 1
+REWARD_PER_STEP = 0.05
+
+# The declared bounds of the soak.
+MEMORY_GROWTH_PER_MONTH = 256 * 1024
+STORAGE_GROWTH_PER_MONTH = 16 * 1024
+# Tasks that may be running at the end of a month, such as a store write.
+TRANSIENT_TASKS = 4
+
+RECONNECT_SECONDS = 120
+
+# Timers run this late, as on a real clock. Home Assistant schedules a time
+# tracker with rounding errors of a fraction of a microsecond, and a tracker
+# that finds itself run early reschedules itself.
+TIMER_SLACK = 1e-6
+
+# Allocations of the harness itself, such as the tokens issued by the fake
+# server, do not count as memory held by the integration.
+HARNESS_FILES = ("*/benchmarks/*", "*/tests/fake_tibber.py", tracemalloc.__file__)
+
+
+async def _no_keepalive(self) -> None:
+    """Skip the websocket pings, whose round trips would time out when the
+    simulated clock jumps ahead of them."""
+
+
+class SimulatedClock:
+    """One simulated time for the wall clock, the event loop and the time
+    trackers of Home Assistant."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, start: datetime):
+        """Initialize the clock at a start time."""
+        self._loop = loop
+        # The event loop runs on the timestamp too, so converting between
+        # both times adds no rounding. Timers scheduled before the clock
+        # started fall due at once.
+        self.timestamp = start.timestamp()
+
+    def time(self) -> float:
+        """Return the simulated POSIX timestamp."""
+        return self.timestamp
+
+    def loop_time(self) -> float:
+        """Return the simulated time of the event loop."""
+        return self.timestamp
+
+    def utcnow(self) -> datetime:
+        """Return the simulated time in UTC."""
+        return datetime.fromtimestamp(self.timestamp, UTC)
+
+    def now(self, time_zone=None) -> datetime:
+        """Return the simulated time in a time zone, the local one by default."""
+        return datetime.fromtimestamp(self.timestamp, time_zone or dt_util.DEFAULT_TIME_ZONE)
+
+    @contextmanager
+    def patch(self):
+        """Let the clock drive time for the duration of the block."""
+        with ExitStack() as stack:
+            stack.enter_context(patch.object(self._loop, "time", self.loop_time))
+            stack.enter_context(patch("time.time", self.time))
+            stack.enter_context(patch.object(dt_util, "utcnow", self.utcnow))
+            stack.enter_context(patch.object(dt_util, "now", self.now))
+            stack.enter_context(
+                patch.object(event_helper, "time_tracker_utcnow", self.utcnow)
+            )
+            stack.enter_context(
+                patch.object(event_helper, "time_tracker_timestamp", self.time)
+            )
+            stack.enter_context(patch.object(Connection, "keepalive", _no_keepalive))
+            yield
+
+    async def advance_to(self, moment: datetime, hass) -> None:
+        """Move the clock to a moment, running every timer that falls due on
+        the way at its own time."""
+        target = moment.timestamp()
+        while (due := self._next_timer()) is not None and due <= target:
+            self.timestamp = max(self.timestamp, due + TIMER_SLACK)
+            await self._settle(hass)
+        self.timestamp = target
+        await self._settle(hass)
+
+    def _next_timer(self) -> float | None:
+        """Return the timestamp of the next scheduled timer, if any."""
+        scheduled = [
+            handle.when() for handle in self._loop._scheduled if not handle.cancelled()
+        ]
+        return min(scheduled) if scheduled else None
+
+    @staticmethod
+    async def _settle(hass) -> None:
+        """Run the timers that are due and the tasks they start."""
+        for _ in range(3):
+            await asyncio.sleep(0)
+        await hass.async_block_till_done()
+
+
+def make_frame(state: str, reward_current_month: float, reward_all_time: float, vehicles: int):
+    """Return a gridRewardStatus frame."""
+    return {
+        "__typename": "GridReward",
+        "homeId": HOME_ID,
+        "state": {"__typename": state, "reason": "peak"},
+        "rewardCurrency": "EUR",
+        "rewardCurrentMonth": round(reward_current_month, 2),
+        "rewardAllTime": round(reward_all_time, 2),
+        "flexDevices": [
+            {
+                "__typename": "GridRewardVehicle",
+                "vehicleId": vehicle_id(index),
+                "isPluggedIn": state == "GridRewardDelivering",
+                "state": {"__typename": state},
+            }
+            for index in range(vehicles)
+        ],
+    }
+
+
+def held_memory() -> tuple[int, tracemalloc.Snapshot]:
+    """Return the memory held outside the harness, and its snapshot."""
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, pattern) for pattern in HARNESS_FILES]
+    )
+    return sum(stat.size for stat in snapshot.statistics("filename")), snapshot
+
+
+def growth_per_month(samples: list[dict[str, Any]], key: str, first: int) -> float | None:
+    """Return the growth of a sample value per month, from a month on."""
+    if len(samples) - 1 <= first:
+        return None
+    return (samples[-1][key] - samples[first][key]) / (len(samples) - 1 - first)
+
+
+async def real_sleep(seconds: float) -> None:
+    """Wait in real time, which the simulated clock does not stop."""
+    await asyncio.get_running_loop().run_in_executor(None, time.sleep, seconds)
+
+
+async def reconnect(harness: Harness, clock: SimulatedClock, vehicles: int) -> None:
+    """Drop all connections, and wait until the client has subscribed again."""
+    fake = harness.fake
+    connections = fake.connections
+    grid_frames = len(harness.grid_reward.done)
+    vehicle_frames = len(harness.vehicle_state.done)
+
+    await fake.disconnect()
+    # The client waits in simulated time before it reconnects, and connects
+    # in real time.
+    for _ in range(RECONNECT_SECONDS):
+        await clock.advance_to(clock.utcnow() + timedelta(seconds=1), harness.hass)
+        if (
+            fake.connections >= connections + 1 + vehicles
+            and len(fake.subscriptions(GRID_REWARD)) == 1
+            and len(fake.subscriptions(VEHICLE_STATE)) == vehicles
+        ):
+            break
+        await real_sleep(0.01)
+    else:
+        raise RuntimeError("The client did not reconnect.")
+    await harness.grid_reward.wait_for(grid_frames + 1)
+    await harness.vehicle_state.wait_for(vehicle_frames + vehicles)
+
+
+async def soak(days: int, step: timedelta, vehicles: int) -> dict[str, Any]:
+    """Run the soak and return its samples and the violated bounds."""
+    samples: list[dict[str, Any]] = []
+    async with Harness(vehicles, {"session_retention_days": RETENTION_DAYS}) as harness:
+        hass = harness.hass
+        fake = harness.fake
+        start = dt_util.start_of_local_day(date(2025, 1, 1))
+        clock = SimulatedClock(hass.loop, start)
+        reward_current_month = 0.0
+        reward_all_time = 0.0
+        fake.grid_reward = make_frame(
+            "GridRewardAvailable", reward_current_month, reward_all_time, vehicles
+        )
+
+        with clock.patch():
+            await harness.async_setup_entry()
+            tracemalloc.start()
+            first_snapshot = last_snapshot = None
+            reconnects = 0
+            month = start.month
+
+            moment = start
+            end = start + timedelta(days=days)
+            while moment < end:
+                moment = dt_util.as_local(dt_util.as_utc(moment) + step)
+                await clock.advance_to(moment, hass)
+
+                if moment.month != month:
+                    month = moment.month
+                    reward_current_month = 0.0
+                    memory, snapshot = held_memory()
+                    samples.append(
+                        {
+                            "month": f"{moment.year}-{moment.month:02d}",
+                            "memory_bytes": memory,
+                            "storage_bytes": sum(harness.storage_sizes().values()),
+                            "storage": harness.storage_sizes(),
+                            "tasks": len(asyncio.all_tasks()),
+                        }
+                    )
+                    if len(samples) == WARMUP_MONTHS:
+                        first_snapshot = snapshot
+                    last_snapshot = snapshot
+
+                delivering = (moment.date() - start.date()).days % 3 == 0 and (
+                    17 <= moment.hour < 19
+                )
+                if delivering:
+                    reward_current_month += REWARD_PER_STEP
+                    reward_all_time += REWARD_PER_STEP
+                frames = len(harness.grid_reward.done)
+                await fake.push_grid_reward(
+                    make_frame(
+                        "GridRewardDelivering" if delivering else "GridRewardAvailable",
+                        reward_current_month,
+                        reward_all_time,
+                        vehicles,
+                    )
+                )
+                await harness.grid_reward.wait_for(frames + 1)
+
+                if moment.hour == 6 and moment.minute == 0:
+                    frames = len(harness.vehicle_state.done)
+                    departure = "07:00" if moment.toordinal() % 2 else "07:30"
+                    for index in range(vehicles):
+                        fake.vehicle_settings[vehicle_id(index)] = {
+                            DEPARTURE_TIME_KEY + WEEKDAYS[moment.weekday()]: departure
+                        }
+                        await fake.push_vehicle_state(vehicle_id(index))
+                    await harness.vehicle_state.wait_for(frames + vehicles)
+
+                if moment.weekday() == 6 and moment.hour == 3 and moment.minute == 0:
+                    await reconnect(harness, clock, vehicles)
+                    reconnects += 1
+
+            tracemalloc.stop()
+            await harness.async_unload_entry()
+
+    retention_months = math.ceil(RETENTION_DAYS / 30) + 1
+    memory_growth = growth_per_month(samples, "memory_bytes", WARMUP_MONTHS - 1)
+    storage_growth = growth_per_month(samples, "storage_bytes", retention_months)
+    violations = []
+    if memory_growth is not None and memory_growth > MEMORY_GROWTH_PER_MONTH:
+        violations.append(
+            f"memory grows {memory_growth:.0f} B/month, over {MEMORY_GROWTH_PER_MONTH}"
+        )
+    if storage_growth is not None and storage_growth > STORAGE_GROWTH_PER_MONTH:
+        violations.append(
+            f"storage grows {storage_growth:.0f} B/month, over {STORAGE_GROWTH_PER_MONTH}"
+        )
+    if len(samples) > WARMUP_MONTHS:
+        leaked = samples[-1]["tasks"] - samples[WARMUP_MONTHS - 1]["tasks"]
+        if leaked > TRANSIENT_TASKS:
+            violations.append(f"{leaked} tasks left behind by reconnects")
+
+    top_growth = []
+    if first_snapshot is not None and last_snapshot is not first_snapshot:
+        top_growth = [
+            str(stat) for stat in last_snapshot.compare_to(first_snapshot, "lineno")[:10]
+        ]
+    return {
+        "benchmark": "soak",
+        "days": days,
+        "step_minutes": step.total_seconds() / 60,
+        "vehicles": vehicles,
+        "frames": fake.frames_sent,
+        "reconnects": reconnects,
+        "bounds": {
+            "memory_growth_per_month_bytes": MEMORY_GROWTH_PER_MONTH,
+            "storage_growth_per_month_bytes": STORAGE_GROWTH_PER_MONTH,
+        },
+        "memory_growth_per_month_bytes": memory_growth,
+        "storage_growth_per_month_bytes": storage_growth,
+        "samples": samples,
+        "top_growth": top_growth,
+        "violations": violations,
+    }
+
+
+def main() -> None:
+    """Run the soak, print or write its report, and fail on violated bounds."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--step", type=int, default=15, help="minutes between frames")
+    parser.add_argument("--vehicles", type=int, default=1)
+    parser.add_argument("--output", help="write the report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(soak(args.days, timedelta(minutes=args.step), args.vehicles))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    for violation in report["violations"]:
+        print(f"FAIL: {violation}", file=sys.stderr)
+    sys.exit(1 if report["violations"] else 0)
+
+
+if __name__ == "__main__":
+    main()
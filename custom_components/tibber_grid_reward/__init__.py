@@ -1,21 +1,58 @@
 """The Tibber Grid Reward integration."""
+from datetime import timedelta
 
-from homeassistant.config_entries import ConfigEntry, ConfigEntryAuthFailed
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.httpx_client import get_async_client
-from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
 
+from .availability_forecast import AvailabilityHistogram
+from .backfill import STORAGE_KEY as BACKFILL_STORAGE_KEY, RewardBackfill
+from .charging_planner import ChargingPlanner
+from .cheapest_window import CheapestWindowFinder
 from .client import TibberAPI, TibberAuthError
-from .const import DOMAIN
+from .const import (
+    CHEAPEST_WINDOW_HOURS,
+    CONF_CHARGE_ENERGY,
+    CONF_CHARGER_POWER,
+    CONF_SAVE_INTERVAL,
+    CONF_SESSION_RETENTION,
+    DEFAULT_CHARGE_ENERGY,
+    DEFAULT_CHARGER_POWER,
+    DEFAULT_SAVE_INTERVAL,
+    DEFAULT_SESSION_RETENTION,
+    DOMAIN,
+)
 from .public_client import TibberPublicAPI
 import logging
 from .daily_tracker import DailyRewardTracker
-from .session_tracker import RewardSessionTracker
+from .events import TransitionEvents
+from .flight_recorder import FlightRecorder
+from .last_frames import LastFrames
+from .models import GridRewardSnapshot, VehicleState
+from .profiler import FrameProfiler
+from .reward_ledger import STORAGE_KEY as LEDGER_STORAGE_KEY, RewardLedger
+from .reward_statistics import RewardStatistics
+from .services import async_setup_services
+from .session_tracker import JOURNAL_KEY, RewardSessionTracker
+from .state_time import GRID_REWARD_SUBJECT, StateTimeTracker
+from .storage import async_remove_entry_storage, entry_storage_key
 
 PLATFORMS = ["sensor", "time", "binary_sensor"]
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the services of Tibber Grid Reward."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up Tibber Grid Reward from a config entry."""
@@ -29,50 +66,163 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         client,
     )
 
-    try:
-        await api.get_homes()  # Verify credentials
-    except TibberAuthError as e:
-        raise ConfigEntryAuthFailed from e
+    ledger = RewardLedger(
+        hass, entry.entry_id, entry.options.get(CONF_SAVE_INTERVAL, DEFAULT_SAVE_INTERVAL)
+    )
+    await ledger.async_load()
+
+    daily_tracker = DailyRewardTracker(ledger)
+    state_tracker = StateTimeTracker(ledger)
+    histogram = AvailabilityHistogram(hass, ledger)
+    histogram.async_setup()
+    flight_recorder = FlightRecorder()
+    events = TransitionEvents(hass, entry.entry_id, flight_recorder)
+    last_frames = LastFrames(ledger)
+    profiler = FrameProfiler(hass)
 
-    daily_tracker = DailyRewardTracker(hass)
-    await daily_tracker.async_setup()
+    @callback
+    def advance_state_time(_event):
+        """Account the current states up to the stop, so the downtime is not."""
+        state_tracker.advance()
 
-    session_tracker = RewardSessionTracker(hass)
-    await session_tracker.async_load()
+    entry.async_on_unload(
+        hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, advance_state_time)
+    )
+
+    session_tracker = RewardSessionTracker(
+        hass,
+        entry.entry_id,
+        ledger,
+        entry.options.get(CONF_SESSION_RETENTION, DEFAULT_SESSION_RETENTION),
+    )
+    await session_tracker.async_setup()
+
+    statistics = RewardStatistics(hass, entry.entry_id)
+    statistics.async_setup()
+
+    planner = ChargingPlanner(
+        entry.options.get(CONF_CHARGE_ENERGY, DEFAULT_CHARGE_ENERGY),
+        entry.options.get(CONF_CHARGER_POWER, DEFAULT_CHARGER_POWER),
+    )
+
+    def update_charging_plans():
+        """Update all planned charging sensors."""
+        for sensor in hass.data[DOMAIN][entry.entry_id]["plan_devices"]:
+            sensor.update_data()
 
     def update_grid_reward_sensors(data):
         """Update all grid reward sensors."""
-        _LOGGER.debug("Grid reward callback triggered with data: %s", data)
-        monthly_reward = data.get("rewardCurrentMonth")
-        daily_tracker.update_monthly_reward(monthly_reward)
-        
-        grid_reward_state = data.get("state", {}).get("__typename")
-        session_tracker.update_state(grid_reward_state, daily_tracker.daily_reward)
+        flight_recorder.record_frame("grid_reward", entry.entry_id, data)
+        snapshot = GridRewardSnapshot.from_payload(data)
+        last_frames.update_grid_reward(snapshot, data)
+        daily_tracker.update_monthly_reward(snapshot.reward_current_month)
+
+        old_state = state_tracker.state(GRID_REWARD_SUBJECT)
+        if old_state is not None and snapshot.state not in (None, old_state):
+            # Write the last values of the ending state, such as the final
+            # reward of a session, before the transition closes the session.
+            flush_grid_reward_entities(snapshot)
+        completed_session = session_tracker.update_state(snapshot.state)
+        transition = state_tracker.update(GRID_REWARD_SUBJECT, snapshot.state)
+        events.grid_reward_state(snapshot.state)
+        histogram.update(snapshot.state)
+
+        for device in snapshot.flex_devices:
+            state_tracker.update(device.id, device.state)
+            events.flex_device_state(device.id, device.state)
+            if device.is_vehicle:
+                events.plugged_in(device.id, device.is_plugged_in)
+
+        statistics.update_reward(snapshot.reward_all_time, snapshot.currency)
+        if completed_session:
+            statistics.add_session(
+                completed_session, session_tracker.total_reward, snapshot.currency
+            )
+
+        update_grid_reward_entities(snapshot, transition)
 
+    def update_grid_reward_entities(snapshot, transition=False):
+        """Update the grid reward and flex device entities from a snapshot."""
+        entry_data = hass.data[DOMAIN][entry.entry_id]
+        if transition:
+            # Throttled sensors always record their value at a transition.
+            flush_grid_reward_entities(snapshot)
+        else:
+            for device in entry_data["grid_reward_devices"]:
+                device.update_data(snapshot)
+        # Each flex device entity only gets the payload of its own device.
+        for device in snapshot.flex_devices:
+            for entity in entry_data["flex_device_entities"].get(device.id, ()):
+                entity.update_data(device)
+
+        plugs_changed = [
+            planner.update_plugged_in(device.id, device.is_plugged_in)
+            for device in snapshot.flex_devices
+            if device.is_vehicle
+        ]
+        if any(plugs_changed):
+            update_charging_plans()
+
+    def flush_grid_reward_entities(snapshot):
+        """Update the grid reward entities and write the changes they held back."""
         for device in hass.data[DOMAIN][entry.entry_id]["grid_reward_devices"]:
-            device.update_data(data)
+            device.update_data(snapshot)
+            device.async_flush_pending_write()
 
-    api.register_grid_reward_callback(update_grid_reward_sensors)
-    
-    entry.async_create_background_task(
-        hass, api.subscribe_grid_reward(entry.data["home_id"]), "tibber-grid-reward-subscription"
-    )
+    async def subscribe(subscription):
+        """Run a subscription until Tibber rejects the credentials."""
+        try:
+            await subscription
+        except TibberAuthError:
+            _LOGGER.warning("Tibber rejected the credentials, starting reauthentication.")
+            entry.async_start_reauth(hass)
+
+    api.register_grid_reward_callback(profiler.wrap(update_grid_reward_sensors))
 
     api_key = entry.data.get("api_key") or entry.options.get("api_key")
     public_api = None
+    window_finder = CheapestWindowFinder()
     if api_key:
         public_api = TibberPublicAPI(api_key, client)
 
+        def update_price_sensors(price_info):
+            """Update all price window sensors."""
+            window_finder.update_prices(price_info)
+            windows = window_finder.find(
+                [timedelta(hours=hours) for hours in CHEAPEST_WINDOW_HOURS],
+                after=dt_util.now(),
+            )
+            for sensor in hass.data[DOMAIN][entry.entry_id]["price_devices"]:
+                sensor.update_data(windows)
+
+            # Always refresh plans, as passing slots shrink the planning horizon.
+            planner.update_prices(window_finder.slots)
+            update_charging_plans()
+
+        public_api.register_price_callback(update_price_sensors)
+
     hass.data[DOMAIN][entry.entry_id] = {
         "api": api,
         "public_api": public_api,
+        "home_id": entry.data["home_id"],
         "flex_devices": entry.data["flex_devices"],
         "grid_reward_devices": [],
+        "flex_device_entities": {device["id"]: [] for device in entry.data["flex_devices"]},
+        "price_devices": [],
+        "plan_devices": [],
         "vehicle_devices": {
-            device["id"]: [] for device in entry.data["flex_devices"] if device["type"] == "vehicle"
+            device["id"]: {} for device in entry.data["flex_devices"] if device["type"] == "vehicle"
         },
+        "ledger": ledger,
         "daily_tracker": daily_tracker,
+        "state_tracker": state_tracker,
+        "histogram": histogram,
         "session_tracker": session_tracker,
+        "window_finder": window_finder,
+        "planner": planner,
+        "statistics": statistics,
+        "profiler": profiler,
+        "flight_recorder": flight_recorder,
     }
 
     entry.async_on_unload(entry.add_update_listener(update_listener))
@@ -81,44 +231,58 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         """Create a callback for a specific vehicle."""
         def update_vehicle_sensors(data):
             """Update all sensors for a specific vehicle."""
-            _LOGGER.debug("Vehicle callback for %s triggered with data: %s", device_id, data)
-            for sensor in hass.data[DOMAIN][entry.entry_id]["vehicle_devices"][device_id]:
-                sensor.update_data(data)
+            flight_recorder.record_frame("vehicle_state", device_id, data)
+            vehicle = VehicleState.from_payload(device_id, data)
+            last_frames.update_vehicle(vehicle, data)
+            update_vehicle_entities(vehicle)
         return update_vehicle_sensors
 
+    def update_vehicle_entities(vehicle):
+        """Update the departure time entities and plans of a vehicle."""
+        changed = planner.update_vehicle_settings(vehicle.vehicle_id, vehicle.settings)
+        if not changed:
+            return
+        entities = hass.data[DOMAIN][entry.entry_id]["vehicle_devices"][vehicle.vehicle_id]
+        for day, departure_time in changed.items():
+            if entity := entities.get(day):
+                entity.update_data(departure_time)
+        update_charging_plans()
+
     for device in entry.data["flex_devices"]:
         if device["type"] == "vehicle":
             device_id = device["id"]
-            callback = create_vehicle_update_callback(device_id)
-            api.register_vehicle_callback(device_id, callback)
-            entry.async_create_background_task(
-                hass, api.subscribe_vehicle_state(device_id), f"tibber-vehicle-subscription-{device_id}"
-            )
+            vehicle_callback = create_vehicle_update_callback(device_id)
+            api.register_vehicle_callback(device_id, profiler.wrap(vehicle_callback))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    async def set_departure_time(call: ServiceCall):
-        """Handle the service call to set the departure time."""
-        device_id = call.data.get("device_id")
-        day = call.data.get("day")
-        time_str = call.data.get("time")
-
-        device_registry = dr.async_get(hass)
-        device = device_registry.async_get(device_id)
-        
-        if not device:
-            return
+    # Show the last known state until the websocket delivers fresh frames.
+    if snapshot := last_frames.grid_reward:
+        update_grid_reward_entities(snapshot)
+    for device in entry.data["flex_devices"]:
+        if device["type"] == "vehicle" and (vehicle := last_frames.vehicle(device["id"])):
+            update_vehicle_entities(vehicle)
 
-        vehicle_id = next(iter(device.identifiers))[1]
-        
-        await api.set_departure_time(
-            home_id=entry.data["home_id"],
-            vehicle_id=vehicle_id,
-            day=day,
-            time_str=time_str if time_str else None,
-        )
+    # Subscribe once the entities are added, as frames write their states.
+    entry.async_create_background_task(
+        hass,
+        subscribe(api.subscribe_grid_reward(entry.data["home_id"])),
+        "tibber-grid-reward-subscription",
+    )
+    for device in entry.data["flex_devices"]:
+        if device["type"] == "vehicle":
+            entry.async_create_background_task(
+                hass,
+                subscribe(api.subscribe_vehicle_state(device["id"])),
+                f"tibber-vehicle-subscription-{device['id']}",
+            )
 
-    hass.services.async_register(DOMAIN, "set_departure_time", set_departure_time)
+    backfill = RewardBackfill(
+        hass, entry.entry_id, api, entry.data["home_id"], session_tracker, statistics
+    )
+    entry.async_create_background_task(
+        hass, backfill.async_run(), "tibber-grid-reward-backfill"
+    )
 
     return True
 
@@ -132,7 +296,21 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
-        hass.services.async_remove(DOMAIN, "set_departure_time")
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        await entry_data["session_tracker"].async_unload()
+        entry_data["state_tracker"].advance()
+        await entry_data["ledger"].async_flush()
+        entry_data["statistics"].async_unload()
+        entry_data["histogram"].async_unload()
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Remove the storage shards of a removed config entry."""
+    await async_remove_entry_storage(
+        hass,
+        entry.entry_id,
+        [LEDGER_STORAGE_KEY, BACKFILL_STORAGE_KEY],
+        [f"{entry_storage_key(JOURNAL_KEY, entry.entry_id)}.jsonl"],
+    )
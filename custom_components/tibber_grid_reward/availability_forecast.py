@@ -0,0 +1,191 @@
+"""Hour-of-week grid reward availability forecast for Tibber Grid Reward."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.util import dt as dt_util
+
+from .reward_ledger import RewardLedger
+
+_LOGGER = logging.getLogger(__name__)
+
+HOURS_PER_WEEK = 168
+HALF_LIFE = timedelta(weeks=4)
+FORECAST_HOURS = 24
+FORECAST_WINDOW = 3
+MAX_WEIGHT = 1e6
+MAX_GAP = timedelta(hours=2)
+
+DELIVERING = "GridRewardDelivering"
+AVAILABLE_STATES = ("GridRewardAvailable", DELIVERING)
+
+
+def hour_of_week(moment: datetime) -> int:
+    """Return the local hour of the week, starting Monday at midnight."""
+    local = dt_util.as_local(moment)
+    return local.weekday() * 24 + local.hour
+
+
+class AvailabilityHistogram:
+    """Observed, available and delivering minutes per hour of the week.
+
+    Minutes are added when the grid reward state changes and at every full
+    hour, so each update touches at most two buckets. Older observations
+    decay with a fixed half-life. Instead of scaling all buckets, new
+    minutes get a weight that doubles every half-life; the ratios in a
+    bucket are unaffected by the common scale, and the buckets are
+    renormalized when the weight grows large.
+    """
+
+    def __init__(self, hass: HomeAssistant, ledger: RewardLedger):
+        """Initialize the histogram."""
+        self._hass = hass
+        self._ledger = ledger
+        self._unsub_tick = None
+        self.version = 0
+
+    @property
+    def _data(self) -> dict[str, Any]:
+        """Return the histogram part of the ledger record."""
+        return self._ledger.data.setdefault(
+            "availability",
+            {
+                "state": None,
+                "since": None,
+                "epoch": dt_util.utcnow().timestamp(),
+                "observed": [0.0] * HOURS_PER_WEEK,
+                "available": [0.0] * HOURS_PER_WEEK,
+                "delivering": [0.0] * HOURS_PER_WEEK,
+            },
+        )
+
+    @callback
+    def async_setup(self):
+        """Account the minutes of the current state at every full hour."""
+        self._unsub_tick = async_track_time_change(
+            self._hass, self._async_tick, minute=0, second=0
+        )
+
+    @callback
+    def async_unload(self):
+        """Stop the hourly accounting."""
+        if self._unsub_tick:
+            self._unsub_tick()
+            self._unsub_tick = None
+
+    @callback
+    def _async_tick(self, now: datetime):
+        """Account the minutes of the hour that just ended."""
+        if self._data["state"] is not None:
+            self._accumulate(now)
+            self._ledger.schedule_save()
+
+    @callback
+    def update(self, state: str | None, now: datetime | None = None) -> bool:
+        """Record the grid reward state, returning whether it changed."""
+        data = self._data
+        if state is None or state == data["state"]:
+            return False
+        now = now or dt_util.utcnow()
+        if data["state"] is not None:
+            self._accumulate(now)
+        data["state"] = state
+        data["since"] = now.timestamp()
+        self._ledger.schedule_save()
+        return True
+
+    def _accumulate(self, now: datetime) -> None:
+        """Add the minutes since the last update to their hour buckets."""
+        data = self._data
+        since = dt_util.utc_from_timestamp(data["since"])
+        if now - since > MAX_GAP:
+            # Home Assistant was not running, so the state was not observed.
+            since = now
+        while since < now:
+            hour_end = dt_util.as_local(since).replace(
+                minute=0, second=0, microsecond=0
+            ) + timedelta(hours=1)
+            end = min(now, hour_end)
+            self._add(hour_of_week(since), (end - since).total_seconds() / 60, since)
+            since = end
+        data["since"] = now.timestamp()
+
+    def _add(self, bucket: int, minutes: float, moment: datetime) -> None:
+        """Add weighted minutes of the current state to a bucket."""
+        data = self._data
+        weight = 2 ** ((moment.timestamp() - data["epoch"]) / HALF_LIFE.total_seconds())
+        if weight > MAX_WEIGHT:
+            _LOGGER.debug("Renormalizing the availability histogram.")
+            for key in ("observed", "available", "delivering"):
+                data[key] = [value / weight for value in data[key]]
+            data["epoch"] = moment.timestamp()
+            weight = 1.0
+
+        weighted = minutes * weight
+        data["observed"][bucket] += weighted
+        if data["state"] in AVAILABLE_STATES:
+            data["available"][bucket] += weighted
+        if data["state"] == DELIVERING:
+            data["delivering"][bucket] += weighted
+        self.version += 1
+
+    def bucket(self, index: int) -> dict[str, float | None]:
+        """Return the delivering and availability probability of a bucket."""
+        data = self._data
+        observed = data["observed"][index]
+        if not observed:
+            return {"delivering": None, "available": None}
+        return {
+            "delivering": round(data["delivering"][index] / observed, 3),
+            "available": round(data["available"][index] / observed, 3),
+        }
+
+    def forecast(
+        self, now: datetime | None = None, hours: int = FORECAST_HOURS
+    ) -> list[dict[str, Any]]:
+        """Return the probabilities for the coming hours, starting with the current one."""
+        start = dt_util.as_local(now or dt_util.now()).replace(
+            minute=0, second=0, microsecond=0
+        )
+        forecast = []
+        for hour in range(hours):
+            hour_start = start + timedelta(hours=hour)
+            forecast.append(
+                {"start": hour_start.isoformat(), **self.bucket(hour_of_week(hour_start))}
+            )
+        return forecast
+
+    def delivering_probability(
+        self, now: datetime | None = None, hours: int = FORECAST_WINDOW
+    ) -> float | None:
+        """Return the mean delivering probability of the coming hours."""
+        known = [
+            hour["delivering"]
+            for hour in self.forecast(now, hours)
+            if hour["delivering"] is not None
+        ]
+        if not known:
+            return None
+        return round(sum(known) / len(known), 3)
+
+    def profile(self, now: datetime | None = None) -> list[dict[str, Any]]:
+        """Return the probabilities of all hours of the week."""
+        data = self._data
+        # Observed hours are reported with the decay applied up to now.
+        weight = 2 ** (
+            ((now or dt_util.utcnow()).timestamp() - data["epoch"])
+            / HALF_LIFE.total_seconds()
+        )
+        return [
+            {
+                "weekday": index // 24,
+                "hour": index % 24,
+                "observed_hours": round(data["observed"][index] / weight / 60, 2),
+                **self.bucket(index),
+            }
+            for index in range(HOURS_PER_WEEK)
+        ]
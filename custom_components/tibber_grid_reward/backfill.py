@@ -0,0 +1,186 @@
+"""Historical grid reward backfill for Tibber Grid Reward."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .client import TibberAPI, TibberAuthError, TibberConnectionError, TibberException
+from .reward_statistics import RewardStatistics, hour_start
+from .session_tracker import RewardSessionTracker
+from .storage import entry_storage_key
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "tibber_grid_reward_backfill"
+BACKFILL_MONTHS = 36
+MAX_CONCURRENT_PAGES = 3
+PAGES_PER_BATCH = 6
+
+
+def month_ranges(before: datetime, months: int) -> list[tuple[datetime, datetime]]:
+    """Return month ranges ending at ``before``, newest first."""
+    end = dt_util.as_local(before)
+    year, month = end.year, end.month
+    ranges = []
+    for _ in range(months):
+        start = datetime(year, month, 1, tzinfo=end.tzinfo)
+        ranges.append((start, end))
+        end = start
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return ranges
+
+
+def _to_session(item: dict[str, Any]) -> dict[str, Any] | None:
+    """Convert a session from the history query to a journal session."""
+    start_time = dt_util.parse_datetime(item.get("start") or "")
+    end_time = dt_util.parse_datetime(item.get("end") or "")
+    try:
+        reward = float(item["reward"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if start_time is None or end_time is None:
+        return None
+    return {
+        "start_time": dt_util.as_utc(start_time).isoformat(),
+        "end_time": dt_util.as_utc(end_time).isoformat(),
+        "duration_minutes": round((end_time - start_time).total_seconds() / 60, 2),
+        "reward": round(reward, 4),
+    }
+
+
+class RewardBackfill:
+    """Page through historical reward sessions and import them in bulk.
+
+    Months are fetched newest first with bounded concurrency. After each
+    batch the sessions are imported and the finished months are saved as a
+    checkpoint, so an interrupted backfill resumes where it stopped.
+
+    The history query is not part of Tibber's documented API. The newest
+    month is therefore fetched alone first, and if Tibber rejects the query
+    the backfill logs it once and is recorded as finished, so it is never
+    sent again.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        api: TibberAPI,
+        home_id: str,
+        session_tracker: RewardSessionTracker,
+        statistics: RewardStatistics,
+    ):
+        """Initialize the backfill."""
+        self._hass = hass
+        self._api = api
+        self._home_id = home_id
+        self._session_tracker = session_tracker
+        self._statistics = statistics
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, entry_storage_key(STORAGE_KEY, entry_id)
+        )
+        self._data: dict[str, Any] = {
+            "cutoff": None,
+            "completed_months": [],
+            "finished": False,
+        }
+
+    async def async_run(self):
+        """Run the backfill until finished or interrupted."""
+        stored_data = await self._store.async_load()
+        if stored_data:
+            self._data = stored_data
+        if self._data["finished"]:
+            return
+
+        if self._data["cutoff"] is None:
+            # Sessions recorded live are never imported twice.
+            known_sessions = await self._session_tracker.async_get_sessions()
+            self._data["cutoff"] = min(
+                (session["start_time"] for session in known_sessions),
+                key=dt_util.parse_datetime,
+                default=dt_util.utcnow().isoformat(),
+            )
+        cutoff = dt_util.parse_datetime(self._data["cutoff"])
+
+        completed = set(self._data["completed_months"])
+        months = [
+            month
+            for month in month_ranges(cutoff, BACKFILL_MONTHS)
+            if month[0].isoformat() not in completed
+        ]
+        _LOGGER.debug("Backfilling %d months of grid reward sessions.", len(months))
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+        index = 0
+        while index < len(months):
+            # Until a month was fetched, a single month probes the history query.
+            probe = not self._data["completed_months"]
+            batch = months[index:index + (1 if probe else PAGES_PER_BATCH)]
+            index += len(batch)
+            try:
+                pages = await asyncio.gather(
+                    *(self._async_fetch_month(semaphore, start, end) for start, end in batch)
+                )
+            except (TibberAuthError, TibberConnectionError):
+                _LOGGER.warning("Grid reward backfill interrupted, resuming on next start.")
+                return
+            except TibberException as err:
+                _LOGGER.warning(
+                    "Grid reward history is not available, the backfill is stopped: %s", err
+                )
+                break
+
+            sessions = [
+                session
+                for page in pages
+                for session in page
+                if dt_util.parse_datetime(session["end_time"]) < cutoff
+            ]
+            await self._session_tracker.async_import_sessions(sessions)
+            self._data["completed_months"].extend(start.isoformat() for start, _ in batch)
+            await self._store.async_save(self._data)
+
+            if not any(pages) and not probe:
+                _LOGGER.debug("No grid reward sessions before %s.", batch[-1][0])
+                break
+
+        await self._async_import_statistics()
+        self._data["finished"] = True
+        await self._store.async_save(self._data)
+
+    async def _async_fetch_month(
+        self, semaphore: asyncio.Semaphore, start: datetime, end: datetime
+    ) -> list[dict[str, Any]]:
+        """Fetch the sessions of one month."""
+        async with semaphore:
+            items = await self._api.get_grid_reward_sessions(
+                self._home_id, start.isoformat(), end.isoformat()
+            )
+        return [session for item in items if (session := _to_session(item))]
+
+    async def _async_import_statistics(self):
+        """Rebuild the session statistic from the journal in one batch."""
+        sessions = sorted(
+            await self._session_tracker.async_get_sessions(),
+            key=lambda session: dt_util.parse_datetime(session["end_time"]),
+        )
+        # Sessions compacted out of the journal still count in the total.
+        total = self._session_tracker.total_reward - sum(
+            session["reward"] for session in sessions
+        )
+        rows = {}
+        for session in sessions:
+            total += session["reward"]
+            start = hour_start(dt_util.parse_datetime(session["end_time"]))
+            rows[start] = {"start": start, "state": round(total, 4), "sum": round(total, 4)}
+        self._statistics.import_rows(
+            self._statistics.session_statistic_id, list(rows.values())
+        )
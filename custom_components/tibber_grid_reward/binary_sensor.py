@@ -1,6 +1,5 @@
 """Platform for binary sensor integration."""
 from __future__ import annotations
-from typing import Any
 import logging
 
 from homeassistant.components.binary_sensor import (
@@ -9,10 +8,14 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_ON
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
 
 from .const import DOMAIN
+from .entity import WriteOnChangeMixin
+from .models import GridRewardSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -41,7 +44,7 @@ async def async_setup_entry(
     async_add_entities([sensor])
 
 
-class GridRewardActiveSensor(BinarySensorEntity):
+class GridRewardActiveSensor(WriteOnChangeMixin, BinarySensorEntity, RestoreEntity):
     """Representation of a Grid Reward Active Sensor."""
 
     entity_description: BinarySensorEntityDescription
@@ -51,7 +54,6 @@ class GridRewardActiveSensor(BinarySensorEntity):
         self.entity_description = description
         self._api = api
         self._entry_id = entry_id
-        self._attributes = {}
         self._attr_is_on = False
         self._attr_unique_id = f"{self._entry_id}_{self.entity_description.key}"
 
@@ -64,13 +66,16 @@ class GridRewardActiveSensor(BinarySensorEntity):
             "manufacturer": "Tibber",
         }
 
+    async def async_added_to_hass(self) -> None:
+        """Restore the last state until the first update."""
+        await super().async_added_to_hass()
+        if self._last_written_state is not None:
+            return
+        if last_state := await self.async_get_last_state():
+            self._attr_is_on = last_state.state == STATE_ON
+
     @callback
-    def update_data(self, data: dict[str, Any]) -> None:
+    def update_data(self, snapshot: GridRewardSnapshot) -> None:
         """Update the entity."""
-        _LOGGER.debug("Updating binary sensor with data: %s", data)
-        self._attributes = data
-        self._attr_is_on = (
-            self._attributes.get("state", {}).get("__typename")
-            == "GridRewardDelivering"
-        )
-        self.async_write_ha_state()
+        self._attr_is_on = snapshot.state == "GridRewardDelivering"
+        self.async_write_ha_state_if_changed()
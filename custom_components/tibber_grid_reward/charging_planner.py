@@ -0,0 +1,227 @@
+"""Price-aware charging planner for Tibber Grid Reward."""
+from __future__ import annotations
+
+import datetime
+import heapq
+import logging
+import math
+from bisect import bisect_right
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from .cheapest_window import PriceSlots
+
+_LOGGER = logging.getLogger(__name__)
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+DEPARTURE_TIME_KEY = "online.vehicle.smartCharging.departureTimes."
+
+
+def departure_times_from_settings(
+    settings: Mapping[str, Any],
+) -> dict[str, datetime.time | None]:
+    """Extract the departure time for each weekday from vehicle settings by key."""
+    times: dict[str, datetime.time | None] = dict.fromkeys(WEEKDAYS)
+    for day in WEEKDAYS:
+        value = settings.get(DEPARTURE_TIME_KEY + day)
+        if not value:
+            continue
+        try:
+            times[day] = datetime.time.fromisoformat(value)
+        except (ValueError, TypeError):
+            times[day] = None
+    return times
+
+
+def next_departure(
+    departure_times: dict[str, datetime.time | None], now: datetime.datetime
+) -> datetime.datetime | None:
+    """Return the next departure after now, looking a week ahead."""
+    for offset in range(8):
+        date = now.date() + datetime.timedelta(days=offset)
+        departure_time = departure_times.get(WEEKDAYS[date.weekday()])
+        if departure_time is None:
+            continue
+        departure = datetime.datetime.combine(date, departure_time, tzinfo=now.tzinfo)
+        if departure > now:
+            return departure
+    return None
+
+
+@dataclass(frozen=True)
+class ChargingPlan:
+    """A planned charging schedule for a vehicle."""
+
+    departure: datetime.datetime | None
+    energy_kwh: float
+    power_kw: float
+    slots: tuple[tuple[datetime.datetime, datetime.datetime], ...]
+    average_price: float | None
+    complete: bool
+
+    @property
+    def next_start(self) -> datetime.datetime | None:
+        """Return the start of the first planned slot."""
+        return self.slots[0][0] if self.slots else None
+
+    @property
+    def schedule(self) -> list[dict[str, str]]:
+        """Return the planned slots merged into contiguous periods."""
+        periods: list[list[datetime.datetime]] = []
+        for start, end in self.slots:
+            if periods and periods[-1][1] == start:
+                periods[-1][1] = end
+            else:
+                periods.append([start, end])
+        return [
+            {"start": start.isoformat(), "end": end.isoformat()}
+            for start, end in periods
+        ]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the plan as service response data."""
+        return {
+            "departure": self.departure.isoformat() if self.departure else None,
+            "energy_kwh": self.energy_kwh,
+            "power_kw": self.power_kw,
+            "slots": len(self.slots),
+            "schedule": self.schedule,
+            "average_price": (
+                round(self.average_price, 4) if self.average_price is not None else None
+            ),
+            "complete": self.complete,
+        }
+
+
+class ChargingPlanner:
+    """Pick the cheapest price slots to charge a vehicle before departure."""
+
+    def __init__(self, energy_kwh: float, power_kw: float):
+        """Initialize the planner."""
+        self.energy_kwh = energy_kwh
+        self.power_kw = power_kw
+        self._slots: PriceSlots | None = None
+        self._prices_version = 0
+        self._settings: dict[str, Mapping[str, Any]] = {}
+        self._departure_times: dict[str, dict[str, datetime.time | None]] = {}
+        self._plugged_in: dict[str, bool] = {}
+        self._plans: dict[str, tuple[tuple, ChargingPlan]] = {}
+
+    def update_prices(self, slots: PriceSlots | None) -> bool:
+        """Update the price slots, returning True if they changed."""
+        if slots == self._slots:
+            return False
+        self._slots = slots
+        self._prices_version += 1
+        return True
+
+    def update_vehicle_settings(
+        self, vehicle_id: str, settings: Mapping[str, Any]
+    ) -> dict[str, datetime.time | None]:
+        """Update the departure times of a vehicle, returning the days that changed."""
+        if self._settings.get(vehicle_id) == settings:
+            return {}
+        self._settings[vehicle_id] = settings
+        departure_times = departure_times_from_settings(settings)
+        previous = self._departure_times.get(vehicle_id, {})
+        changed = {
+            day: departure_time
+            for day, departure_time in departure_times.items()
+            if day not in previous or previous[day] != departure_time
+        }
+        if changed:
+            _LOGGER.debug("Departure times for %s changed: %s", vehicle_id, changed)
+            self._departure_times[vehicle_id] = departure_times
+        return changed
+
+    def set_departure_time(
+        self, vehicle_id: str, day: str, departure_time: datetime.time | None
+    ) -> bool:
+        """Set a departure time sent to Tibber, returning True if it changed.
+
+        The cached settings are updated as if a frame had confirmed the time,
+        so a frame with the same time is no change, and a frame that still has
+        the previous time reverts it.
+        """
+        settings = dict(self._settings.get(vehicle_id, {}))
+        settings[DEPARTURE_TIME_KEY + day] = (
+            departure_time.strftime("%H:%M") if departure_time else None
+        )
+        return bool(self.update_vehicle_settings(vehicle_id, settings))
+
+    def update_plugged_in(self, vehicle_id: str, plugged_in: bool) -> bool:
+        """Update the plug-in state of a vehicle, returning True if it changed."""
+        if self._plugged_in.get(vehicle_id) == plugged_in:
+            return False
+        self._plugged_in[vehicle_id] = plugged_in
+        return True
+
+    def is_plugged_in(self, vehicle_id: str) -> bool:
+        """Return whether the vehicle was last reported as plugged in."""
+        return self._plugged_in.get(vehicle_id, False)
+
+    def plan(
+        self,
+        vehicle_id: str,
+        now: datetime.datetime,
+        energy_kwh: float | None = None,
+        power_kw: float | None = None,
+        departure: datetime.datetime | None = None,
+    ) -> ChargingPlan:
+        """Return the cheapest charging plan.
+
+        Plans with the default energy need, charger power and departure are
+        cached per vehicle and recomputed only when their inputs change.
+        """
+        cacheable = energy_kwh is None and power_kw is None and departure is None
+        energy_kwh = self.energy_kwh if energy_kwh is None else energy_kwh
+        power_kw = self.power_kw if power_kw is None else power_kw
+        if departure is None:
+            departure = next_departure(self._departure_times.get(vehicle_id, {}), now)
+
+        lo = hi = 0
+        if self._slots and departure:
+            starts = self._slots.starts
+            lo = bisect_right(starts, now - self._slots.slot_length)
+            hi = bisect_right(starts, departure - self._slots.slot_length)
+
+        if not cacheable:
+            return self._select_slots(departure, energy_kwh, power_kw, lo, hi)
+
+        key = (self._prices_version, departure, energy_kwh, power_kw, lo, hi)
+        cached = self._plans.get(vehicle_id)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        plan = self._select_slots(departure, energy_kwh, power_kw, lo, hi)
+        self._plans[vehicle_id] = (key, plan)
+        return plan
+
+    def _select_slots(
+        self,
+        departure: datetime.datetime | None,
+        energy_kwh: float,
+        power_kw: float,
+        lo: int,
+        hi: int,
+    ) -> ChargingPlan:
+        """Select the cheapest slots in [lo, hi) that cover the energy need."""
+        if not self._slots or hi <= lo or energy_kwh <= 0 or power_kw <= 0:
+            return ChargingPlan(departure, energy_kwh, power_kw, (), None, energy_kwh <= 0)
+
+        slot_length = self._slots.slot_length
+        slot_energy = power_kw * slot_length.total_seconds() / 3600
+        needed = math.ceil(energy_kwh / slot_energy)
+
+        prices = self._slots.prices
+        chosen = sorted(heapq.nsmallest(needed, range(lo, hi), key=prices.__getitem__))
+        starts = self._slots.starts
+        return ChargingPlan(
+            departure=departure,
+            energy_kwh=energy_kwh,
+            power_kw=power_kw,
+            slots=tuple((starts[i], starts[i] + slot_length) for i in chosen),
+            average_price=sum(prices[i] for i in chosen) / len(chosen),
+            complete=len(chosen) >= needed,
+        )
@@ -0,0 +1,189 @@
+"""Cheapest price window finder for Tibber Grid Reward."""
+from __future__ import annotations
+
+import logging
+import math
+from bisect import bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import pairwise
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_SLOT_LENGTH = timedelta(hours=1)
+
+
+@dataclass(frozen=True)
+class PriceSlots:
+    """A contiguous vector of price slots."""
+
+    starts: tuple[datetime, ...]
+    prices: tuple[float, ...]
+    slot_length: timedelta
+
+    @property
+    def end(self) -> datetime:
+        """Return the end of the last slot."""
+        return self.starts[-1] + self.slot_length
+
+
+@dataclass(frozen=True)
+class PriceWindow:
+    """The cheapest window found for a duration."""
+
+    duration: timedelta
+    slots: int
+    start: datetime
+    end: datetime
+    average_price: float
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the window as service response data."""
+        return {
+            "duration_minutes": round(self.duration.total_seconds() / 60),
+            "slots": self.slots,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "average_price": round(self.average_price, 4),
+        }
+
+
+def parse_price_slots(price_info: dict[str, Any] | None) -> PriceSlots | None:
+    """Build a slot vector from a priceInfo payload."""
+    if not price_info:
+        return None
+
+    starts: list[datetime] = []
+    prices: list[float] = []
+    for price in (price_info.get("today") or []) + (price_info.get("tomorrow") or []):
+        starts_at = dt_util.parse_datetime(price.get("startsAt") or "")
+        total = price.get("total")
+        if starts_at is None or total is None:
+            continue
+        starts.append(starts_at)
+        prices.append(float(total))
+
+    if not starts:
+        return None
+
+    slot_length = min(
+        (later - earlier for earlier, later in pairwise(starts)),
+        default=DEFAULT_SLOT_LENGTH,
+    )
+    return PriceSlots(tuple(starts), tuple(prices), slot_length)
+
+
+class CheapestWindowFinder:
+    """Find the cheapest contiguous windows in the price vector.
+
+    Prefix sums are rebuilt only when the price vector changes, and results
+    are memoized per search range until the next price change.
+    """
+
+    def __init__(self):
+        """Initialize the finder."""
+        self._slots: PriceSlots | None = None
+        self._prefix: list[float] = [0.0]
+        self._results: dict[tuple, PriceWindow | None] = {}
+
+    @property
+    def slots(self) -> PriceSlots | None:
+        """Return the current price slots."""
+        return self._slots
+
+    def update_prices(self, price_info: dict[str, Any] | None) -> bool:
+        """Update the price vector, returning True if it changed."""
+        slots = parse_price_slots(price_info)
+        if slots == self._slots:
+            return False
+
+        _LOGGER.debug("Price vector changed, rebuilding prefix sums.")
+        self._slots = slots
+        self._results = {}
+        self._prefix = [0.0]
+        if slots:
+            running = 0.0
+            for price in slots.prices:
+                running += price
+                self._prefix.append(running)
+        return True
+
+    def slots_for(self, duration: timedelta) -> int:
+        """Return the number of slots needed to cover a duration."""
+        slot_length = self._slots.slot_length if self._slots else DEFAULT_SLOT_LENGTH
+        return max(1, math.ceil(duration / slot_length))
+
+    def find(
+        self,
+        durations: Iterable[timedelta],
+        after: datetime | None = None,
+        before: datetime | None = None,
+    ) -> dict[timedelta, PriceWindow | None]:
+        """Find the cheapest window for each duration in a single pass.
+
+        Windows may start in the slot containing ``after`` and must end no
+        later than ``before``.
+        """
+        durations = list(durations)
+        if not self._slots:
+            return dict.fromkeys(durations)
+
+        starts = self._slots.starts
+        slot_length = self._slots.slot_length
+        lo = 0
+        if after is not None:
+            lo = max(0, bisect_right(starts, after) - 1)
+            if starts[lo] + slot_length <= after:
+                lo += 1
+        hi = len(starts)
+        if before is not None:
+            hi = bisect_right(starts, before - slot_length)
+
+        lengths = {duration: self.slots_for(duration) for duration in durations}
+        missing = sorted(
+            {
+                length
+                for length in lengths.values()
+                if (length, lo, hi) not in self._results
+            }
+        )
+        if missing:
+            self._scan(missing, lo, hi)
+
+        return {
+            duration: self._results[(length, lo, hi)]
+            for duration, length in lengths.items()
+        }
+
+    def _scan(self, lengths: list[int], lo: int, hi: int) -> None:
+        """Slide every window length over slots [lo, hi) in one pass."""
+        prefix = self._prefix
+        best: dict[int, tuple[float, int]] = {}
+        for end in range(lo + 1, hi + 1):
+            end_sum = prefix[end]
+            for length in lengths:
+                start = end - length
+                if start < lo:
+                    break
+                total = end_sum - prefix[start]
+                if length not in best or total < best[length][0]:
+                    best[length] = (total, start)
+
+        starts = self._slots.starts
+        slot_length = self._slots.slot_length
+        for length in lengths:
+            if length not in best:
+                self._results[(length, lo, hi)] = None
+                continue
+            total, start = best[length]
+            self._results[(length, lo, hi)] = PriceWindow(
+                duration=slot_length * length,
+                slots=length,
+                start=starts[start],
+                end=starts[start + length - 1] + slot_length,
+                average_price=total / length,
+            )
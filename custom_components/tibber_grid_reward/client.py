@@ -1,19 +1,24 @@
+from __future__ import annotations
+
 import asyncio
+import base64
 import logging
 import time
-import jwt
-import websockets
 import httpx
 import json
 import uuid
 import ssl
-from typing import Callable, Any, List, Dict
+from typing import TYPE_CHECKING, Callable, Any, List, Dict
+
+if TYPE_CHECKING:
+    import websockets
 
 _LOGGER = logging.getLogger(__name__)
 
 AUTH_URL = "https://app.tibber.com/v1/login.credentials"
 GRAPHQL_WS_URL = "wss://app.tibber.com/v4/gql/ws"
 GRAPHQL_URL = "https://app.tibber.com/v4/gql"
+RECONNECT_DELAY = 5
 
 class TibberException(Exception):
     """Base exception for the Tibber API client."""
@@ -24,6 +29,37 @@ class TibberAuthError(TibberException):
 class TibberConnectionError(TibberException):
     """Exception for connection errors."""
 
+def _token_expiry(token: str) -> float:
+    """Return the exp claim of a JWT, without verifying its signature."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims.get("exp", 0))
+    except (AttributeError, IndexError, TypeError, ValueError) as e:
+        raise TibberException("Malformed token.") from e
+
+
+def _import_websockets():
+    """Import websockets and the parts of it that it loads lazily."""
+    import websockets
+
+    # websockets imports these on first access, which must not happen in the loop.
+    _ = websockets.connect, websockets.exceptions
+    return websockets
+
+
+_websockets = None
+
+
+async def _async_websockets():
+    """Return the websockets module, imported in the executor on first use."""
+    global _websockets
+    if _websockets is None:
+        loop = asyncio.get_running_loop()
+        _websockets = await loop.run_in_executor(None, _import_websockets)
+    return _websockets
+
+
 class TibberAPI:
     def __init__(self, username: str, password: str, client: httpx.AsyncClient):
         self.username: str = username
@@ -62,12 +98,15 @@ class TibberAPI:
             response.raise_for_status()
             data: Dict[str, Any] = response.json()
             token: str = data.get("token")
-            decoded: Dict[str, Any] = jwt.decode(token, options={"verify_signature": False})
-            self._cached_exp = decoded.get("exp", 0)
+            self._cached_exp = _token_expiry(token)
             self._cached_token = token
             _LOGGER.debug("Successfully fetched new Tibber token.")
             return token
         except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            if status == 429 or status >= 500:
+                # Tibber is unavailable, which says nothing about the credentials.
+                raise TibberConnectionError from e
             raise TibberAuthError from e
         except Exception as e:
             raise TibberException from e
@@ -89,6 +128,7 @@ class TibberAPI:
 
     async def validate_grid_reward(self, home_id: str) -> Dict[str, Any] | None:
         _LOGGER.debug("Validating grid reward for home: %s", home_id)
+        websockets = await _async_websockets()
         token = await self.fetch_token()
         headers = {"Authorization": f"Bearer {token}"}
         
@@ -126,6 +166,7 @@ class TibberAPI:
         self._vehicle_callbacks[vehicle_id] = callback
 
     async def subscribe_grid_reward(self, home_id: str) -> None:
+        websockets = await _async_websockets()
         self.home_id = home_id
         self._ws_reconnect = True
         _LOGGER.info("Starting Tibber grid reward websocket subscription.")
@@ -156,7 +197,6 @@ class TibberAPI:
                                 await websocket.send(json.dumps(subscribe_msg))
                             elif data.get("type") == "next":
                                 reward_data = data.get("payload", {}).get("data", {}).get("gridRewardStatus")
-                                _LOGGER.debug("Grid reward data received: %s", data)
                                 if reward_data and self._sub_callback:
                                     self._sub_callback(reward_data)
                             elif data.get("type") == "complete" and data.get("id") == current_sub_id:
@@ -164,22 +204,24 @@ class TibberAPI:
                                 _LOGGER.debug("Subscription complete, re-subscribing.")
                                 subscribe_msg = self._build_grid_reward_subscribe_message(self.home_id, current_sub_id)
                                 await websocket.send(json.dumps(subscribe_msg))
-                            #else:
-                            #    _LOGGER.debug("Grid reward data received: %s", data)
+                except TibberAuthError:
+                    # Retrying cannot help until the credentials are updated.
+                    raise
                 except (websockets.exceptions.ConnectionClosedError, websockets.exceptions.ConnectionClosedOK):
                     if not self._ws_reconnect:
                         break
-                    _LOGGER.warning("Websocket connection closed, reconnecting in 5 seconds.")
+                    _LOGGER.warning("Websocket connection closed, reconnecting in %s seconds.", RECONNECT_DELAY)
                 except Exception:
-                    _LOGGER.exception("Error in websocket subscription, reconnecting in 5 seconds.")
+                    _LOGGER.exception("Error in websocket subscription, reconnecting in %s seconds.", RECONNECT_DELAY)
                 
                 if self._ws_reconnect:
-                    await asyncio.sleep(5)
+                    await asyncio.sleep(RECONNECT_DELAY)
         except asyncio.CancelledError:
             _LOGGER.info("Tibber websocket subscription task cancelled.")
             raise
 
     async def subscribe_vehicle_state(self, vehicle_id: str) -> None:
+        websockets = await _async_websockets()
         self._ws_reconnect = True
         _LOGGER.info("Starting Tibber vehicle state websocket subscription for %s.", vehicle_id)
         try:
@@ -208,7 +250,6 @@ class TibberAPI:
                                 subscribe_msg = self._build_vehicle_state_subscribe_message(vehicle_id, current_sub_id)
                                 await websocket.send(json.dumps(subscribe_msg))
                             elif data.get("type") == "next":
-                                _LOGGER.debug("Vehicle state data received: %s", data)
                                 vehicle_data = data.get("payload", {}).get("data", {}).get("vehicleState")
                                 if vehicle_data and self._vehicle_callbacks.get(vehicle_id):
                                     self._vehicle_callbacks[vehicle_id](vehicle_data)
@@ -217,15 +258,18 @@ class TibberAPI:
                                 current_sub_id = str(uuid.uuid4())
                                 subscribe_msg = self._build_vehicle_state_subscribe_message(vehicle_id, current_sub_id)
                                 await websocket.send(json.dumps(subscribe_msg))
+                except TibberAuthError:
+                    # Retrying cannot help until the credentials are updated.
+                    raise
                 except (websockets.exceptions.ConnectionClosedError, websockets.exceptions.ConnectionClosedOK):
                     if not self._ws_reconnect:
                         break
-                    _LOGGER.warning("Websocket connection closed, reconnecting in 5 seconds.")
+                    _LOGGER.warning("Websocket connection closed, reconnecting in %s seconds.", RECONNECT_DELAY)
                 except Exception:
-                    _LOGGER.exception("Error in websocket subscription, reconnecting in 5 seconds.")
+                    _LOGGER.exception("Error in websocket subscription, reconnecting in %s seconds.", RECONNECT_DELAY)
                 
                 if self._ws_reconnect:
-                    await asyncio.sleep(5)
+                    await asyncio.sleep(RECONNECT_DELAY)
         except asyncio.CancelledError:
             _LOGGER.info("Tibber websocket subscription task cancelled.")
             raise
@@ -351,4 +395,56 @@ class TibberAPI:
         except httpx.HTTPStatusError as e:
             raise TibberConnectionError from e
         except Exception as e:
-            raise TibberException from e
\ No newline at end of file
+            raise TibberException from e
+
+    async def get_grid_reward_sessions(self, home_id: str, start: str, end: str) -> list[dict[str, Any]]:
+        """Fetch the grid reward sessions that ended between two ISO timestamps."""
+        _LOGGER.debug("Fetching grid reward sessions for home %s from %s to %s", home_id, start, end)
+        token = await self.fetch_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        payload = {
+            "operationName": "GridRewardSessions",
+            "variables": {"homeId": home_id, "from": start, "to": end},
+            "query": """
+            query GridRewardSessions($homeId: String!, $from: String!, $to: String!) {
+              me {
+                home(id: $homeId) {
+                  gridRewardHistory(from: $from, to: $to) {
+                    sessions {
+                      start
+                      end
+                      reward
+                    }
+                  }
+                }
+              }
+            }
+            """
+        }
+        try:
+            response = await self._client.post(GRAPHQL_URL, headers=headers, json=payload)
+        except httpx.TransportError as e:
+            raise TibberConnectionError from e
+        except Exception as e:
+            raise TibberException from e
+
+        status = response.status_code
+        if status == 429 or status >= 500:
+            raise TibberConnectionError(f"Tibber responded with status {status}.")
+        if status in (401, 403):
+            raise TibberAuthError(f"Tibber responded with status {status}.")
+        try:
+            data: dict[str, Any] = response.json()
+        except ValueError:
+            data = {}
+        # A query Tibber does not support is answered with a 400 and errors.
+        if data.get("errors") or response.is_client_error:
+            errors = data.get("errors") or [{}]
+            raise TibberException(errors[0].get("message", f"Tibber responded with status {status}."))
+        history = (((data.get("data") or {}).get("me") or {}).get("home") or {}).get("gridRewardHistory") or {}
+        sessions = history.get("sessions") if isinstance(history, dict) else None
+        if sessions is None:
+            return []
+        if not isinstance(sessions, list) or not all(isinstance(item, dict) for item in sessions):
+            raise TibberException("Unexpected grid reward history response.")
+        return sessions
@@ -1,5 +1,7 @@
 import asyncio
+from collections.abc import Mapping
 import logging
+from typing import Any
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.helpers.httpx_client import get_async_client
@@ -9,7 +11,24 @@ from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult, AbortFlow
 
 from .client import TibberAPI, TibberAuthError, TibberConnectionError
-from .const import CONF_API_KEY, DOMAIN
+from .const import (
+    CONF_API_KEY,
+    CONF_CHARGE_ENERGY,
+    CONF_CHARGER_POWER,
+    CONF_DEADBAND,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_SAVE_INTERVAL,
+    CONF_SESSION_RETENTION,
+    DEFAULT_CHARGE_ENERGY,
+    DEFAULT_CHARGER_POWER,
+    DEFAULT_DEADBAND,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    DEFAULT_SAVE_INTERVAL,
+    DEFAULT_SESSION_RETENTION,
+    DOMAIN,
+    THROTTLED_SENSORS,
+)
+from .entity import option_key, parse_deadband
 from .public_client import TibberPublicAPI, TibberPublicAuthError, TibberPublicException
 
 
@@ -35,19 +54,12 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         """Manage the options."""
         errors = {}
         if user_input is not None:
-            try:
-                token = user_input[CONF_API_KEY]
-                client = get_async_client(self.hass)
-                public_api = TibberPublicAPI(token, client)
-
-                await public_api.get_homes()
-
+            errors = self._validate_deadbands(user_input)
+            # The API key is optional, and only checked when one is entered.
+            if not errors and user_input.get(CONF_API_KEY):
+                errors = await self._validate_api_key(user_input[CONF_API_KEY])
+            if not errors:
                 return self.async_create_entry(title="", data=user_input)
-            except TibberPublicAuthError:
-                errors["base"] = "invalid_auth"
-            except (TibberPublicException, Exception):
-                _LOGGER.exception("Unexpected exception")
-                errors["base"] = "unknown"
 
         return self.async_show_form(
             step_id="init",
@@ -56,12 +68,82 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     vol.Optional(
                         CONF_API_KEY,
                         default=self.config_entry.options.get(CONF_API_KEY, ""),
-                    ): str
+                    ): str,
+                    vol.Optional(
+                        CONF_CHARGE_ENERGY,
+                        default=self.config_entry.options.get(
+                            CONF_CHARGE_ENERGY, DEFAULT_CHARGE_ENERGY
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_CHARGER_POWER,
+                        default=self.config_entry.options.get(
+                            CONF_CHARGER_POWER, DEFAULT_CHARGER_POWER
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0.1)),
+                    vol.Optional(
+                        CONF_SAVE_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_SAVE_INTERVAL, DEFAULT_SAVE_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                    vol.Optional(
+                        CONF_SESSION_RETENTION,
+                        default=self.config_entry.options.get(
+                            CONF_SESSION_RETENTION, DEFAULT_SESSION_RETENTION
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    **self._write_options_schema(),
                 }
             ),
             errors=errors,
         )
 
+    def _write_options_schema(self) -> dict:
+        """Return the write interval and deadband options of the throttled sensors."""
+        options = self.config_entry.options
+        schema = {}
+        for sensor_key in THROTTLED_SENSORS:
+            interval_key = option_key(sensor_key, CONF_MIN_WRITE_INTERVAL)
+            deadband_key = option_key(sensor_key, CONF_DEADBAND)
+            schema[
+                vol.Optional(
+                    interval_key,
+                    default=options.get(interval_key, DEFAULT_MIN_WRITE_INTERVAL),
+                )
+            ] = vol.All(vol.Coerce(int), vol.Range(min=0, max=3600))
+            schema[
+                vol.Optional(
+                    deadband_key, default=options.get(deadband_key, DEFAULT_DEADBAND)
+                )
+            ] = cv.string
+        return schema
+
+    @staticmethod
+    def _validate_deadbands(user_input: dict) -> dict[str, str]:
+        """Return an error for each deadband that cannot be parsed."""
+        errors = {}
+        for sensor_key in THROTTLED_SENSORS:
+            deadband_key = option_key(sensor_key, CONF_DEADBAND)
+            try:
+                parse_deadband(user_input.get(deadband_key, DEFAULT_DEADBAND))
+            except ValueError:
+                errors[deadband_key] = "invalid_deadband"
+        return errors
+
+    async def _validate_api_key(self, token: str) -> dict[str, str]:
+        """Return an error if the public API rejects the API key."""
+        try:
+            client = get_async_client(self.hass)
+            public_api = TibberPublicAPI(token, client)
+            await public_api.get_homes()
+        except TibberPublicAuthError:
+            return {"base": "invalid_auth"}
+        except (TibberPublicException, Exception):
+            _LOGGER.exception("Unexpected exception")
+            return {"base": "unknown"}
+        return {}
+
 
 class TibberGridRewardConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
@@ -218,9 +300,13 @@ class TibberGridRewardConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             ),
         )
 
-    async def async_step_reauth(self, user_input=None) -> FlowResult:
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
         """Handle a reauthentication flow."""
         self.entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None) -> FlowResult:
+        """Ask for the new password and API key."""
         errors = {}
 
         if user_input:
@@ -241,7 +327,7 @@ class TibberGridRewardConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors["base"] = "auth"
 
         return self.async_show_form(
-            step_id="reauth",
+            step_id="reauth_confirm",
             data_schema=vol.Schema(
                 {
                     vol.Required(
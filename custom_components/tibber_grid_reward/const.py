@@ -2,3 +2,31 @@
 
 DOMAIN = "tibber_grid_reward"
 CONF_API_KEY = "api_key"
+CONF_CHARGE_ENERGY = "charge_energy_kwh"
+CONF_CHARGER_POWER = "charger_power_kw"
+CONF_DEADBAND = "deadband"
+CONF_MIN_WRITE_INTERVAL = "min_write_interval"
+CONF_SAVE_INTERVAL = "save_interval"
+CONF_SESSION_RETENTION = "session_retention_days"
+
+DEFAULT_CHARGE_ENERGY = 20.0
+DEFAULT_CHARGER_POWER = 11.0
+DEFAULT_DEADBAND = "0"
+DEFAULT_MIN_WRITE_INTERVAL = 0
+DEFAULT_SAVE_INTERVAL = 60
+DEFAULT_SESSION_RETENTION = 730
+
+# Raw frames and events kept by the flight recorder, and the minimum
+# seconds between logged payloads of a stream.
+FLIGHT_RECORDER_SIZE = 100
+PAYLOAD_LOG_INTERVAL = 60
+
+# Window lengths, in hours, exposed as cheapest window sensors.
+CHEAPEST_WINDOW_HOURS = (1, 3)
+
+# Sensors whose writes can be throttled from the options.
+THROTTLED_SENSORS = (
+    "grid_reward_current_month",
+    "grid_reward_current_day",
+    "current_reward_session",
+)
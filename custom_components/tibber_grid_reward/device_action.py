@@ -5,7 +5,6 @@ from typing import Any
 
 import voluptuous as vol
 
-from homeassistant.components.device_automation import DEVICE_ACTION_BASE_SCHEMA
 from homeassistant.components.time import DOMAIN as TIME_DOMAIN, ATTR_TIME
 from homeassistant.const import CONF_DEVICE_ID, CONF_DOMAIN, CONF_ENTITY_ID, CONF_TYPE
 from homeassistant.core import Context, HomeAssistant
@@ -69,7 +68,7 @@ async def async_call_action_from_config(
     )
 
 
-ACTION_SCHEMA = DEVICE_ACTION_BASE_SCHEMA.extend(
+ACTION_SCHEMA = cv.DEVICE_ACTION_BASE_SCHEMA.extend(
     {
         vol.Required(CONF_ENTITY_ID): cv.entity_id,
         vol.Required(CONF_TYPE): vol.In(ACTION_TYPES),
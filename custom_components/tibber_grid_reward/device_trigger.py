@@ -0,0 +1,96 @@
+"""Provides device triggers for Tibber Grid Reward."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.components.device_automation import DEVICE_TRIGGER_BASE_SCHEMA
+from homeassistant.components.homeassistant.triggers import event as event_trigger
+from homeassistant.const import (
+    CONF_DEVICE_ID,
+    CONF_DOMAIN,
+    CONF_PLATFORM,
+    CONF_TYPE,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.trigger import TriggerActionType, TriggerInfo
+from homeassistant.helpers.typing import ConfigType
+
+from .const import DOMAIN
+from .events import (
+    EVENT_GRID_REWARD,
+    FLEX_DEVICE_TRIGGERS,
+    GRID_REWARD_TRIGGERS,
+    VEHICLE_TRIGGERS,
+)
+
+TRIGGER_TYPES = set(GRID_REWARD_TRIGGERS + VEHICLE_TRIGGERS)
+
+TRIGGER_SCHEMA = DEVICE_TRIGGER_BASE_SCHEMA.extend(
+    {
+        vol.Required(CONF_TYPE): vol.In(TRIGGER_TYPES),
+    }
+)
+
+
+def _trigger_types(hass: HomeAssistant, device: dr.DeviceEntry) -> tuple[str, ...]:
+    """Return the trigger types of a grid reward or flex device."""
+    for domain, identifier in device.identifiers:
+        if domain != DOMAIN:
+            continue
+        if identifier in device.config_entries:
+            return GRID_REWARD_TRIGGERS
+        for entry_id in device.config_entries:
+            entry = hass.config_entries.async_get_entry(entry_id)
+            if entry is None or entry.domain != DOMAIN:
+                continue
+            for flex_device in entry.data.get("flex_devices", []):
+                if flex_device["id"] == identifier:
+                    return (
+                        VEHICLE_TRIGGERS
+                        if flex_device["type"] == "vehicle"
+                        else FLEX_DEVICE_TRIGGERS
+                    )
+    return ()
+
+
+async def async_get_triggers(
+    hass: HomeAssistant, device_id: str
+) -> list[dict[str, Any]]:
+    """List device triggers for Tibber Grid Reward."""
+    device = dr.async_get(hass).async_get(device_id)
+    if device is None:
+        return []
+
+    return [
+        {
+            CONF_PLATFORM: "device",
+            CONF_DEVICE_ID: device_id,
+            CONF_DOMAIN: DOMAIN,
+            CONF_TYPE: trigger_type,
+        }
+        for trigger_type in _trigger_types(hass, device)
+    ]
+
+
+async def async_attach_trigger(
+    hass: HomeAssistant,
+    config: ConfigType,
+    action: TriggerActionType,
+    trigger_info: TriggerInfo,
+) -> CALLBACK_TYPE:
+    """Attach a trigger to the transition events of a device."""
+    event_config = event_trigger.TRIGGER_SCHEMA(
+        {
+            event_trigger.CONF_PLATFORM: "event",
+            event_trigger.CONF_EVENT_TYPE: EVENT_GRID_REWARD,
+            event_trigger.CONF_EVENT_DATA: {
+                CONF_DEVICE_ID: config[CONF_DEVICE_ID],
+                CONF_TYPE: config[CONF_TYPE],
+            },
+        }
+    )
+    return await event_trigger.async_attach_trigger(
+        hass, event_config, action, trigger_info, platform_type="device"
+    )
@@ -0,0 +1,44 @@
+"""Diagnostics support for Tibber Grid Reward."""
+from __future__ import annotations
+
+from itertools import chain
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_KEY, DOMAIN
+
+TO_REDACT = {
+    CONF_API_KEY,
+    "password",
+    "username",
+    "home_id",
+    "homeId",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the diagnostics of a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    entities = list(
+        chain(
+            entry_data["grid_reward_devices"],
+            chain.from_iterable(entry_data["flex_device_entities"].values()),
+        )
+    )
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "skipped_writes": sum(entity.skipped_writes for entity in entities),
+        "held_back_writes": sum(entity.held_back_writes for entity in entities),
+        "profiling": entry_data["profiler"].running,
+        "flight_recorder": async_redact_data(
+            entry_data["flight_recorder"].dump(), TO_REDACT
+        ),
+    }
@@ -0,0 +1,176 @@
+"""Shared entity helpers for Tibber Grid Reward."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    CONF_DEADBAND,
+    CONF_MIN_WRITE_INTERVAL,
+    DEFAULT_DEADBAND,
+    DEFAULT_MIN_WRITE_INTERVAL,
+)
+
+STATE_PROPERTIES = (
+    "available",
+    "native_value",
+    "is_on",
+    "native_unit_of_measurement",
+    "icon",
+    "extra_state_attributes",
+)
+VALUE_INDEX = STATE_PROPERTIES.index("native_value")
+
+
+def parse_deadband(value: str) -> tuple[float, bool]:
+    """Parse an absolute deadband like "0.05" or a relative one like "1%"."""
+    value = value.strip()
+    if value.endswith("%"):
+        deadband, relative = float(value[:-1]) / 100, True
+    else:
+        deadband, relative = float(value), False
+    if deadband < 0:
+        raise ValueError("The deadband must not be negative")
+    return deadband, relative
+
+
+def option_key(sensor_key: str, option: str) -> str:
+    """Return the options key of a write option of a sensor."""
+    return f"{sensor_key}_{option}"
+
+
+@dataclass(frozen=True, slots=True)
+class WritePolicy:
+    """When a changed state of an entity is worth writing.
+
+    A numeric value that moved less than the deadband since the last write,
+    or any change within the minimum interval after a write, is held back.
+    Changes held back by the interval are written when it expires.
+    """
+
+    min_interval: float = 0.0
+    deadband: float = 0.0
+    relative: bool = False
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any], sensor_key: str) -> WritePolicy | None:
+        """Return the policy of a sensor, or None if it writes every change."""
+        deadband, relative = parse_deadband(
+            options.get(option_key(sensor_key, CONF_DEADBAND), DEFAULT_DEADBAND)
+        )
+        policy = cls(
+            float(
+                options.get(
+                    option_key(sensor_key, CONF_MIN_WRITE_INTERVAL),
+                    DEFAULT_MIN_WRITE_INTERVAL,
+                )
+            ),
+            deadband,
+            relative,
+        )
+        return policy if policy != cls() else None
+
+    def within_deadband(self, old: Any, new: Any) -> bool:
+        """Return whether a new value is within the deadband of the old one."""
+        if not self.deadband or isinstance(old, bool) or isinstance(new, bool):
+            return False
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+            return False
+        band = self.deadband * abs(old) if self.relative else self.deadband
+        return abs(new - old) < band
+
+
+class WriteOnChangeMixin:
+    """Write the state only when it differs from the last written state.
+
+    Frames arrive every few seconds and mostly repeat the previous values.
+    Every state write goes through the state machine, the event bus and the
+    recorder, so writes of an unchanged state are skipped and counted. An
+    entity with a write policy also holds back small or frequent changes
+    until async_flush_pending_write is called or its interval expires, and
+    counts those separately.
+    """
+
+    # The state is pushed by the frames, polling would write it regardless.
+    _attr_should_poll = False
+    _last_written_state: tuple[Any, ...] | None = None
+    _last_write = 0.0
+    _unsub_flush = None
+    skipped_writes = 0
+    held_back_writes = 0
+    write_policy: WritePolicy | None = None
+
+    def _state_snapshot(self) -> tuple[Any, ...]:
+        """Return the values that make up the written state."""
+        snapshot = []
+        for name in STATE_PROPERTIES:
+            value = getattr(self, name, None)
+            # Copy attributes, as entities may reuse the same dict.
+            snapshot.append(dict(value) if isinstance(value, dict) else value)
+        return tuple(snapshot)
+
+    def _held_back(self, snapshot: tuple[Any, ...], now: float) -> bool:
+        """Return whether the write policy holds back a changed state."""
+        policy = self.write_policy
+        last = self._last_written_state
+        if policy is None or last is None:
+            return False
+        if snapshot[:VALUE_INDEX] + snapshot[VALUE_INDEX + 1:] == (
+            last[:VALUE_INDEX] + last[VALUE_INDEX + 1:]
+        ) and policy.within_deadband(last[VALUE_INDEX], snapshot[VALUE_INDEX]):
+            return True
+        remaining = self._last_write + policy.min_interval - now
+        if remaining <= 0:
+            return False
+        if self._unsub_flush is None and self.hass is not None:
+            self._unsub_flush = async_call_later(
+                self.hass, remaining, self._async_interval_expired
+            )
+        return True
+
+    @callback
+    def _async_interval_expired(self, _now) -> None:
+        """Write a change that was held back by the minimum interval."""
+        self._unsub_flush = None
+        self.async_write_ha_state_if_changed()
+
+    @callback
+    def async_write_ha_state_if_changed(self) -> None:
+        """Write the state to the state machine if it changed."""
+        snapshot = self._state_snapshot()
+        if snapshot == self._last_written_state:
+            self.skipped_writes += 1
+            return
+        now = monotonic()
+        if self._held_back(snapshot, now):
+            self.held_back_writes += 1
+            return
+        self._write(snapshot, now)
+
+    @callback
+    def async_flush_pending_write(self) -> None:
+        """Write a state that the write policy held back."""
+        snapshot = self._state_snapshot()
+        if snapshot != self._last_written_state:
+            self._write(snapshot, monotonic())
+
+    def _write(self, snapshot: tuple[Any, ...], now: float) -> None:
+        """Write the state and cancel a pending interval flush."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        self._last_written_state = snapshot
+        self._last_write = now
+        self.async_write_ha_state()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel a pending interval flush."""
+        await super().async_will_remove_from_hass()
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
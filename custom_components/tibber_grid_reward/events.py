@@ -0,0 +1,121 @@
+"""Transition events for Tibber Grid Reward."""
+from __future__ import annotations
+
+import logging
+
+from homeassistant.const import CONF_DEVICE_ID, CONF_TYPE
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+
+from .const import DOMAIN
+from .flight_recorder import FlightRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_GRID_REWARD = f"{DOMAIN}_event"
+
+TRIGGER_DELIVERING_STARTED = "delivering_started"
+TRIGGER_DELIVERING_STOPPED = "delivering_stopped"
+TRIGGER_STATE_CHANGED = "state_changed"
+TRIGGER_PLUGGED_IN = "plugged_in"
+TRIGGER_UNPLUGGED = "unplugged"
+
+GRID_REWARD_TRIGGERS = (
+    TRIGGER_DELIVERING_STARTED,
+    TRIGGER_DELIVERING_STOPPED,
+    TRIGGER_STATE_CHANGED,
+)
+FLEX_DEVICE_TRIGGERS = (TRIGGER_STATE_CHANGED,)
+VEHICLE_TRIGGERS = (TRIGGER_STATE_CHANGED, TRIGGER_PLUGGED_IN, TRIGGER_UNPLUGGED)
+
+DELIVERING = "GridRewardDelivering"
+
+
+class TransitionEvents:
+    """Fire an event on the bus for each grid reward or flex device transition.
+
+    Events carry the id of the device in the device registry, so device
+    triggers can match them. The previous states are the ones seen since
+    startup, not the stored ones, so the first state seen after a restart is
+    not a transition and fires nothing.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        flight_recorder: FlightRecorder | None = None,
+    ):
+        """Initialize the events."""
+        self._hass = hass
+        self._entry_id = entry_id
+        self._flight_recorder = flight_recorder
+        self._device_ids: dict[str, str] = {}
+        self._states: dict[str, str] = {}
+        self._plugged_in: dict[str, bool] = {}
+
+    def _device_id(self, identifier: str) -> str | None:
+        """Return the registry id of a device, looked up once."""
+        if identifier not in self._device_ids:
+            device = dr.async_get(self._hass).async_get_device(
+                identifiers={(DOMAIN, identifier)}
+            )
+            if device is None:
+                return None
+            self._device_ids[identifier] = device.id
+        return self._device_ids[identifier]
+
+    @callback
+    def _fire(self, identifier: str, trigger_type: str, **data) -> None:
+        """Fire a transition event for a device."""
+        _LOGGER.debug("Firing %s for %s: %s", trigger_type, identifier, data)
+        if self._flight_recorder is not None:
+            self._flight_recorder.record_event(trigger_type, identifier, data)
+        self._hass.bus.async_fire(
+            EVENT_GRID_REWARD,
+            {
+                CONF_DEVICE_ID: self._device_id(identifier),
+                CONF_TYPE: trigger_type,
+                "entry_id": self._entry_id,
+                **data,
+            },
+        )
+
+    def _previous_state(self, identifier: str, new_state: str | None) -> str | None:
+        """Remember the new state, and return the previous one if it changed."""
+        if new_state is None:
+            return None
+        old_state = self._states.get(identifier)
+        self._states[identifier] = new_state
+        return old_state if old_state != new_state else None
+
+    @callback
+    def grid_reward_state(self, new_state: str | None) -> None:
+        """Fire events for a change of the grid reward state."""
+        if (old_state := self._previous_state(self._entry_id, new_state)) is None:
+            return
+        self._fire(
+            self._entry_id, TRIGGER_STATE_CHANGED, from_state=old_state, to_state=new_state
+        )
+        if new_state == DELIVERING:
+            self._fire(self._entry_id, TRIGGER_DELIVERING_STARTED)
+        elif old_state == DELIVERING:
+            self._fire(self._entry_id, TRIGGER_DELIVERING_STOPPED)
+
+    @callback
+    def flex_device_state(self, device_id: str, new_state: str | None) -> None:
+        """Fire an event for a change of a flex device state."""
+        if (old_state := self._previous_state(device_id, new_state)) is None:
+            return
+        self._fire(
+            device_id, TRIGGER_STATE_CHANGED, from_state=old_state, to_state=new_state
+        )
+
+    @callback
+    def plugged_in(self, vehicle_id: str, plugged_in: bool) -> None:
+        """Fire an event when a vehicle is plugged in or unplugged."""
+        was_plugged_in = self._plugged_in.get(vehicle_id)
+        self._plugged_in[vehicle_id] = plugged_in
+        if was_plugged_in is None or was_plugged_in == plugged_in:
+            return
+        self._fire(vehicle_id, TRIGGER_PLUGGED_IN if plugged_in else TRIGGER_UNPLUGGED)
@@ -0,0 +1,85 @@
+"""Flight recorder of the raw frames and events of Tibber Grid Reward."""
+from __future__ import annotations
+
+import logging
+from collections import deque
+from time import monotonic, time
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import FLIGHT_RECORDER_SIZE, PAYLOAD_LOG_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+FRAME = "frame"
+EVENT = "event"
+
+
+class FlightRecorder:
+    """Keep the last raw frames and events, and log frame payloads sampled.
+
+    Records go into a ring buffer of a fixed size, which holds references to
+    the decoded payloads and copies nothing, so recording costs an append
+    per frame. The buffer is dumped by a service and in the diagnostics, so
+    full payloads are available after an incident without debug logging.
+
+    With debug logging enabled, at most one payload per stream, such as the
+    grid reward or one vehicle, is logged per interval, together with the
+    number of frames that were not logged since.
+    """
+
+    def __init__(
+        self,
+        size: int = FLIGHT_RECORDER_SIZE,
+        log_interval: float = PAYLOAD_LOG_INTERVAL,
+    ):
+        """Initialize the recorder."""
+        self._records: deque[tuple[float, str, str, str, Any]] = deque(maxlen=size)
+        self._log_interval = log_interval
+        self._last_logged: dict[tuple[str, str], float] = {}
+        self._not_logged: dict[tuple[str, str], int] = {}
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return len(self._records)
+
+    def record_frame(self, kind: str, key: str, payload: Any) -> None:
+        """Record a raw frame of a stream, and log it if it is sampled."""
+        self._records.append((time(), FRAME, kind, key, payload))
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            self._log_sampled(kind, key, payload)
+
+    def record_event(self, kind: str, key: str, data: Any) -> None:
+        """Record an event, such as a transition."""
+        self._records.append((time(), EVENT, kind, key, data))
+
+    def _log_sampled(self, kind: str, key: str, payload: Any) -> None:
+        """Log a payload, unless one of its stream was logged within the interval."""
+        stream = (kind, key)
+        now = monotonic()
+        last = self._last_logged.get(stream)
+        if last is not None and now - last < self._log_interval:
+            self._not_logged[stream] = self._not_logged.get(stream, 0) + 1
+            return
+        self._last_logged[stream] = now
+        _LOGGER.debug(
+            "%s frame for %s, %d not logged since the last one: %s",
+            kind,
+            key,
+            self._not_logged.pop(stream, 0),
+            payload,
+        )
+
+    def dump(self) -> list[dict[str, Any]]:
+        """Return the records, oldest first."""
+        return [
+            {
+                "time": dt_util.utc_from_timestamp(timestamp).isoformat(),
+                "type": record_type,
+                "kind": kind,
+                "key": key,
+                "data": data,
+            }
+            for timestamp, record_type, kind, key, data in self._records
+        ]
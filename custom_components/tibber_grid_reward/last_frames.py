@@ -0,0 +1,64 @@
+"""The last grid reward and vehicle state frames of Tibber Grid Reward."""
+from __future__ import annotations
+
+from typing import Any
+
+from .models import GridRewardSnapshot, VehicleState
+from .reward_ledger import RewardLedger
+
+
+class LastFrames:
+    """Keep the last frames in the ledger record, to restore entities at startup.
+
+    Entities are restored from these frames as soon as the entry is set up,
+    without waiting for the websocket. A frame is only stored, and the
+    ledger only saved, when it parses to a different snapshot than the last
+    one, so repeated frames cost a comparison.
+    """
+
+    def __init__(self, ledger: RewardLedger):
+        """Initialize the frames."""
+        self._ledger = ledger
+        self._grid_reward: GridRewardSnapshot | None = None
+        self._vehicles: dict[str, VehicleState] = {}
+
+    @property
+    def _data(self) -> dict[str, Any]:
+        """Return the frames part of the ledger record."""
+        return self._ledger.data.setdefault(
+            "last_frames", {"grid_reward": None, "vehicles": {}}
+        )
+
+    @property
+    def grid_reward(self) -> GridRewardSnapshot | None:
+        """Return the last grid reward snapshot, if any."""
+        if self._grid_reward is None and (payload := self._data["grid_reward"]):
+            self._grid_reward = GridRewardSnapshot.from_payload(payload)
+        return self._grid_reward
+
+    def vehicle(self, vehicle_id: str) -> VehicleState | None:
+        """Return the last state of a vehicle, if any."""
+        if vehicle_id not in self._vehicles:
+            payload = self._data["vehicles"].get(vehicle_id)
+            if payload is None:
+                return None
+            self._vehicles[vehicle_id] = VehicleState.from_payload(vehicle_id, payload)
+        return self._vehicles[vehicle_id]
+
+    def update_grid_reward(
+        self, snapshot: GridRewardSnapshot, payload: dict[str, Any]
+    ) -> None:
+        """Store a grid reward frame if its snapshot changed."""
+        if snapshot == self.grid_reward:
+            return
+        self._grid_reward = snapshot
+        self._data["grid_reward"] = payload
+        self._ledger.schedule_save()
+
+    def update_vehicle(self, vehicle: VehicleState, payload: dict[str, Any]) -> None:
+        """Store a vehicle state frame if its state changed."""
+        if vehicle == self.vehicle(vehicle.vehicle_id):
+            return
+        self._vehicles[vehicle.vehicle_id] = vehicle
+        self._data["vehicles"][vehicle.vehicle_id] = payload
+        self._ledger.schedule_save()
@@ -0,0 +1,103 @@
+"""Parsed grid reward and vehicle state frames for Tibber Grid Reward."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+VEHICLE = "vehicle"
+BATTERY = "battery"
+
+
+def _state_typename(payload: Mapping[str, Any]) -> str | None:
+    """Return the typename of the state of a grid reward or flex device payload."""
+    return (payload.get("state") or {}).get("__typename")
+
+
+@dataclass(frozen=True, slots=True)
+class FlexDevice:
+    """A vehicle or battery from a grid reward frame."""
+
+    id: str
+    type: str
+    state: str | None
+    is_plugged_in: bool
+
+    @property
+    def is_vehicle(self) -> bool:
+        """Return whether the device is a vehicle."""
+        return self.type == VEHICLE
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Any]) -> FlexDevice | None:
+        """Parse a flex device, or return None if it has no id."""
+        if vehicle_id := payload.get("vehicleId"):
+            return cls(
+                vehicle_id,
+                VEHICLE,
+                _state_typename(payload),
+                bool(payload.get("isPluggedIn")),
+            )
+        if battery_id := payload.get("batteryId"):
+            return cls(battery_id, BATTERY, _state_typename(payload), False)
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class GridRewardSnapshot:
+    """A gridRewardStatus frame.
+
+    Frames are parsed once when they arrive, so trackers and entities read
+    plain attributes instead of walking the nested payload each. Snapshots
+    are immutable and compare by value.
+    """
+
+    state: str | None = None
+    reason: str | None = None
+    reward_current_month: float | None = None
+    reward_all_time: float | None = None
+    currency: str | None = None
+    flex_devices: tuple[FlexDevice, ...] = ()
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Any]) -> GridRewardSnapshot:
+        """Parse a gridRewardStatus payload."""
+        state = payload.get("state") or {}
+        reasons = state.get("reasons")
+        flex_devices = []
+        for device_payload in payload.get("flexDevices") or ():
+            if device := FlexDevice.from_payload(device_payload):
+                flex_devices.append(device)
+        return cls(
+            state.get("__typename"),
+            ", ".join(reasons) if reasons else state.get("reason"),
+            payload.get("rewardCurrentMonth"),
+            payload.get("rewardAllTime"),
+            payload.get("rewardCurrency"),
+            tuple(flex_devices),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class VehicleState:
+    """A vehicleState frame, with the userSettings mapped by key."""
+
+    vehicle_id: str
+    settings: Mapping[str, Any]
+
+    @classmethod
+    def from_payload(
+        cls, vehicle_id: str, payload: Mapping[str, Any]
+    ) -> VehicleState:
+        """Parse a vehicleState payload."""
+        return cls(
+            vehicle_id,
+            MappingProxyType(
+                {
+                    setting["key"]: setting.get("value")
+                    for setting in payload.get("userSettings") or ()
+                    if setting.get("key")
+                }
+            ),
+        )
@@ -0,0 +1,110 @@
+"""On-demand profiling of the frame dispatch of Tibber Grid Reward."""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import pstats
+import time
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN
+
+TOP_FUNCTIONS = 20
+
+
+class FrameProfiler:
+    """Profile the callbacks that the websocket receive loops dispatch frames to.
+
+    While no profile runs, a wrapped callback costs one attribute check per
+    frame. While one runs, cProfile is only enabled for the duration of each
+    callback, so the profile holds what handling the frames costs the event
+    loop: parsing, trackers, events and entity writes, and nothing of the
+    rest of Home Assistant.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the profiler."""
+        self._hass = hass
+        self._profile: cProfile.Profile | None = None
+        self._frames = 0
+
+    @property
+    def running(self) -> bool:
+        """Return whether a profile is running."""
+        return self._profile is not None
+
+    def wrap(self, target: Callable[[Any], None]) -> Callable[[Any], None]:
+        """Return a callback that profiles the target while a profile runs."""
+
+        def profiled(payload: Any) -> None:
+            profile = self._profile
+            if profile is None:
+                target(payload)
+                return
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler, such as the profiler integration, is active.
+                target(payload)
+                return
+            self._frames += 1
+            try:
+                target(payload)
+            finally:
+                profile.disable()
+
+        return profiled
+
+    async def async_profile(self, duration: float) -> dict[str, Any]:
+        """Profile the frames of a number of seconds and write the statistics.
+
+        The pstats file is written to the configuration directory, where it
+        can be opened with snakeviz or turned into a flame graph with
+        flameprof. No file is written when no frames arrived.
+        """
+        if self._profile is not None:
+            raise HomeAssistantError("A profile is already running.")
+        self._profile = profile = cProfile.Profile()
+        self._frames = 0
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            self._profile = None
+
+        if not self._frames:
+            # pstats cannot represent an empty profile.
+            return {
+                "path": None,
+                "frames": 0,
+                "duration": duration,
+                "total_seconds": 0.0,
+                "top_functions": [],
+            }
+        path = self._hass.config.path(f"{DOMAIN}.{int(time.time())}.prof")
+        summary = await self._hass.async_add_executor_job(_write_stats, profile, path)
+        return {"path": path, "frames": self._frames, "duration": duration, **summary}
+
+
+def _write_stats(profile: cProfile.Profile, path: str) -> dict[str, Any]:
+    """Write the statistics of a profile, and return its top functions."""
+    stats = pstats.Stats(profile)
+    stats.dump_stats(path)
+    top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    return {
+        "total_seconds": round(stats.total_tt, 6),
+        "top_functions": [
+            {
+                "function": f"{file}:{line}({name})",
+                "calls": calls,
+                "own_seconds": round(own_time, 6),
+                "cumulative_seconds": round(cumulative_time, 6),
+            }
+            for (file, line, name), (_, calls, own_time, cumulative_time, _) in top[
+                :TOP_FUNCTIONS
+            ]
+        ],
+    }
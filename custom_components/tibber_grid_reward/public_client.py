@@ -1,5 +1,6 @@
 import logging
 import httpx
+from collections.abc import Callable
 from typing import Any, Dict, List
 
 _LOGGER = logging.getLogger(__name__)
@@ -25,6 +26,14 @@ class TibberPublicAPI:
         self.headers = {
             "Authorization": f"Bearer {self._token}",
         }
+        self.price_info: dict[str, Any] | None = None
+        self._price_callback: Callable[[dict[str, Any]], None] | None = None
+
+    def register_price_callback(
+        self, callback: Callable[[dict[str, Any]], None]
+    ) -> None:
+        """Register a callback for newly fetched price info."""
+        self._price_callback = callback
 
     async def get_homes(self) -> List[Dict[str, Any]]:
         """Fetch Tibber homes."""
@@ -94,7 +103,7 @@ class TibberPublicAPI:
             response.raise_for_status()
             _LOGGER.debug("Successfully fetched price info from public API.")
             data = response.json()
-            return data.get("data", {}).get("viewer", {}).get("home", {}).get(
+            price_info = data.get("data", {}).get("viewer", {}).get("home", {}).get(
                 "currentSubscription", {}
             ).get("priceInfo")
         except httpx.HTTPStatusError as e:
@@ -107,4 +116,10 @@ class TibberPublicAPI:
             _LOGGER.error(
                 "An unexpected error occurred while fetching price info: %s", e
             )
-            return None
\ No newline at end of file
+            return None
+
+        if price_info:
+            self.price_info = price_info
+            if self._price_callback:
+                self._price_callback(price_info)
+        return price_info
@@ -0,0 +1,194 @@
+"""Cumulative reward ledger for Tibber Grid Reward."""
+from __future__ import annotations
+
+import copy
+import logging
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DEFAULT_SAVE_INTERVAL
+from .storage import async_load_entry_store, entry_storage_key
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "tibber_grid_reward_ledger"
+DAILY_TRACKER_KEY = "tibber_grid_reward_daily_tracker"
+
+
+def _day_key(now: datetime) -> str:
+    """Return the ledger key of the local day."""
+    return now.date().isoformat()
+
+
+def _month_key(now: datetime) -> str:
+    """Return the ledger key of the local month."""
+    return f"{now.year}-{now.month:02d}"
+
+
+def _from_daily_tracker(daily_data: dict[str, Any], now: datetime) -> dict[str, Any]:
+    """Build the ledger record from the record of the daily tracker."""
+    monthly_reward = daily_data.get("last_known_monthly_reward")
+    # The cumulative reward starts at the monthly reward, so the start of
+    # the day carries over unchanged.
+    return {
+        "cumulative": monthly_reward or 0.0,
+        "last_monthly_reward": monthly_reward,
+        "day": _day_key(now),
+        "day_start": daily_data.get("reward_at_start_of_day", 0.0),
+        "month": _month_key(now),
+        "month_start": 0.0,
+        "reset_month": _month_key(now),
+        "sessions": {"active_session": None, "last_session": None, "rollups": {}},
+    }
+
+
+class RewardLedger:
+    """Monotonic cumulative reward, shared by the daily and session trackers.
+
+    The monthly reward reported by Tibber restarts every month. The ledger
+    adds its changes to a cumulative reward, and the day, month and session
+    figures are differences against marks in that cumulative reward. Only
+    the first drop in a new calendar month is the restart; other drops are
+    corrections and are subtracted. All tracker state lives in one record, written behind
+    with at most one write per save interval.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        save_interval: float = DEFAULT_SAVE_INTERVAL,
+    ):
+        """Initialize the ledger."""
+        self._hass = hass
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, entry_storage_key(STORAGE_KEY, entry_id)
+        )
+        self._save_interval = save_interval
+        self._save_pending = False
+        self.data: dict[str, Any] = {
+            "cumulative": 0.0,
+            "last_monthly_reward": None,
+            "day": None,
+            "day_start": 0.0,
+            "month": None,
+            "month_start": 0.0,
+            "reset_month": None,
+            "sessions": {
+                "active_session": None,
+                "last_session": None,
+                "rollups": {},
+            },
+        }
+
+    async def async_load(self):
+        """Load the ledger, migrating the daily tracker store it replaces."""
+        stored_data = await async_load_entry_store(
+            self._hass,
+            self._store,
+            Store(self._hass, STORAGE_VERSION, DAILY_TRACKER_KEY),
+        )
+        if stored_data and "cumulative" not in stored_data:
+            _LOGGER.debug("Moving the daily tracker store to the ledger.")
+            stored_data = _from_daily_tracker(stored_data, dt_util.now())
+            await self._store.async_save(stored_data)
+        if stored_data:
+            self.data = stored_data
+
+    async def async_flush(self):
+        """Write pending changes to the store immediately."""
+        if self._save_pending:
+            await self.async_save()
+
+    async def async_save(self):
+        """Write the record to the store."""
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def schedule_save(self):
+        """Schedule a write unless one is already pending."""
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, self._save_interval)
+
+    @callback
+    def _data_to_save(self):
+        """Return a copy of the latest data, as it is written in the executor."""
+        self._save_pending = False
+        return copy.deepcopy(self.data)
+
+    @callback
+    def _roll(self, now: datetime) -> bool:
+        """Mark the start of a new day or month at the current cumulative reward."""
+        rolled = False
+        for period, key in (("day", _day_key(now)), ("month", _month_key(now))):
+            if self.data[period] != key:
+                self.data[period] = key
+                self.data[f"{period}_start"] = self.data["cumulative"]
+                rolled = True
+        return rolled
+
+    @callback
+    def update_monthly_reward(
+        self, monthly_reward: float | None, now: datetime | None = None
+    ):
+        """Add the increment of the monthly reward to the cumulative reward."""
+        if monthly_reward is None:
+            return
+        changed = self._roll(dt_util.as_local(now or dt_util.now()))
+
+        last_monthly_reward = self.data["last_monthly_reward"]
+        if monthly_reward != last_monthly_reward:
+            if last_monthly_reward is None:
+                # Rewards earned before the first frame are not attributed
+                # to the current day.
+                self.data["cumulative"] = monthly_reward
+                self.data["day_start"] = monthly_reward
+                self.data["reset_month"] = self.data["month"]
+            else:
+                if (
+                    monthly_reward < last_monthly_reward
+                    and self.data["reset_month"] != self.data["month"]
+                ):
+                    # The restart may come a few frames into the new month.
+                    _LOGGER.debug("New month detected, monthly reward restarted.")
+                    increment = monthly_reward
+                    self.data["reset_month"] = self.data["month"]
+                else:
+                    increment = monthly_reward - last_monthly_reward
+                self.data["cumulative"] = round(self.data["cumulative"] + increment, 4)
+            self.data["last_monthly_reward"] = monthly_reward
+            changed = True
+
+        if changed:
+            self.schedule_save()
+
+    @property
+    def cumulative(self) -> float:
+        """Return the cumulative reward."""
+        return self.data["cumulative"]
+
+    @property
+    def day_reward(self) -> float:
+        """Return the reward of the current day."""
+        if self.data["day"] != _day_key(dt_util.now()):
+            return 0.0
+        return round(self.data["cumulative"] - self.data["day_start"], 4)
+
+    @property
+    def month_reward(self) -> float:
+        """Return the reward of the current month."""
+        if self.data["month"] != _month_key(dt_util.now()):
+            return 0.0
+        return round(self.data["cumulative"] - self.data["month_start"], 4)
+
+    @property
+    def sessions(self) -> dict[str, Any]:
+        """Return the session tracker's part of the record."""
+        return self.data["sessions"]
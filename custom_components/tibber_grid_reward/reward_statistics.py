@@ -0,0 +1,136 @@
+"""Long-term statistics for Tibber Grid Reward earnings."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.models import (
+        StatisticData,
+        StatisticMetaData,
+    )
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def hour_start(moment: datetime) -> datetime:
+    """Return the start of the UTC hour containing a moment."""
+    return dt_util.as_utc(moment).replace(minute=0, second=0, microsecond=0)
+
+
+class RewardStatistics:
+    """Buffer hourly reward rows and import them as external statistics.
+
+    Rows are kept per statistic and hour, and completed hours are written
+    in one batch per statistic shortly after each hour ends.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        """Initialize the statistics."""
+        self._hass = hass
+        object_id = entry_id.lower()
+        self.reward_statistic_id = f"{DOMAIN}:grid_reward_{object_id}"
+        self.session_statistic_id = f"{DOMAIN}:session_reward_{object_id}"
+        self._names = {
+            self.reward_statistic_id: "Grid Reward",
+            self.session_statistic_id: "Grid Reward Sessions",
+        }
+        self._currency: str | None = None
+        self._pending: dict[str, dict[datetime, StatisticData]] = {
+            self.reward_statistic_id: {},
+            self.session_statistic_id: {},
+        }
+        self._unsub_flush = None
+
+    @callback
+    def async_setup(self):
+        """Schedule the hourly batch write."""
+        self._unsub_flush = async_track_time_change(
+            self._hass, self._async_flush_completed, minute=0, second=10
+        )
+
+    @callback
+    def async_unload(self):
+        """Stop the hourly write and flush all buffered rows."""
+        if self._unsub_flush:
+            self._unsub_flush()
+            self._unsub_flush = None
+        self._flush(None)
+
+    @callback
+    def update_reward(
+        self, reward_all_time: float | None, currency: str | None, now: datetime | None = None
+    ):
+        """Record the cumulative reward for the current hour."""
+        if reward_all_time is None:
+            return
+        self._currency = currency or self._currency
+        start = hour_start(now or dt_util.utcnow())
+        self._pending[self.reward_statistic_id][start] = {
+            "start": start,
+            "state": reward_all_time,
+            "sum": reward_all_time,
+        }
+
+    @callback
+    def add_session(
+        self, session: dict[str, Any], session_total: float, currency: str | None = None
+    ):
+        """Record a completed session in the hour it ended."""
+        self._currency = currency or self._currency
+        start = hour_start(dt_util.parse_datetime(session["end_time"]))
+        self._pending[self.session_statistic_id][start] = {
+            "start": start,
+            "state": session_total,
+            "sum": session_total,
+        }
+
+    @callback
+    def import_rows(self, statistic_id: str, rows: list[StatisticData]):
+        """Buffer rows computed elsewhere, such as from a backfill."""
+        for row in rows:
+            self._pending[statistic_id][row["start"]] = row
+
+    @callback
+    def _async_flush_completed(self, now: datetime):
+        """Write all rows of hours that have ended."""
+        self._flush(hour_start(now))
+
+    @callback
+    def _flush(self, before: datetime | None):
+        """Write buffered rows that start before a time, in one batch per statistic."""
+        if "recorder" not in self._hass.config.components:
+            for rows in self._pending.values():
+                rows.clear()
+            return
+
+        # The recorder is loaded by now, so this import costs nothing, while
+        # importing it with the integration would load all of the recorder.
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        for statistic_id, rows in self._pending.items():
+            starts = sorted(
+                start for start in rows if before is None or start < before
+            )
+            if not starts:
+                continue
+            batch = [rows.pop(start) for start in starts]
+            _LOGGER.debug("Writing %d rows to %s.", len(batch), statistic_id)
+            metadata: StatisticMetaData = {
+                "has_mean": False,
+                "has_sum": True,
+                "name": self._names[statistic_id],
+                "source": DOMAIN,
+                "statistic_id": statistic_id,
+                "unit_of_measurement": self._currency,
+            }
+            async_add_external_statistics(self._hass, metadata, batch)
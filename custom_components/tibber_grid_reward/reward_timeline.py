@@ -0,0 +1,92 @@
+"""Reward timeline of an active grid reward session."""
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_right
+
+MAX_POINTS = 512
+RATE_WINDOW = 900.0
+TRACE_POINTS = 60
+
+
+class RewardTimeline:
+    """Timestamps and cumulative rewards of the active session.
+
+    Points are kept in two float arrays. A run of unchanged rewards keeps
+    only its first and last point, and the arrays are halved when they
+    reach the maximum size, so memory stays bounded for long sessions. The
+    reward rate is computed over a sliding window whose start index only
+    moves forward, so each new point costs O(1) amortized.
+    """
+
+    def __init__(self, max_points: int = MAX_POINTS, rate_window: float = RATE_WINDOW):
+        """Initialize the timeline."""
+        self._max_points = max_points
+        self._rate_window = rate_window
+        self.times = array("d")
+        self.rewards = array("d")
+        self._window_start = 0
+
+    def __len__(self) -> int:
+        """Return the number of points."""
+        return len(self.times)
+
+    def clear(self) -> None:
+        """Remove all points."""
+        del self.times[:]
+        del self.rewards[:]
+        self._window_start = 0
+
+    def add(self, timestamp: float, reward: float) -> None:
+        """Add the cumulative session reward at a timestamp."""
+        if (
+            len(self.rewards) >= 2
+            and self.rewards[-1] == reward
+            and self.rewards[-2] == reward
+        ):
+            # Extend the plateau instead of adding a point.
+            self.times[-1] = timestamp
+        else:
+            self.times.append(timestamp)
+            self.rewards.append(reward)
+            if len(self.times) > self._max_points:
+                self._downsample()
+
+        cutoff = timestamp - self._rate_window
+        last = len(self.times) - 1
+        while self._window_start < last and self.times[self._window_start + 1] <= cutoff:
+            self._window_start += 1
+
+    def _downsample(self) -> None:
+        """Keep every second point, and always the last one."""
+        last = len(self.times) - 1
+        indexes = list(range(0, last, 2)) + [last]
+        self.times = array("d", (self.times[index] for index in indexes))
+        self.rewards = array("d", (self.rewards[index] for index in indexes))
+        cutoff = self.times[-1] - self._rate_window
+        self._window_start = max(bisect_right(self.times, cutoff) - 1, 0)
+
+    @property
+    def rate_per_hour(self) -> float:
+        """Return the reward earned per hour over the rate window."""
+        if len(self.times) < 2:
+            return 0.0
+        elapsed = self.times[-1] - self.times[self._window_start]
+        if elapsed <= 0:
+            return 0.0
+        earned = self.rewards[-1] - self.rewards[self._window_start]
+        return round(earned / elapsed * 3600, 4)
+
+    def trace(self, points: int = TRACE_POINTS) -> list[list[float]]:
+        """Return at most ``points`` [seconds since start, reward] pairs."""
+        count = len(self.times)
+        if not count:
+            return []
+        step = max(1, math.ceil((count - 1) / max(points - 1, 1)))
+        indexes = list(range(0, count - 1, step)) + [count - 1]
+        start = self.times[0]
+        return [
+            [round(self.times[index] - start, 1), round(self.rewards[index], 4)]
+            for index in indexes
+        ]
@@ -1,17 +1,38 @@
 """Platform for sensor integration."""
+from datetime import timedelta
 import logging
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorEntity,
     SensorDeviceClass,
     SensorEntityDescription,
 )
+from homeassistant.const import PERCENTAGE, UnitOfTime
 from homeassistant.core import callback
 from homeassistant.util import dt as dt_util
-from .const import DOMAIN
+from .availability_forecast import FORECAST_WINDOW, AvailabilityHistogram
+from .charging_planner import ChargingPlanner
+from .cheapest_window import PriceWindow
+from .const import CHEAPEST_WINDOW_HOURS, DOMAIN, THROTTLED_SENSORS
+from .entity import WriteOnChangeMixin, WritePolicy
+from .models import FlexDevice, GridRewardSnapshot
 from .public_client import TibberPublicAPI
+from .state_time import GRID_REWARD_SUBJECT, StateTimeTracker
 
 _LOGGER = logging.getLogger(__name__)
 
+# The time in state sensors are refreshed on transitions, and otherwise at
+# most once per interval, so frames without a transition write nothing.
+STATE_TIME_REFRESH_INTERVAL = 300
+
+
+def _state_time_key(state_tracker: StateTimeTracker) -> tuple[int, int]:
+    """Return a key that changes on transitions and every refresh interval."""
+    return (
+        state_tracker.version,
+        int(dt_util.utcnow().timestamp() // STATE_TIME_REFRESH_INTERVAL),
+    )
+
 
 PRICE_SENSOR_DESCRIPTION = SensorEntityDescription(
     key="current_price",
@@ -19,6 +40,21 @@ PRICE_SENSOR_DESCRIPTION = SensorEntityDescription(
     device_class=SensorDeviceClass.MONETARY,
 )
 
+CHEAPEST_WINDOW_SENSORS: tuple[SensorEntityDescription, ...] = tuple(
+    SensorEntityDescription(
+        key=f"cheapest_window_{hours}h",
+        name=f"Cheapest {hours}h Window",
+        device_class=SensorDeviceClass.TIMESTAMP,
+    )
+    for hours in CHEAPEST_WINDOW_HOURS
+)
+
+PLANNED_CHARGING_SENSOR_DESCRIPTION = SensorEntityDescription(
+    key="planned_charging",
+    name="Planned Charging",
+    device_class=SensorDeviceClass.TIMESTAMP,
+)
+
 
 GRID_REWARD_SENSORS: tuple[SensorEntityDescription, ...] = (
     SensorEntityDescription(
@@ -49,6 +85,49 @@ GRID_REWARD_SENSORS: tuple[SensorEntityDescription, ...] = (
         name="Current Reward Session",
         device_class=SensorDeviceClass.MONETARY,
     ),
+    SensorEntityDescription(
+        key="reward_rate",
+        name="Reward Rate",
+    ),
+)
+SESSION_ROLLUP_SENSORS: dict[str, SensorEntityDescription] = {
+    period: SensorEntityDescription(
+        key=f"reward_sessions_{suffix}",
+        name=f"Reward Sessions {label}",
+        device_class=SensorDeviceClass.MONETARY,
+    )
+    for period, suffix, label in (
+        ("day", "today", "Today"),
+        ("week", "this_week", "This Week"),
+        ("month", "this_month", "This Month"),
+        ("year", "this_year", "This Year"),
+    )
+}
+
+STATE_TIME_SENSORS: dict[str, SensorEntityDescription] = {
+    period: SensorEntityDescription(
+        key=f"delivering_time_{suffix}",
+        name=f"Grid Reward Delivering {label}",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+    )
+    for period, suffix, label in (
+        ("day", "today", "Today"),
+        ("month", "this_month", "This Month"),
+    )
+}
+
+DELIVERING_FORECAST_SENSOR_DESCRIPTION = SensorEntityDescription(
+    key="delivering_forecast",
+    name="Grid Reward Delivering Forecast",
+    native_unit_of_measurement=PERCENTAGE,
+)
+
+FLEX_DEVICE_STATE_TIME_SENSOR_DESCRIPTION = SensorEntityDescription(
+    key="state_time_today",
+    name="Time In State Today",
+    device_class=SensorDeviceClass.DURATION,
+    native_unit_of_measurement=UnitOfTime.HOURS,
 )
 
 FLEX_DEVICE_SENSORS: tuple[SensorEntityDescription, ...] = (
@@ -71,6 +150,9 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     flex_devices = entry_data["flex_devices"]
     daily_tracker = entry_data["daily_tracker"]
     session_tracker = entry_data["session_tracker"]
+    planner = entry_data["planner"]
+    state_tracker = entry_data["state_tracker"]
+    histogram = entry_data["histogram"]
 
     sensors = []
     if public_api:
@@ -82,6 +164,25 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
                 PRICE_SENSOR_DESCRIPTION,
             )
         )
+        price_sensors = [
+            CheapestWindowSensor(config_entry.entry_id, timedelta(hours=hours), description)
+            for hours, description in zip(CHEAPEST_WINDOW_HOURS, CHEAPEST_WINDOW_SENSORS)
+        ]
+        hass.data[DOMAIN][config_entry.entry_id]["price_devices"].extend(price_sensors)
+        sensors.extend(price_sensors)
+
+        plan_sensors = [
+            PlannedChargingSensor(
+                config_entry.entry_id,
+                device,
+                planner,
+                PLANNED_CHARGING_SENSOR_DESCRIPTION,
+            )
+            for device in flex_devices
+            if device["type"] == "vehicle"
+        ]
+        hass.data[DOMAIN][config_entry.entry_id]["plan_devices"].extend(plan_sensors)
+        sensors.extend(plan_sensors)
 
     grid_reward_sensors = []
     for description in GRID_REWARD_SENSORS:
@@ -91,7 +192,11 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
                     api, config_entry.entry_id, daily_tracker, description
                 )
             )
-        elif description.key in ("last_reward_session", "current_reward_session"):
+        elif description.key in (
+            "last_reward_session",
+            "current_reward_session",
+            "reward_rate",
+        ):
             grid_reward_sensors.append(
                 RewardSessionSensor(
                     api, config_entry.entry_id, session_tracker, description
@@ -102,20 +207,60 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
                 GridRewardSensor(api, config_entry.entry_id, description)
             )
 
-    for device in flex_devices:
-        for description in FLEX_DEVICE_SENSORS:
-            grid_reward_sensors.append(
-                FlexDeviceSensor(api, config_entry.entry_id, device, description)
+    for period, description in SESSION_ROLLUP_SENSORS.items():
+        grid_reward_sensors.append(
+            SessionRollupSensor(
+                api, config_entry.entry_id, session_tracker, period, description
+            )
+        )
+
+    for period, description in STATE_TIME_SENSORS.items():
+        grid_reward_sensors.append(
+            StateTimeSensor(
+                api, config_entry.entry_id, state_tracker, period, description
+            )
+        )
+
+    grid_reward_sensors.append(
+        DeliveringForecastSensor(
+            api,
+            config_entry.entry_id,
+            histogram,
+            DELIVERING_FORECAST_SENSOR_DESCRIPTION,
+        )
+    )
+
+    for sensor in grid_reward_sensors:
+        if sensor.entity_description.key in THROTTLED_SENSORS:
+            sensor.write_policy = WritePolicy.from_options(
+                config_entry.options, sensor.entity_description.key
             )
 
     hass.data[DOMAIN][config_entry.entry_id]["grid_reward_devices"].extend(
         grid_reward_sensors
     )
     sensors.extend(grid_reward_sensors)
+
+    for device in flex_devices:
+        device_sensors = [
+            FlexDeviceSensor(api, config_entry.entry_id, device, description)
+            for description in FLEX_DEVICE_SENSORS
+        ]
+        device_sensors.append(
+            FlexDeviceStateTimeSensor(
+                api,
+                config_entry.entry_id,
+                device,
+                state_tracker,
+                FLEX_DEVICE_STATE_TIME_SENSOR_DESCRIPTION,
+            )
+        )
+        entry_data["flex_device_entities"][device["id"]].extend(device_sensors)
+        sensors.extend(device_sensors)
     async_add_entities(sensors)
 
 
-class GridRewardSensor(SensorEntity):
+class GridRewardSensor(WriteOnChangeMixin, RestoreSensor):
     """Base class for Tibber Grid Reward sensors."""
 
     entity_description: SensorEntityDescription
@@ -124,7 +269,6 @@ class GridRewardSensor(SensorEntity):
         self.entity_description = description
         self._api = api
         self._entry_id = entry_id
-        self._attributes = {}
         self._attr_unique_id = f"{self._entry_id}_{description.key}"
 
     @property
@@ -135,27 +279,31 @@ class GridRewardSensor(SensorEntity):
             "manufacturer": "Tibber",
         }
 
+    async def async_added_to_hass(self) -> None:
+        """Restore the last state until the first update."""
+        await super().async_added_to_hass()
+        if self._last_written_state is not None:
+            return
+        if last_sensor_data := await self.async_get_last_sensor_data():
+            self._attr_native_value = last_sensor_data.native_value
+            self._attr_native_unit_of_measurement = (
+                last_sensor_data.native_unit_of_measurement
+            )
+
     @callback
-    def update_data(self, data):
-        _LOGGER.debug(
-            "Updating grid reward sensor %s with data: %s", self.unique_id, data
-        )
-        self._attributes = data
-        self._attr_native_value = self._get_state(data)
-        self.async_write_ha_state()
+    def update_data(self, snapshot: GridRewardSnapshot):
+        self._attr_native_value = self._get_state(snapshot)
+        self.async_write_ha_state_if_changed()
 
-    def _get_state(self, data):
+    def _get_state(self, snapshot: GridRewardSnapshot):
         """Get the state of the sensor."""
         if self.entity_description.key == "grid_reward_state":
-            return data.get("state", {}).get("__typename")
+            return snapshot.state
         if self.entity_description.key == "grid_reward_reason":
-            reasons = data.get("state", {}).get("reasons")
-            if reasons:
-                return ", ".join(reasons)
-            return data.get("state", {}).get("reason")
+            return snapshot.reason
         if self.entity_description.key == "grid_reward_current_month":
-            self._attr_native_unit_of_measurement = data.get("rewardCurrency")
-            return data.get("rewardCurrentMonth")
+            self._attr_native_unit_of_measurement = snapshot.currency
+            return snapshot.reward_current_month
         return None
 
 
@@ -167,9 +315,9 @@ class GridRewardCurrentDaySensor(GridRewardSensor):
         super().__init__(api, entry_id, description)
         self._tracker = tracker
 
-    def _get_state(self, data):
+    def _get_state(self, snapshot: GridRewardSnapshot):
         """Get the state of the sensor."""
-        self._attr_native_unit_of_measurement = data.get("rewardCurrency")
+        self._attr_native_unit_of_measurement = snapshot.currency
         return round(self._tracker.daily_reward, 2)
 
 
@@ -183,7 +331,7 @@ class RewardSessionSensor(GridRewardSensor):
         super().__init__(api, entry_id, description)
         self._session_tracker = session_tracker
 
-    def _get_state(self, data):
+    def _get_state(self, snapshot: GridRewardSnapshot):
         """Get the state of the sensor."""
         if self.entity_description.key == "last_reward_session":
             last_session = self._session_tracker.last_session
@@ -193,17 +341,112 @@ class RewardSessionSensor(GridRewardSensor):
                     "end_time": last_session["end_time"],
                     "duration_minutes": last_session["duration_minutes"],
                     "reward": last_session["reward"],
-                    "currency": data.get("rewardCurrency"),
+                    "currency": snapshot.currency,
                 }
                 return dt_util.parse_datetime(last_session["end_time"])
             return None
         if self.entity_description.key == "current_reward_session":
-            self._attr_native_unit_of_measurement = data.get("rewardCurrency")
+            self._attr_native_unit_of_measurement = snapshot.currency
             return self._session_tracker.current_session_reward
+        if self.entity_description.key == "reward_rate":
+            currency = snapshot.currency
+            self._attr_native_unit_of_measurement = f"{currency}/h" if currency else None
+            return self._session_tracker.reward_rate
         return None
 
 
-class FlexDeviceSensor(SensorEntity):
+class SessionRollupSensor(GridRewardSensor):
+    """Representation of the reward sessions of the current day, week, month or year."""
+
+    def __init__(
+        self,
+        api,
+        entry_id,
+        session_tracker,
+        period: str,
+        description: SensorEntityDescription,
+    ):
+        """Initialize the sensor."""
+        super().__init__(api, entry_id, description)
+        self._session_tracker = session_tracker
+        self._period = period
+
+    def _get_state(self, snapshot: GridRewardSnapshot):
+        """Get the state of the sensor."""
+        self._attr_native_unit_of_measurement = snapshot.currency
+        bucket = self._session_tracker.rollups.current(self._period) or {}
+        self._attr_extra_state_attributes = {
+            "count": bucket.get("count", 0),
+            "total_duration_minutes": bucket.get("total_duration_minutes", 0.0),
+            "best_session": bucket.get("best_session"),
+        }
+        return bucket.get("total_reward", 0.0)
+
+
+class StateTimeSensor(GridRewardSensor):
+    """Representation of the time spent delivering during the current day or month."""
+
+    def __init__(
+        self,
+        api,
+        entry_id,
+        state_tracker: StateTimeTracker,
+        period: str,
+        description: SensorEntityDescription,
+    ):
+        """Initialize the sensor."""
+        super().__init__(api, entry_id, description)
+        self._state_tracker = state_tracker
+        self._period = period
+        self._refresh_key = None
+
+    def _get_state(self, snapshot: GridRewardSnapshot):
+        """Get the state of the sensor."""
+        refresh_key = _state_time_key(self._state_tracker)
+        if refresh_key != self._refresh_key:
+            self._refresh_key = refresh_key
+            summary = self._state_tracker.summary(GRID_REWARD_SUBJECT, self._period)
+            self._attr_extra_state_attributes = summary
+            self._attr_native_value = summary["hours"].get("GridRewardDelivering", 0.0)
+        return self._attr_native_value
+
+
+class DeliveringForecastSensor(GridRewardSensor):
+    """Representation of the probability of delivering in the coming hours."""
+
+    def __init__(
+        self,
+        api,
+        entry_id,
+        histogram: AvailabilityHistogram,
+        description: SensorEntityDescription,
+    ):
+        """Initialize the sensor."""
+        super().__init__(api, entry_id, description)
+        self._histogram = histogram
+        self._forecast_key = None
+
+    def _get_state(self, snapshot: GridRewardSnapshot):
+        """Get the state of the sensor."""
+        now = dt_util.now()
+        forecast_key = (
+            now.replace(minute=0, second=0, microsecond=0),
+            self._histogram.version,
+        )
+        if forecast_key != self._forecast_key:
+            # The forecast only changes with the hour or the histogram.
+            self._forecast_key = forecast_key
+            self._attr_extra_state_attributes = {
+                "forecast": self._histogram.forecast(now)
+            }
+            probability = self._histogram.delivering_probability(now, FORECAST_WINDOW)
+            self._attr_native_value = (
+                round(probability * 100, 1) if probability is not None else None
+            )
+        return self._attr_native_value
+
+
+class FlexDeviceSensor(WriteOnChangeMixin, RestoreSensor):
     """Base class for Flex Device sensors."""
 
     entity_description: SensorEntityDescription
@@ -215,7 +458,6 @@ class FlexDeviceSensor(SensorEntity):
         self._device_id = device["id"]
         self._device_type = device["type"]
         self._device_name = device.get("name", self._device_id)
-        self._attributes = {}
         self._attr_unique_id = f"{self._device_id}_{description.key}"
         self._attr_name = f"{self._device_name} {description.name}"
 
@@ -228,40 +470,152 @@ class FlexDeviceSensor(SensorEntity):
             "via_device": (DOMAIN, self._entry_id),
         }
 
+    async def async_added_to_hass(self) -> None:
+        """Restore the last state until the first update."""
+        await super().async_added_to_hass()
+        if self._last_written_state is not None:
+            return
+        if last_sensor_data := await self.async_get_last_sensor_data():
+            self._attr_native_value = last_sensor_data.native_value
+            self._attr_native_unit_of_measurement = (
+                last_sensor_data.native_unit_of_measurement
+            )
+
     @callback
-    def update_data(self, data):
-        _LOGGER.debug(
-            "Updating flex device sensor %s with data: %s", self.unique_id, data
-        )
-        flex_devices = data.get("flexDevices", [])
-        device_id_key = (
-            "vehicleId" if self._device_type == "vehicle" else "batteryId"
-        )
-        for device in flex_devices:
-            if device.get(device_id_key) == self._device_id:
-                self._attributes = device
-                self._attr_native_value = self._get_state(device)
-                self.async_write_ha_state()
-                break
-
-    def _get_state(self, data):
+    def update_data(self, device: FlexDevice):
+        """Update the sensor with its own flex device."""
+        self._attr_native_value = self._get_state(device)
+        self.async_write_ha_state_if_changed()
+
+    def _get_state(self, device: FlexDevice):
         """Get the state of the sensor."""
         if self.entity_description.key == "state":
-            return data.get("state", {}).get("__typename")
+            return device.state
         if self.entity_description.key == "connectivity":
             if self._device_type == "vehicle":
-                is_plugged_in = data.get("isPluggedIn")
                 self._attr_icon = (
                     "mdi:car-electric"
-                    if is_plugged_in
+                    if device.is_plugged_in
                     else "mdi:car-electric-outline"
                 )
-                return "Plugged In" if is_plugged_in else "Unplugged"
+                return "Plugged In" if device.is_plugged_in else "Unplugged"
             self._attr_icon = "mdi:battery"
             return "Online"  # Placeholder for battery
         return None
 
 
+class FlexDeviceStateTimeSensor(FlexDeviceSensor):
+    """Representation of the time a flex device spent in its current state today."""
+
+    def __init__(
+        self,
+        api,
+        entry_id,
+        device,
+        state_tracker: StateTimeTracker,
+        description: SensorEntityDescription,
+    ):
+        """Initialize the sensor."""
+        super().__init__(api, entry_id, device, description)
+        self._state_tracker = state_tracker
+        self._refresh_key = None
+
+    def _get_state(self, device: FlexDevice):
+        """Get the state of the sensor."""
+        refresh_key = _state_time_key(self._state_tracker)
+        if refresh_key != self._refresh_key:
+            self._refresh_key = refresh_key
+            summary = self._state_tracker.summary(self._device_id, "day")
+            self._attr_extra_state_attributes = summary
+            self._attr_native_value = summary["hours"].get(
+                self._state_tracker.state(self._device_id), 0.0
+            )
+        return self._attr_native_value
+
+
+class CheapestWindowSensor(WriteOnChangeMixin, SensorEntity):
+    """Representation of the cheapest upcoming price window of a fixed length."""
+
+    entity_description: SensorEntityDescription
+
+    def __init__(
+        self, entry_id, duration: timedelta, description: SensorEntityDescription
+    ):
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._entry_id = entry_id
+        self._duration = duration
+        self._attr_unique_id = f"{self._entry_id}_{description.key}"
+        self._attr_extra_state_attributes = {}
+
+    @property
+    def device_info(self):
+        """Return device information."""
+        return {
+            "identifiers": {(DOMAIN, self._entry_id)},
+            "name": "Tibber Grid Reward",
+            "manufacturer": "Tibber",
+        }
+
+    @callback
+    def update_data(self, windows: dict[timedelta, PriceWindow | None]):
+        """Update the sensor from the cheapest windows of the current prices."""
+        window = windows.get(self._duration)
+        if window:
+            self._attr_native_value = window.start
+            self._attr_extra_state_attributes = {
+                "end": window.end.isoformat(),
+                "average_price": round(window.average_price, 4),
+                "slots": window.slots,
+            }
+        else:
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = {}
+        self.async_write_ha_state_if_changed()
+
+
+class PlannedChargingSensor(WriteOnChangeMixin, SensorEntity):
+    """Representation of the planned charging schedule of a vehicle."""
+
+    entity_description: SensorEntityDescription
+
+    def __init__(
+        self,
+        entry_id,
+        device,
+        planner: ChargingPlanner,
+        description: SensorEntityDescription,
+    ):
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._entry_id = entry_id
+        self._planner = planner
+        self._device_id = device["id"]
+        self._device_name = device.get("name", self._device_id)
+        self._attr_unique_id = f"{self._device_id}_{description.key}"
+        self._attr_name = f"{self._device_name} {description.name}"
+        self._attr_extra_state_attributes = {}
+
+    @property
+    def device_info(self):
+        """Return device information."""
+        return {
+            "identifiers": {(DOMAIN, self._device_id)},
+        }
+
+    @callback
+    def update_data(self):
+        """Update the sensor from the current charging plan."""
+        plan = self._planner.plan(self._device_id, dt_util.now())
+        plugged_in = self._planner.is_plugged_in(self._device_id)
+        self._attr_native_value = plan.next_start if plugged_in else None
+        self._attr_extra_state_attributes = {
+            **plan.as_dict(),
+            "plugged_in": plugged_in,
+        }
+        self.async_write_ha_state_if_changed()
+
+
 class PriceSensor(SensorEntity):
     """Representation of a Tibber price sensor."""
 
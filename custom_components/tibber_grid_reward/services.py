@@ -0,0 +1,270 @@
+"""Services of Tibber Grid Reward."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .diagnostics import TO_REDACT
+from .session_rollups import PERIODS, period_key
+
+CONF_ENTRY_ID = "entry_id"
+
+# Services without a device act on one entry, which may be left out when
+# only one entry is loaded.
+ENTRY_SCHEMA = {vol.Optional(CONF_ENTRY_ID): cv.string}
+
+FIND_CHEAPEST_WINDOW_SCHEMA = vol.Schema(
+    {
+        vol.Required("duration"): vol.All(
+            cv.ensure_list, [cv.positive_time_period]
+        ),
+        vol.Optional("before"): cv.datetime,
+        **ENTRY_SCHEMA,
+    }
+)
+
+GET_SESSION_ROLLUPS_SCHEMA = vol.Schema(
+    {
+        vol.Required("period"): vol.In(PERIODS),
+        vol.Optional("date"): cv.date,
+        **ENTRY_SCHEMA,
+    }
+)
+
+GET_AVAILABILITY_PROFILE_SCHEMA = vol.Schema(ENTRY_SCHEMA)
+
+DUMP_FLIGHT_RECORDER_SCHEMA = vol.Schema(ENTRY_SCHEMA)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("duration", default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        **ENTRY_SCHEMA,
+    }
+)
+
+PLAN_CHARGING_SCHEMA = vol.Schema(
+    {
+        vol.Required("device_id"): cv.string,
+        vol.Optional("energy"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional("power"): vol.All(vol.Coerce(float), vol.Range(min=0.1)),
+        vol.Optional("departure"): cv.datetime,
+    }
+)
+
+
+def _entry_data(hass: HomeAssistant, call: ServiceCall) -> dict[str, Any]:
+    """Return the data of the loaded entry that a service call is for."""
+    entries = hass.data.get(DOMAIN, {})
+    if (entry_id := call.data.get(CONF_ENTRY_ID)) is not None:
+        if entry_id not in entries:
+            raise HomeAssistantError(f"Tibber Grid Reward entry {entry_id} is not loaded.")
+        return entries[entry_id]
+    if not entries:
+        raise HomeAssistantError("No Tibber Grid Reward entry is loaded.")
+    if len(entries) > 1:
+        raise HomeAssistantError(
+            "Several Tibber Grid Reward entries are loaded, select one with entry_id."
+        )
+    return next(iter(entries.values()))
+
+
+def _device_entry_data(
+    hass: HomeAssistant, device_id: str
+) -> tuple[str, dict[str, Any]] | None:
+    """Return the flex device id of a device, and the data of its loaded entry."""
+    device = dr.async_get(hass).async_get(device_id)
+    if not device:
+        return None
+    entries = hass.data.get(DOMAIN, {})
+    entry_id = next(
+        (entry_id for entry_id in device.config_entries if entry_id in entries), None
+    )
+    flex_device_id = next(
+        (identifier for domain, identifier in device.identifiers if domain == DOMAIN),
+        None,
+    )
+    if entry_id is None or flex_device_id is None:
+        return None
+    return flex_device_id, entries[entry_id]
+
+
+def _public_api(entry_data: dict[str, Any]):
+    """Return the public API of an entry, which needs an API key."""
+    if entry_data["public_api"] is None:
+        raise HomeAssistantError("This service needs an API key in the integration options.")
+    return entry_data["public_api"]
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services, which act on the entry of a device or entry_id."""
+
+    async def set_departure_time(call: ServiceCall):
+        """Handle the service call to set the departure time."""
+        day = call.data.get("day")
+        time_str = call.data.get("time")
+
+        if not (target := _device_entry_data(hass, call.data.get("device_id"))):
+            return
+        vehicle_id, entry_data = target
+
+        await entry_data["api"].set_departure_time(
+            home_id=entry_data["home_id"],
+            vehicle_id=vehicle_id,
+            day=day,
+            time_str=time_str if time_str else None,
+        )
+
+    hass.services.async_register(DOMAIN, "set_departure_time", set_departure_time)
+
+    async def find_cheapest_window(call: ServiceCall) -> ServiceResponse:
+        """Handle the service call to find the cheapest price windows."""
+        entry_data = _entry_data(hass, call)
+        public_api = _public_api(entry_data)
+        window_finder = entry_data["window_finder"]
+        if window_finder.slots is None:
+            await public_api.get_price_info(entry_data["home_id"])
+
+        durations = call.data["duration"]
+        before = call.data.get("before")
+        windows = window_finder.find(
+            durations,
+            after=dt_util.now(),
+            before=dt_util.as_local(before) if before else None,
+        )
+        return {
+            "windows": [
+                window.as_dict()
+                if window
+                else {
+                    "duration_minutes": round(duration.total_seconds() / 60),
+                    "slots": window_finder.slots_for(duration),
+                    "start": None,
+                    "end": None,
+                    "average_price": None,
+                }
+                for duration, window in windows.items()
+            ]
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        "find_cheapest_window",
+        find_cheapest_window,
+        schema=FIND_CHEAPEST_WINDOW_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def plan_charging(call: ServiceCall) -> ServiceResponse:
+        """Handle the service call to plan charging before departure."""
+        if not (target := _device_entry_data(hass, call.data["device_id"])):
+            raise HomeAssistantError(
+                f"Device {call.data['device_id']} is not a Tibber Grid Reward vehicle."
+            )
+        vehicle_id, entry_data = target
+        public_api = _public_api(entry_data)
+        window_finder = entry_data["window_finder"]
+        planner = entry_data["planner"]
+        if window_finder.slots is None:
+            await public_api.get_price_info(entry_data["home_id"])
+            planner.update_prices(window_finder.slots)
+
+        departure = call.data.get("departure")
+        plan = planner.plan(
+            vehicle_id,
+            dt_util.now(),
+            energy_kwh=call.data.get("energy"),
+            power_kw=call.data.get("power"),
+            departure=dt_util.as_local(departure) if departure else None,
+        )
+        return {
+            **plan.as_dict(),
+            "plugged_in": planner.is_plugged_in(vehicle_id),
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        "plan_charging",
+        plan_charging,
+        schema=PLAN_CHARGING_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def get_session_rollups(call: ServiceCall) -> ServiceResponse:
+        """Handle the service call to query reward session rollups."""
+        session_tracker = _entry_data(hass, call)["session_tracker"]
+        period = call.data["period"]
+        day = call.data.get("date")
+        if day:
+            return {
+                "period": period,
+                "key": period_key(period, day),
+                "rollup": session_tracker.rollups.get(period, day),
+            }
+        return {"period": period, "rollups": session_tracker.rollups.data[period]}
+
+    hass.services.async_register(
+        DOMAIN,
+        "get_session_rollups",
+        get_session_rollups,
+        schema=GET_SESSION_ROLLUPS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def get_availability_profile(call: ServiceCall) -> ServiceResponse:
+        """Handle the service call to query the hour-of-week availability profile."""
+        histogram = _entry_data(hass, call)["histogram"]
+        return {
+            "profile": histogram.profile(),
+            "forecast": histogram.forecast(),
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        "get_availability_profile",
+        get_availability_profile,
+        schema=GET_AVAILABILITY_PROFILE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def dump_flight_recorder(call: ServiceCall) -> ServiceResponse:
+        """Handle the service call to dump the last raw frames and events."""
+        records = _entry_data(hass, call)["flight_recorder"].dump()
+        return {"records": async_redact_data(records, TO_REDACT)}
+
+    hass.services.async_register(
+        DOMAIN,
+        "dump_flight_recorder",
+        dump_flight_recorder,
+        schema=DUMP_FLIGHT_RECORDER_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def profile(call: ServiceCall) -> ServiceResponse:
+        """Handle the service call to profile the frame dispatch."""
+        profiler = _entry_data(hass, call)["profiler"]
+        return await profiler.async_profile(call.data["duration"])
+
+    hass.services.async_register(
+        DOMAIN,
+        "profile",
+        profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,96 @@
+"""Append-only journal of completed reward sessions."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SessionJournal:
+    """Journal of completed sessions stored as JSON lines.
+
+    Completed sessions are appended as single lines, so recording a session
+    never rewrites the history. Compaction rewrites the file once, dropping
+    sessions that ended before the retention horizon.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str):
+        """Initialize the journal."""
+        self._hass = hass
+        self.path = hass.config.path(STORAGE_DIR, f"{key}.jsonl")
+        self._lock = asyncio.Lock()
+
+    async def async_append(self, session: dict[str, Any]) -> None:
+        """Append a completed session to the journal."""
+        line = json.dumps(session, separators=(",", ":"))
+        async with self._lock:
+            await self._hass.async_add_executor_job(self._append, [line])
+
+    async def async_append_many(self, sessions: list[dict[str, Any]]) -> None:
+        """Append several completed sessions in one write."""
+        lines = [json.dumps(session, separators=(",", ":")) for session in sessions]
+        async with self._lock:
+            await self._hass.async_add_executor_job(self._append, lines)
+
+    async def async_read(self) -> list[dict[str, Any]]:
+        """Read all sessions in the journal."""
+        async with self._lock:
+            return await self._hass.async_add_executor_job(self._read)
+
+    async def async_compact(self, horizon: datetime) -> int:
+        """Drop sessions that ended before the horizon, returning the number kept."""
+        async with self._lock:
+            return await self._hass.async_add_executor_job(self._compact, horizon)
+
+    def _append(self, lines: list[str]) -> None:
+        """Append lines to the journal file."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as journal:
+            journal.writelines(f"{line}\n" for line in lines)
+
+    def _read(self) -> list[dict[str, Any]]:
+        """Read the journal file, skipping damaged lines."""
+        sessions = []
+        try:
+            with open(self.path, encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        sessions.append(json.loads(line))
+                    except ValueError:
+                        _LOGGER.warning("Skipping damaged line in %s", self.path)
+        except FileNotFoundError:
+            pass
+        return sessions
+
+    def _compact(self, horizon: datetime) -> int:
+        """Rewrite the journal without sessions older than the horizon."""
+        sessions = self._read()
+        kept = [
+            session
+            for session in sessions
+            if (end_time := dt_util.parse_datetime(session.get("end_time") or ""))
+            is None
+            or end_time >= horizon
+        ]
+        if len(kept) == len(sessions):
+            return len(kept)
+
+        _LOGGER.debug(
+            "Compacting session journal from %d to %d sessions.", len(sessions), len(kept)
+        )
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as journal:
+            journal.writelines(
+                f"{json.dumps(session, separators=(',', ':'))}\n" for session in kept
+            )
+        os.replace(tmp_path, self.path)
+        return len(kept)
@@ -0,0 +1,79 @@
+"""Incremental reward session rollups for Tibber Grid Reward."""
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+PERIODS = ("day", "week", "month", "year")
+
+
+def period_key(period: str, day: date) -> str:
+    """Return the rollup bucket key of a period containing the given day."""
+    if period == "day":
+        return day.isoformat()
+    if period == "week":
+        iso_year, iso_week, _ = day.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    if period == "month":
+        return f"{day.year}-{day.month:02d}"
+    return str(day.year)
+
+
+class SessionRollups:
+    """Per day, ISO week, month and year aggregates of completed sessions.
+
+    The rollups live in a plain dict so they can be persisted with the rest
+    of the session tracker data. Adding a session touches one bucket per
+    period.
+    """
+
+    def __init__(self, data: dict[str, dict[str, dict[str, Any]]] | None = None):
+        """Initialize the rollups."""
+        self.data = data if data is not None else {}
+        for period in PERIODS:
+            self.data.setdefault(period, {})
+
+    def add(self, session: dict[str, Any]) -> None:
+        """Add a completed session to its buckets."""
+        end_time = dt_util.parse_datetime(session["end_time"])
+        day = dt_util.as_local(end_time).date()
+        for period in PERIODS:
+            bucket = self.data[period].setdefault(
+                period_key(period, day),
+                {
+                    "count": 0,
+                    "total_reward": 0.0,
+                    "total_duration_minutes": 0.0,
+                    "best_session": None,
+                },
+            )
+            bucket["count"] += 1
+            bucket["total_reward"] = round(bucket["total_reward"] + session["reward"], 4)
+            bucket["total_duration_minutes"] = round(
+                bucket["total_duration_minutes"] + session["duration_minutes"], 2
+            )
+            best = bucket["best_session"]
+            if best is None or session["reward"] > best["reward"]:
+                bucket["best_session"] = {
+                    "start_time": session["start_time"],
+                    "end_time": session["end_time"],
+                    "reward": session["reward"],
+                }
+
+    def get(self, period: str, day: date) -> dict[str, Any] | None:
+        """Return the bucket of the period containing the given day."""
+        return self.data[period].get(period_key(period, day))
+
+    def current(self, period: str, now: datetime | None = None) -> dict[str, Any] | None:
+        """Return the bucket of the current period."""
+        return self.get(period, dt_util.as_local(now or dt_util.now()).date())
+
+    def prune(self, horizon: datetime) -> None:
+        """Drop day and week buckets that ended before the horizon."""
+        horizon_day = dt_util.as_local(horizon).date()
+        for period in ("day", "week"):
+            oldest = period_key(period, horizon_day)
+            for key in [key for key in self.data[period] if key < oldest]:
+                del self.data[period][key]
@@ -1,74 +1,148 @@
 """Reward session tracker for Tibber Grid Reward."""
 import logging
+from datetime import timedelta
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.storage import Store
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.util import dt as dt_util
 
+from .const import DEFAULT_SESSION_RETENTION
+from .reward_ledger import RewardLedger
+from .reward_timeline import RewardTimeline
+from .session_journal import SessionJournal
+from .session_rollups import SessionRollups
+from .storage import entry_storage_key
+
 _LOGGER = logging.getLogger(__name__)
 
-STORAGE_VERSION = 1
-STORAGE_KEY = "tibber_grid_reward_session_tracker"
+JOURNAL_KEY = "tibber_grid_reward_sessions"
+COMPACT_INTERVAL = timedelta(days=1)
 
 
 class RewardSessionTracker:
-    """Class to track reward sessions."""
+    """Class to track reward sessions.
+
+    The ledger record holds only the active and the last session, plus
+    rollups that are updated as sessions complete. Session rewards are
+    differences in the ledger's cumulative reward, so sessions that span
+    midnight or a new month are measured correctly. Completed sessions are
+    appended to a journal that is read on demand and compacted daily.
+    """
 
-    def __init__(self, hass: HomeAssistant):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        ledger: RewardLedger,
+        retention_days: int = DEFAULT_SESSION_RETENTION,
+    ):
         """Initialize the tracker."""
         self._hass = hass
-        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
-        self._data = {
-            "active_session": None,
-            "completed_sessions": [],
-        }
-        self._current_daily_reward = 0.0
+        self._ledger = ledger
+        self._journal = SessionJournal(hass, entry_storage_key(JOURNAL_KEY, entry_id))
+        self._retention = timedelta(days=retention_days)
+        self._unsub_compact = None
+        self._data = ledger.sessions
+        self.rollups = SessionRollups(self._data.setdefault("rollups", {}))
+        self._timeline = RewardTimeline()
 
     async def async_load(self):
-        """Load data from store."""
-        stored_data = await self._store.async_load()
-        if stored_data:
-            self._data = stored_data
-
-    def update_state(self, new_state: str, current_daily_reward: float):
-        """Update the session state."""
-        self._current_daily_reward = current_daily_reward
+        """Load the session part of the ledger record."""
+        self._data = self._ledger.sessions
+        self.rollups = SessionRollups(self._data.setdefault("rollups", {}))
+
+    async def async_setup(self):
+        """Set up the session tracker."""
+        await self.async_load()
+        self._hass.async_create_background_task(
+            self._async_compact(), "tibber-grid-reward-session-compaction"
+        )
+        self._unsub_compact = async_track_time_interval(
+            self._hass, self._async_compact, COMPACT_INTERVAL
+        )
+
+    async def async_unload(self):
+        """Stop the periodic compaction."""
+        if self._unsub_compact:
+            self._unsub_compact()
+            self._unsub_compact = None
+
+    async def _async_compact(self, now=None):
+        """Drop sessions and day rollups older than the retention horizon."""
+        horizon = dt_util.utcnow() - self._retention
+        await self._journal.async_compact(horizon)
+        self.rollups.prune(horizon)
+
+    async def async_get_sessions(self) -> list[dict]:
+        """Return all completed sessions within the retention horizon."""
+        return await self._journal.async_read()
+
+    async def async_import_sessions(self, sessions: list[dict]):
+        """Add historical sessions to the journal and rollups in bulk."""
+        if not sessions:
+            return
+        await self._journal.async_append_many(sessions)
+        for session in sessions:
+            self.rollups.add(session)
+        await self._ledger.async_save()
+
+    def update_state(self, new_state: str) -> dict | None:
+        """Update the session state, returning the session that just completed."""
         active_session = self._data.get("active_session")
         is_delivering = new_state == "GridRewardDelivering"
+        now = dt_util.utcnow()
 
         if is_delivering and not active_session:
             # Start of a new session
             _LOGGER.debug("Starting new reward session.")
             self._data["active_session"] = {
-                "start_time": dt_util.utcnow().isoformat(),
-                "reward_at_start": current_daily_reward,
+                "start_time": now.isoformat(),
+                "cumulative_at_start": self._ledger.cumulative,
             }
-            self._hass.async_create_task(self._store.async_save(self._data))
+            self._timeline.clear()
+            self._timeline.add(now.timestamp(), 0.0)
+            self._ledger.schedule_save()
+
+        elif is_delivering:
+            self._timeline.add(now.timestamp(), self.current_session_reward)
 
         elif not is_delivering and active_session:
             # End of a session
             _LOGGER.debug("Ending reward session.")
             start_time = dt_util.parse_datetime(active_session["start_time"])
-            end_time = dt_util.utcnow()
+            end_time = now
             duration = end_time - start_time
-            reward = current_daily_reward - active_session["reward_at_start"]
+            reward = self._ledger.cumulative - active_session["cumulative_at_start"]
+            self._timeline.add(end_time.timestamp(), round(reward, 4))
 
             completed_session = {
                 "start_time": start_time.isoformat(),
                 "end_time": end_time.isoformat(),
                 "duration_minutes": round(duration.total_seconds() / 60, 2),
                 "reward": round(reward, 4),
+                "trace": self._timeline.trace(),
             }
-            self._data["completed_sessions"].append(completed_session)
+            self._timeline.clear()
+            self._data["last_session"] = completed_session
             self._data["active_session"] = None
-            self._hass.async_create_task(self._store.async_save(self._data))
+            self.rollups.add(completed_session)
+            self._hass.async_create_task(self._journal.async_append(completed_session))
+            self._ledger.schedule_save()
+            return completed_session
+
+        return None
 
     @property
     def last_session(self):
         """Return the last completed session."""
-        if self._data["completed_sessions"]:
-            return self._data["completed_sessions"][-1]
-        return None
+        return self._data.get("last_session")
+
+    @property
+    def total_reward(self) -> float:
+        """Return the total reward of all completed sessions."""
+        return round(
+            sum(bucket["total_reward"] for bucket in self.rollups.data["year"].values()), 4
+        )
 
     @property
     def current_session_reward(self) -> float:
@@ -76,6 +150,13 @@ class RewardSessionTracker:
         active_session = self._data.get("active_session")
         if not active_session:
             return 0.0
-        
-        reward = self._current_daily_reward - active_session["reward_at_start"]
-        return round(reward, 4)
\ No newline at end of file
+
+        reward = self._ledger.cumulative - active_session["cumulative_at_start"]
+        return round(reward, 4)
+
+    @property
+    def reward_rate(self) -> float:
+        """Return the reward earned per hour in the active session."""
+        if not self._data.get("active_session"):
+            return 0.0
+        return self._timeline.rate_per_hour
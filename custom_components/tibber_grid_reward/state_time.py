@@ -0,0 +1,152 @@
+"""Time-in-state and transition counters for Tibber Grid Reward."""
+from __future__ import annotations
+
+import logging
+from copy import deepcopy
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .reward_ledger import RewardLedger
+
+_LOGGER = logging.getLogger(__name__)
+
+GRID_REWARD_SUBJECT = "grid_reward"
+STATE_TIME_PERIODS = ("day", "month")
+MAX_GAP = timedelta(hours=2)
+
+
+def _period_keys(moment: datetime) -> dict[str, str]:
+    """Return the keys of the local day and month containing a moment."""
+    local = dt_util.as_local(moment)
+    return {"day": local.date().isoformat(), "month": f"{local.year}-{local.month:02d}"}
+
+
+class StateTimeTracker:
+    """Accumulate the time spent in each state, and the transitions into it.
+
+    Each subject, the grid reward or a flex device, keeps its current state
+    and the time it was entered. Time is only accumulated when the state
+    changes, so frames without a transition cost a single comparison, and
+    views add the time since then without touching the record. The counters
+    live in the ledger record and are saved through the ledger only on
+    transitions, and when Home Assistant stops or the entry is unloaded.
+    """
+
+    def __init__(self, ledger: RewardLedger):
+        """Initialize the tracker."""
+        self._ledger = ledger
+        self._observed: set[str] = set()
+        self.version = 0
+
+    @property
+    def _subjects(self) -> dict[str, dict[str, Any]]:
+        """Return the counters of all subjects."""
+        return self._ledger.data.setdefault("state_time", {})
+
+    def update(self, subject: str, state: str | None, now: datetime | None = None) -> bool:
+        """Record the state of a subject, returning whether it changed."""
+        if state is None:
+            return False
+        record = self._subjects.get(subject)
+        if subject not in self._observed:
+            self._observed.add(subject)
+            if record is not None:
+                self._skip_downtime(record, now or dt_util.utcnow())
+        if record is not None and record["state"] == state:
+            return False
+
+        now = now or dt_util.utcnow()
+        self.version += 1
+        if record is None:
+            record = self._subjects[subject] = {
+                "state": state,
+                "since": now.timestamp(),
+                **_period_keys(now),
+                **{f"{period}_seconds": {} for period in STATE_TIME_PERIODS},
+                **{f"{period}_transitions": {} for period in STATE_TIME_PERIODS},
+            }
+        else:
+            _LOGGER.debug("%s changed from %s to %s.", subject, record["state"], state)
+            self._advance(record, now)
+            record["state"] = state
+            for period in STATE_TIME_PERIODS:
+                transitions = record[f"{period}_transitions"]
+                transitions[state] = transitions.get(state, 0) + 1
+        self._ledger.schedule_save()
+        return True
+
+    def advance(self, now: datetime | None = None) -> None:
+        """Account the time of every observed subject up to now."""
+        now = now or dt_util.utcnow()
+        for subject in self._observed:
+            if record := self._subjects.get(subject):
+                self._advance(record, now)
+        self._ledger.schedule_save()
+
+    def _skip_downtime(self, record: dict[str, Any], now: datetime) -> None:
+        """Leave out a gap after a restart, in which no state was observed."""
+        if now - dt_util.utc_from_timestamp(record["since"]) > MAX_GAP:
+            # Home Assistant was not running, so the state was not observed.
+            self._roll(record, now)
+            record["since"] = now.timestamp()
+
+    def _advance(self, record: dict[str, Any], now: datetime) -> None:
+        """Add the time since the last update to the current state."""
+        since = dt_util.utc_from_timestamp(record["since"])
+        while True:
+            next_day = dt_util.start_of_local_day(
+                dt_util.as_local(since).date() + timedelta(days=1)
+            )
+            if now < next_day:
+                break
+            # Split the time at midnight, and start the new day's counters.
+            self._add(record, (next_day - since).total_seconds())
+            self._roll(record, next_day)
+            since = next_day
+        self._add(record, (now - since).total_seconds())
+        record["since"] = now.timestamp()
+
+    @staticmethod
+    def _add(record: dict[str, Any], seconds: float) -> None:
+        """Add time to the current state in all periods."""
+        for period in STATE_TIME_PERIODS:
+            totals = record[f"{period}_seconds"]
+            totals[record["state"]] = round(totals.get(record["state"], 0.0) + seconds, 1)
+
+    @staticmethod
+    def _roll(record: dict[str, Any], moment: datetime) -> None:
+        """Reset the counters of periods that ended before a moment."""
+        for period, key in _period_keys(moment).items():
+            if record[period] != key:
+                record[period] = key
+                record[f"{period}_seconds"] = {}
+                record[f"{period}_transitions"] = {}
+
+    def state(self, subject: str) -> str | None:
+        """Return the current state of a subject."""
+        record = self._subjects.get(subject)
+        return record["state"] if record else None
+
+    def summary(
+        self, subject: str, period: str, now: datetime | None = None
+    ) -> dict[str, dict[str, float]]:
+        """Return the hours in and transitions into each state during a period."""
+        record = self._subjects.get(subject)
+        if record is None:
+            return {"hours": {}, "transitions": {}}
+        now = now or dt_util.utcnow()
+        # Reading must not change the record, so the time since the last
+        # transition is added to a copy.
+        record = deepcopy(record)
+        if subject not in self._observed:
+            self._skip_downtime(record, now)
+        self._advance(record, now)
+        return {
+            "hours": {
+                state: round(seconds / 3600, 3)
+                for state, seconds in record[f"{period}_seconds"].items()
+            },
+            "transitions": dict(record[f"{period}_transitions"]),
+        }
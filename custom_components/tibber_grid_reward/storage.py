@@ -0,0 +1,64 @@
+"""Per-entry storage helpers for Tibber Grid Reward."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_MIGRATION_LOCK = f"{DOMAIN}_migration_lock"
+
+
+def entry_storage_key(key: str, entry_id: str) -> str:
+    """Return the storage key of a config entry's shard."""
+    return f"{key}.{entry_id}"
+
+
+def _migration_lock(hass: HomeAssistant) -> asyncio.Lock:
+    """Return the lock that serializes migrations between entries."""
+    return hass.data.setdefault(DATA_MIGRATION_LOCK, asyncio.Lock())
+
+
+async def async_load_entry_store(
+    hass: HomeAssistant, store: Store, legacy_store: Store
+) -> dict[str, Any] | None:
+    """Load an entry's shard, adopting the legacy global store if there is none.
+
+    The legacy store is removed once it has been copied, so only the first
+    entry to load claims its data.
+    """
+    stored_data = await store.async_load()
+    if stored_data is not None:
+        return stored_data
+
+    async with _migration_lock(hass):
+        legacy_data = await legacy_store.async_load()
+        if legacy_data is None:
+            return None
+        _LOGGER.debug("Moving %s to %s.", legacy_store.key, store.key)
+        await store.async_save(legacy_data)
+        await legacy_store.async_remove()
+        return legacy_data
+
+
+async def async_remove_entry_storage(
+    hass: HomeAssistant, entry_id: str, keys: list[str], file_names: list[str]
+):
+    """Remove the shards of a removed config entry."""
+    for key in keys:
+        await Store(hass, 1, entry_storage_key(key, entry_id)).async_remove()
+
+    def _remove_files():
+        for file_name in file_names:
+            path = hass.config.path(STORAGE_DIR, file_name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    await hass.async_add_executor_job(_remove_files)
@@ -3,14 +3,17 @@ from __future__ import annotations
 
 import datetime
 import logging
-from typing import Any
 
 from homeassistant.components.time import TimeEntity
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
 
+from .charging_planner import WEEKDAYS
 from .const import DOMAIN
+from .entity import WriteOnChangeMixin
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,6 +26,7 @@ async def async_setup_entry(
     """Set up the time platform."""
     entry_data = hass.data[DOMAIN][config_entry.entry_id]
     api = entry_data["api"]
+    planner = entry_data["planner"]
     flex_devices = entry_data["flex_devices"]
 
     entities = []
@@ -30,25 +34,30 @@ async def async_setup_entry(
         if device["type"] == "vehicle":
             vehicle_id = device["id"]
             for day in range(7):
-                entity = DepartureTimeEntity(api, config_entry.entry_id, device, day)
+                entity = DepartureTimeEntity(
+                    api, config_entry.entry_id, device, day, planner
+                )
                 entities.append(entity)
-                hass.data[DOMAIN][config_entry.entry_id]["vehicle_devices"][vehicle_id].append(entity)
+                hass.data[DOMAIN][config_entry.entry_id]["vehicle_devices"][vehicle_id][
+                    WEEKDAYS[day]
+                ] = entity
     
     async_add_entities(entities)
 
 
-class DepartureTimeEntity(TimeEntity):
+class DepartureTimeEntity(WriteOnChangeMixin, TimeEntity, RestoreEntity):
     """Representation of a departure time entity."""
 
-    def __init__(self, api, entry_id, device, day_index):
+    def __init__(self, api, entry_id, device, day_index, planner):
         """Initialize the time entity."""
         self._api = api
+        self._planner = planner
         self._entry_id = entry_id
         self._home_id = api.home_id
         self._device_id = device["id"]
         self._device_name = device.get("name", self._device_id)
         self._day_index = day_index
-        self._day_name = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"][day_index]
+        self._day_name = WEEKDAYS[day_index]
         self._attr_name = f"{self._device_name} Departure Time {self._day_name.capitalize()}"
         self._attr_unique_id = f"{self._device_id}_departure_time_{self._day_name}"
         self._attr_native_value = None
@@ -60,26 +69,24 @@ class DepartureTimeEntity(TimeEntity):
             "identifiers": {(DOMAIN, self._device_id)},
         }
 
+    async def async_added_to_hass(self) -> None:
+        """Restore the last departure time until the first update."""
+        await super().async_added_to_hass()
+        if self._last_written_state is not None:
+            return
+        last_state = await self.async_get_last_state()
+        if last_state is None or last_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            return
+        try:
+            self._attr_native_value = datetime.time.fromisoformat(last_state.state)
+        except ValueError:
+            _LOGGER.debug("Cannot restore departure time %s", last_state.state)
+
     @callback
-    def update_data(self, data: dict[str, Any]) -> None:
-        """Update the entity."""
-        settings = data.get("userSettings", [])
-        key = f"online.vehicle.smartCharging.departureTimes.{self._day_name}"
-        time_str = None
-        for setting in settings:
-            if setting["key"] == key:
-                time_str = setting["value"]
-                break
-        
-        if time_str:
-            try:
-                self._attr_native_value = datetime.time.fromisoformat(time_str)
-            except (ValueError, TypeError):
-                self._attr_native_value = None
-        else:
-            self._attr_native_value = None
-            
-        self.async_write_ha_state()
+    def update_data(self, departure_time: datetime.time | None) -> None:
+        """Update the entity with the departure time of its day."""
+        self._attr_native_value = departure_time
+        self.async_write_ha_state_if_changed()
 
     async def async_set_value(self, value: datetime.time | None) -> None:
         """Set the departure time."""
@@ -96,5 +103,10 @@ class DepartureTimeEntity(TimeEntity):
             day=self._day_name,
             time_str=time_str,
         )
-        self._attr_native_value = value
-        self.async_write_ha_state()
\ No newline at end of file
+        # The planner diffs the settings of each frame against its cache, so
+        # it takes the new time now, the same moment the entity does.
+        departure_time = value if time_str else None
+        if self._planner.set_departure_time(self._device_id, self._day_name, departure_time):
+            for sensor in self.hass.data[DOMAIN][self._entry_id]["plan_devices"]:
+                sensor.update_data()
+        self.update_data(departure_time)
\ No newline at end of file
@@ -1,8 +1,18 @@
 """pytest fixtures."""
 import pytest
 
+from .fake_tibber import FakeTibber
+
 
 @pytest.fixture(autouse=True)
 def auto_enable_custom_integrations(enable_custom_integrations):
     """Enable custom integrations defined in the test dir."""
     yield
+
+
+@pytest.fixture
+async def fake_tibber(socket_enabled):
+    """Return a running fake Tibber server that the client connects to."""
+    async with FakeTibber() as fake:
+        with fake.patch_client():
+            yield fake
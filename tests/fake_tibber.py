@@ -0,0 +1,372 @@
+"""An in-process stand-in for the Tibber APIs.
+
+FakeTibber serves the login, the /v4/gql HTTP endpoint and the public
+v1-beta/gql price query through an httpx mock transport, and the
+graphql-transport-ws protocol for gridRewardStatus and vehicleState
+subscriptions on a local websocket server. Tests push frames, set a frame
+rate and latency, and script disconnects, so the client's websocket loops
+run end to end without a network.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import time
+from collections.abc import Callable, Iterable
+from contextlib import ExitStack, contextmanager
+from typing import Any, Self
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+from custom_components.tibber_grid_reward import client as client_module
+from custom_components.tibber_grid_reward.client import TibberAPI
+
+USERNAME = "user@example.com"
+PASSWORD = "password"
+API_KEY = "api-key"
+HOME_ID = "home1"
+VEHICLE_ID = "vehicle1"
+
+GRID_REWARD = "gridRewardStatus"
+VEHICLE_STATE = "vehicleState"
+
+
+def make_token(lifetime: float) -> str:
+    """Return an unsigned JWT that expires after the given number of seconds."""
+
+    def encode(claims: dict[str, Any]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
+
+    return f"{encode({'alg': 'none'})}.{encode({'exp': time.time() + lifetime})}."
+
+
+def grid_reward_frame(
+    state: str = "GridRewardAvailable", reward_current_month: float = 0.0
+) -> dict[str, Any]:
+    """Return a gridRewardStatus payload."""
+    return {
+        "__typename": "GridReward",
+        "homeId": HOME_ID,
+        "state": {"__typename": state},
+        "rewardCurrency": "EUR",
+        "rewardCurrentMonth": reward_current_month,
+        "rewardAllTime": reward_current_month,
+        "flexDevices": [
+            {
+                "__typename": "GridRewardVehicle",
+                "vehicleId": VEHICLE_ID,
+                "isPluggedIn": True,
+                "state": {"__typename": state},
+            }
+        ],
+    }
+
+
+class Subscription:
+    """An active subscription of a websocket connection."""
+
+    def __init__(self, connection: ServerConnection, sub_id: str, kind: str, key: str):
+        """Initialize the subscription."""
+        self.connection = connection
+        self.id = sub_id
+        self.kind = kind
+        self.key = key
+
+
+class FakeTibber:
+    """The Tibber login, GraphQL, websocket and public price APIs."""
+
+    def __init__(self, *, latency: float = 0.0, token_lifetime: float = 3600):
+        """Initialize the server."""
+        self.latency = latency
+        self.token_lifetime = token_lifetime
+        self.homes = [{"id": HOME_ID, "title": "Home"}]
+        # Tibber does not document a grid reward history query. Like Tibber's
+        # schema, the fake rejects the one the backfill assumes, unless a test
+        # opts in to serving these sessions through it.
+        self.serves_history = False
+        self.sessions: list[dict[str, Any]] = []
+        self.price_info: dict[str, Any] = {"current": None, "today": [], "tomorrow": []}
+        self.grid_reward: dict[str, Any] | None = None
+        self.vehicle_settings: dict[str, dict[str, str | None]] = {}
+        self.tokens: set[str] = set()
+        self.logins = 0
+        self.rejected_logins = 0
+        self.connections = 0
+        self.frames_sent = 0
+        self.drop_after_frames: int | None = None
+        self._subscriptions: list[Subscription] = []
+        self._connections: set[ServerConnection] = set()
+        self._changed = asyncio.Condition()
+        self._server = None
+        self.ws_url = ""
+
+    async def __aenter__(self) -> Self:
+        """Start the websocket server on a free local port."""
+        self._server = await serve(
+            self._handle_websocket,
+            "127.0.0.1",
+            0,
+            subprotocols=["graphql-transport-ws"],
+        )
+        port = self._server.sockets[0].getsockname()[1]
+        self.ws_url = f"ws://127.0.0.1:{port}/v4/gql/ws"
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Stop the websocket server and close all connections."""
+        self._server.close()
+        await self._server.wait_closed()
+
+    def http_client(self) -> httpx.AsyncClient:
+        """Return an httpx client whose requests are served by the fake."""
+        return httpx.AsyncClient(transport=httpx.MockTransport(self._handle_http))
+
+    @contextmanager
+    def patch_client(self, reconnect_delay: float = 0.01):
+        """Point the websocket client at the fake, without TLS."""
+        with ExitStack() as stack:
+            stack.enter_context(patch.object(client_module, "GRAPHQL_WS_URL", self.ws_url))
+            stack.enter_context(
+                patch.object(client_module, "RECONNECT_DELAY", reconnect_delay)
+            )
+            stack.enter_context(
+                patch.object(TibberAPI, "_get_ssl_context", AsyncMock(return_value=None))
+            )
+            yield
+
+    def subscriptions(self, kind: str | None = None) -> list[Subscription]:
+        """Return the active subscriptions, optionally of one kind."""
+        return [sub for sub in self._subscriptions if kind in (None, sub.kind)]
+
+    async def wait_for(self, predicate: Callable[[], bool], timeout: float = 5) -> None:
+        """Wait until a predicate on the server state holds."""
+        async with self._changed:
+            await asyncio.wait_for(self._changed.wait_for(predicate), timeout)
+
+    async def wait_for_subscriptions(
+        self, kind: str, count: int = 1, timeout: float = 5
+    ) -> None:
+        """Wait until a number of subscriptions of a kind are active."""
+        await self.wait_for(lambda: len(self.subscriptions(kind)) >= count, timeout)
+
+    async def _notify(self) -> None:
+        """Wake up the waiters after a change of the server state."""
+        async with self._changed:
+            self._changed.notify_all()
+
+    # Scripted frames and disconnects.
+
+    async def push_grid_reward(self, payload: dict[str, Any]) -> None:
+        """Send a gridRewardStatus frame to all its subscriptions."""
+        self.grid_reward = payload
+        for sub in self.subscriptions(GRID_REWARD):
+            await self._send_next(sub, payload)
+
+    async def push_vehicle_state(
+        self, vehicle_id: str, payload: dict[str, Any] | None = None
+    ) -> None:
+        """Send a vehicleState frame to the subscriptions of a vehicle."""
+        payload = payload or self._vehicle_state(vehicle_id)
+        for sub in self.subscriptions(VEHICLE_STATE):
+            if sub.key == vehicle_id:
+                await self._send_next(sub, payload)
+
+    async def stream_grid_reward(
+        self, frames: Iterable[dict[str, Any]], rate: float | None = None
+    ) -> None:
+        """Send gridRewardStatus frames, at most rate frames per second."""
+        for payload in frames:
+            await self.push_grid_reward(payload)
+            await asyncio.sleep(1 / rate if rate else 0)
+
+    async def complete_subscriptions(self, kind: str | None = None) -> None:
+        """End subscriptions from the server side, as Tibber does periodically."""
+        for sub in self.subscriptions(kind):
+            await self._send(sub.connection, {"type": "complete", "id": sub.id})
+            self._subscriptions.remove(sub)
+        await self._notify()
+
+    async def disconnect(self, code: int = 1011) -> None:
+        """Close all websocket connections."""
+        for connection in list(self._connections):
+            await connection.close(code)
+
+    # Websocket protocol.
+
+    async def _send(self, connection: ServerConnection, message: dict[str, Any]) -> None:
+        """Send a message after the configured latency."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        try:
+            await connection.send(json.dumps(message))
+        except ConnectionClosed:
+            pass
+
+    async def _send_next(self, sub: Subscription, payload: dict[str, Any]) -> None:
+        """Send a data frame to a subscription."""
+        await self._send(
+            sub.connection,
+            {"type": "next", "id": sub.id, "payload": {"data": {sub.kind: payload}}},
+        )
+        self.frames_sent += 1
+        if self.drop_after_frames is not None and self.frames_sent >= self.drop_after_frames:
+            self.drop_after_frames = None
+            await sub.connection.close(1011)
+
+    async def _handle_websocket(self, connection: ServerConnection) -> None:
+        """Serve one graphql-transport-ws connection."""
+        authorization = connection.request.headers.get("Authorization", "")
+        if authorization.removeprefix("Bearer ") not in self.tokens:
+            await connection.close(4403, "Forbidden")
+            return
+
+        self.connections += 1
+        self._connections.add(connection)
+        try:
+            async for raw in connection:
+                await self._handle_message(connection, json.loads(raw))
+        except ConnectionClosed:
+            pass
+        finally:
+            self._connections.discard(connection)
+            self._subscriptions = [
+                sub for sub in self._subscriptions if sub.connection is not connection
+            ]
+            await self._notify()
+
+    async def _handle_message(
+        self, connection: ServerConnection, message: dict[str, Any]
+    ) -> None:
+        """Handle a message from the client."""
+        if message["type"] == "connection_init":
+            await self._send(connection, {"type": "connection_ack"})
+        elif message["type"] == "subscribe":
+            payload = message["payload"]
+            variables = payload.get("variables", {})
+            if GRID_REWARD in payload["query"]:
+                sub = Subscription(connection, message["id"], GRID_REWARD, variables["homeId"])
+                initial = self.grid_reward
+            else:
+                sub = Subscription(
+                    connection, message["id"], VEHICLE_STATE, variables["vehicleId"]
+                )
+                initial = self._vehicle_state(sub.key)
+            self._subscriptions.append(sub)
+            await self._notify()
+            if initial is not None:
+                await self._send_next(sub, initial)
+        elif message["type"] == "complete":
+            self._subscriptions = [
+                sub
+                for sub in self._subscriptions
+                if not (sub.connection is connection and sub.id == message["id"])
+            ]
+            await self._notify()
+
+    def _vehicle_state(self, vehicle_id: str) -> dict[str, Any]:
+        """Return the vehicleState payload of a vehicle."""
+        return {
+            "__typename": "Vehicle",
+            "id": vehicle_id,
+            "name": vehicle_id,
+            "userSettings": [
+                {"__typename": "Setting", "key": key, "value": value, "isReadOnly": False}
+                for key, value in self.vehicle_settings.get(vehicle_id, {}).items()
+            ],
+        }
+
+    # HTTP endpoints.
+
+    async def _handle_http(self, request: httpx.Request) -> httpx.Response:
+        """Serve the login, the GraphQL endpoint and the public API."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        body = json.loads(request.content or b"{}")
+        if request.url.path == "/v1/login.credentials":
+            return self._login(body)
+        if request.url.path == "/v1-beta/gql":
+            return self._public_query(request, body)
+        if request.url.path == "/v4/gql":
+            return await self._query(request, body)
+        return httpx.Response(404)
+
+    def _login(self, body: dict[str, Any]) -> httpx.Response:
+        """Issue a token for valid credentials."""
+        if (body.get("email"), body.get("password")) != (USERNAME, PASSWORD):
+            self.rejected_logins += 1
+            return httpx.Response(401, json={"error": "invalid credentials"})
+        self.logins += 1
+        token = make_token(self.token_lifetime)
+        self.tokens.add(token)
+        return httpx.Response(200, json={"token": token})
+
+    async def _query(self, request: httpx.Request, body: dict[str, Any]) -> httpx.Response:
+        """Answer the GraphQL queries and mutations of the client."""
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if token not in self.tokens:
+            return httpx.Response(401)
+        query = body.get("query", "")
+        variables = body.get("variables", {})
+        if "setVehicleSettings" in query:
+            settings = self.vehicle_settings.setdefault(variables["vehicleId"], {})
+            for setting in variables["settings"]:
+                settings[setting["key"]] = setting["value"]
+            await self.push_vehicle_state(variables["vehicleId"])
+            data = {"me": {"setVehicleSettings": {"__typename": "Vehicle"}}}
+        elif "gridRewardHistory" in query:
+            if not self.serves_history:
+                return httpx.Response(
+                    400,
+                    json={
+                        "errors": [
+                            {
+                                "message": 'Cannot query field "gridRewardHistory" '
+                                'on type "Home".'
+                            }
+                        ]
+                    },
+                )
+            data = {
+                "me": {
+                    "home": {
+                        "gridRewardHistory": {
+                            "sessions": [
+                                session
+                                for session in self.sessions
+                                if variables["from"] <= session["end"] < variables["to"]
+                            ]
+                        }
+                    }
+                }
+            }
+        elif "homes" in query:
+            data = {"me": {"homes": self.homes}}
+        else:
+            return httpx.Response(200, json={"errors": [{"message": "Unknown query"}]})
+        return httpx.Response(200, json={"data": data})
+
+    def _public_query(self, request: httpx.Request, body: dict[str, Any]) -> httpx.Response:
+        """Answer the homes and price queries of the public API."""
+        if request.headers.get("Authorization") != f"Bearer {API_KEY}":
+            return httpx.Response(401)
+        if "priceInfo" in body.get("query", ""):
+            data = {
+                "viewer": {
+                    "home": {"currentSubscription": {"priceInfo": self.price_info}}
+                }
+            }
+        else:
+            data = {
+                "viewer": {
+                    "homes": [
+                        {"id": home["id"], "appNickname": home["title"], "address": None}
+                        for home in self.homes
+                    ]
+                }
+            }
+        return httpx.Response(200, json={"data": data})
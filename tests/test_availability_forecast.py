@@ -0,0 +1,117 @@
+"""Tests for the AvailabilityHistogram."""
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.tibber_grid_reward.availability_forecast import (
+    HALF_LIFE,
+    HOURS_PER_WEEK,
+    AvailabilityHistogram,
+    hour_of_week,
+)
+
+# A Monday.
+MONDAY = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture(autouse=True)
+def utc_time_zone(hass):
+    """Run the tests in UTC, where MONDAY is the start of the week."""
+    dt_util.set_default_time_zone(dt_util.UTC)
+
+
+@pytest.fixture
+def histogram():
+    """Fixture for an AvailabilityHistogram over a mock ledger."""
+    ledger = MagicMock()
+    ledger.data = {}
+    return AvailabilityHistogram(MagicMock(), ledger)
+
+
+def test_hour_of_week():
+    """Test the hour of week buckets."""
+    assert hour_of_week(MONDAY) == 0
+    assert hour_of_week(MONDAY + timedelta(days=6, hours=23)) == HOURS_PER_WEEK - 1
+
+
+def test_minutes_are_split_over_hours(histogram):
+    """Test that a state spanning an hour boundary fills both buckets."""
+    start = MONDAY + timedelta(hours=8, minutes=30)
+    histogram.update("GridRewardAvailable", start)
+    histogram.update("GridRewardDelivering", start + timedelta(minutes=15))
+    histogram.update("GridRewardUnavailable", start + timedelta(minutes=60))
+    histogram._async_tick(start + timedelta(minutes=90))
+
+    assert histogram.bucket(8) == {"delivering": 0.5, "available": 1.0}
+    assert histogram.bucket(9) == {"delivering": 0.5, "available": 0.5}
+    assert histogram.bucket(10) == {"delivering": None, "available": None}
+
+
+def test_unchanged_state(histogram):
+    """Test that frames without a transition do nothing."""
+    assert histogram.update("GridRewardAvailable", MONDAY)
+    histogram._ledger.schedule_save.reset_mock()
+
+    assert not histogram.update("GridRewardAvailable", MONDAY + timedelta(minutes=1))
+    histogram._ledger.schedule_save.assert_not_called()
+    assert histogram.version == 0
+
+
+def test_old_observations_decay(histogram):
+    """Test that recent weeks outweigh older weeks."""
+    histogram._data["epoch"] = MONDAY.timestamp()
+    histogram._data["state"] = "GridRewardDelivering"
+    histogram._add(0, 60, MONDAY)
+    histogram._data["state"] = "GridRewardAvailable"
+    histogram._add(0, 60, MONDAY + HALF_LIFE)
+
+    # One delivering hour with weight 1, one available hour with weight 2.
+    assert histogram.bucket(0)["delivering"] == pytest.approx(1 / 3, abs=0.001)
+
+
+def test_renormalization(histogram):
+    """Test that large weights are renormalized without changing ratios."""
+    histogram._data["epoch"] = MONDAY.timestamp()
+    histogram._data["state"] = "GridRewardDelivering"
+    histogram._add(0, 30, MONDAY)
+    histogram._data["state"] = "GridRewardAvailable"
+    histogram._add(0, 30, MONDAY)
+
+    much_later = MONDAY + HALF_LIFE * 30
+    histogram._add(5, 60, much_later)
+
+    assert histogram._data["epoch"] == much_later.timestamp()
+    assert histogram.bucket(0) == {"delivering": 0.5, "available": 1.0}
+    assert histogram.bucket(5) == {"delivering": 0.0, "available": 1.0}
+
+
+def test_forecast_and_profile(histogram):
+    """Test the forecast of the coming hours and the weekly profile."""
+    histogram._data["epoch"] = MONDAY.timestamp()
+    histogram.update("GridRewardDelivering", MONDAY)
+    histogram.update("GridRewardAvailable", MONDAY + timedelta(hours=1))
+    histogram._async_tick(MONDAY + timedelta(hours=2))
+
+    forecast = histogram.forecast(MONDAY + timedelta(days=7, minutes=10), hours=3)
+    assert [hour["delivering"] for hour in forecast] == [1.0, 0.0, None]
+    assert histogram.delivering_probability(MONDAY + timedelta(days=7), 3) == 0.5
+
+    profile = histogram.profile(MONDAY + timedelta(hours=2))
+    assert len(profile) == HOURS_PER_WEEK
+    assert profile[1] == {
+        "weekday": 0,
+        "hour": 1,
+        "observed_hours": pytest.approx(1.0, abs=0.1),
+        "delivering": 0.0,
+        "available": 1.0,
+    }
+
+
+def test_downtime_is_not_observed(histogram):
+    """Test that a gap without hourly updates is not counted."""
+    histogram.update("GridRewardDelivering", MONDAY)
+    histogram.update("GridRewardAvailable", MONDAY + timedelta(hours=5))
+
+    assert histogram.bucket(0) == {"delivering": None, "available": None}
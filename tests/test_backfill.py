@@ -0,0 +1,208 @@
+"""Tests for the RewardBackfill."""
+import asyncio
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from custom_components.tibber_grid_reward.backfill import (
+    BACKFILL_MONTHS,
+    MAX_CONCURRENT_PAGES,
+    RewardBackfill,
+    month_ranges,
+)
+from custom_components.tibber_grid_reward.client import (
+    TibberAPI,
+    TibberAuthError,
+    TibberConnectionError,
+    TibberException,
+)
+
+NOW = datetime(2024, 6, 15, 12, tzinfo=UTC)
+
+
+def _history_session(month):
+    """Build a session as returned by the history query."""
+    return {
+        "start": f"2024-{month:02d}-10T10:00:00+00:00",
+        "end": f"2024-{month:02d}-10T11:00:00+00:00",
+        "reward": 1.0,
+    }
+
+
+@pytest.fixture
+def mock_api():
+    """Fixture for an API returning one session per month of 2024."""
+    api = MagicMock()
+    active = 0
+    api.max_active = 0
+
+    async def get_sessions(home_id, start, end):
+        nonlocal active
+        active += 1
+        api.max_active = max(api.max_active, active)
+        await asyncio.sleep(0)
+        active -= 1
+        start_time = datetime.fromisoformat(start)
+        if start_time.year == 2024:
+            return [_history_session(start_time.month)]
+        return []
+
+    api.get_grid_reward_sessions = AsyncMock(side_effect=get_sessions)
+    return api
+
+
+@pytest.fixture
+def session_tracker():
+    """Fixture for a mock session tracker."""
+    tracker = MagicMock()
+    tracker.async_get_sessions = AsyncMock(return_value=[])
+    tracker.async_import_sessions = AsyncMock()
+    tracker.total_reward = 0.0
+    return tracker
+
+
+@pytest.fixture
+@patch("custom_components.tibber_grid_reward.backfill.Store")
+def backfill(MockStore, mock_api, session_tracker):
+    """Fixture for a RewardBackfill instance."""
+    mock_store = MockStore.return_value
+    mock_store.async_load = AsyncMock(return_value=None)
+    mock_store.async_save = AsyncMock()
+    return RewardBackfill(MagicMock(), "entry_id", mock_api, "home1", session_tracker, MagicMock())
+
+
+def test_month_ranges():
+    """Test that month ranges end at the cutoff and go back in time."""
+    ranges = month_ranges(NOW, 3)
+    assert [start.month for start, _ in ranges] == [6, 5, 4]
+    assert ranges[0][1].month == 6
+    assert ranges[1][1] == ranges[0][0]
+
+
+@patch("custom_components.tibber_grid_reward.backfill.dt_util.utcnow", return_value=NOW)
+async def test_backfill_imports_sessions(mock_now, backfill, mock_api, session_tracker):
+    """Test that the backfill pages through months and imports in bulk."""
+    await backfill.async_run()
+
+    imported = [
+        session
+        for call in session_tracker.async_import_sessions.await_args_list
+        for session in call[0][0]
+    ]
+    assert len(imported) == 6
+    assert imported[0]["duration_minutes"] == 60.0
+    assert mock_api.max_active <= MAX_CONCURRENT_PAGES
+    # Paging stops at the first batch without any sessions.
+    assert mock_api.get_grid_reward_sessions.await_count < BACKFILL_MONTHS
+    assert backfill._data["finished"]
+    backfill._statistics.import_rows.assert_called_once()
+
+
+@patch("custom_components.tibber_grid_reward.backfill.dt_util.utcnow", return_value=NOW)
+async def test_backfill_resumes_from_checkpoint(mock_now, backfill, mock_api):
+    """Test that completed months are not fetched again."""
+    backfill._store.async_load.return_value = {
+        "cutoff": NOW.isoformat(),
+        "completed_months": [start.isoformat() for start, _ in month_ranges(NOW, 6)],
+        "finished": False,
+    }
+
+    await backfill.async_run()
+
+    fetched = [call[0][1] for call in mock_api.get_grid_reward_sessions.await_args_list]
+    assert all(datetime.fromisoformat(start).year < 2024 for start in fetched)
+
+
+async def test_backfill_skipped_when_finished(backfill, mock_api):
+    """Test that a finished backfill does nothing."""
+    backfill._store.async_load.return_value = {
+        "cutoff": NOW.isoformat(),
+        "completed_months": [],
+        "finished": True,
+    }
+
+    await backfill.async_run()
+
+    mock_api.get_grid_reward_sessions.assert_not_awaited()
+
+
+async def test_backfill_interrupted(backfill, mock_api):
+    """Test that a connection error keeps the checkpoint for the next start."""
+    mock_api.get_grid_reward_sessions.side_effect = TibberConnectionError
+
+    await backfill.async_run()
+
+    assert not backfill._data["finished"]
+    assert backfill._data["completed_months"] == []
+
+
+async def test_backfill_history_unavailable(backfill, mock_api):
+    """Test that an unsupported history query finishes the backfill."""
+    mock_api.get_grid_reward_sessions.side_effect = TibberException("Cannot query field")
+
+    await backfill.async_run()
+
+    assert backfill._data["finished"]
+    # The query is sent once, to probe the newest month.
+    assert mock_api.get_grid_reward_sessions.await_count == 1
+
+
+@patch("custom_components.tibber_grid_reward.backfill.dt_util.utcnow", return_value=NOW)
+async def test_backfill_probe_without_sessions(mock_now, backfill, mock_api, session_tracker):
+    """Test that a newest month without sessions does not end the backfill."""
+    get_sessions = mock_api.get_grid_reward_sessions.side_effect
+
+    async def get_sessions_but_june(home_id, start, end):
+        if datetime.fromisoformat(start).month == 6:
+            return []
+        return await get_sessions(home_id, start, end)
+
+    mock_api.get_grid_reward_sessions.side_effect = get_sessions_but_june
+
+    await backfill.async_run()
+
+    imported = [
+        session
+        for call in session_tracker.async_import_sessions.await_args_list
+        for session in call[0][0]
+    ]
+    assert len(imported) == 5
+
+
+def _api_responding(status, body):
+    """Return a TibberAPI whose history queries get one fixed response."""
+    transport = httpx.MockTransport(lambda request: httpx.Response(status, json=body))
+    api = TibberAPI("user", "password", httpx.AsyncClient(transport=transport))
+    api.fetch_token = AsyncMock(return_value="token")
+    return api
+
+
+@pytest.mark.parametrize(
+    ("status", "body", "finished"),
+    [
+        (400, {"errors": [{"message": 'Cannot query field "gridRewardHistory"'}]}, True),
+        (200, {"errors": [{"message": 'Cannot query field "gridRewardHistory"'}]}, True),
+        (200, {"data": {"me": {"home": {"gridRewardHistory": {"sessions": "none"}}}}}, True),
+        (503, {}, False),
+        (401, {}, False),
+    ],
+)
+async def test_backfill_responses(backfill, status, body, finished):
+    """Test that only a rejected query, not an outage, finishes the backfill."""
+    backfill._api = _api_responding(status, body)
+
+    await backfill.async_run()
+
+    assert backfill._data["finished"] is finished
+    assert backfill._data["completed_months"] == []
+
+
+async def test_backfill_rejected_credentials(backfill, mock_api):
+    """Test that rejected credentials keep the checkpoint for after reauthentication."""
+    mock_api.get_grid_reward_sessions.side_effect = TibberAuthError
+
+    await backfill.async_run()
+
+    assert not backfill._data["finished"]
@@ -1,11 +1,15 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
+from homeassistant.core import State
+from homeassistant.helpers.restore_state import RestoreEntity
+
 from custom_components.tibber_grid_reward.binary_sensor import (
     GridRewardActiveSensor,
     GRID_REWARD_ACTIVE_SENSOR_DESCRIPTION,
 )
 from custom_components.tibber_grid_reward.const import DOMAIN
+from custom_components.tibber_grid_reward.models import GridRewardSnapshot
 
 
 @pytest.fixture
@@ -37,10 +41,40 @@ def test_device_info(sensor):
 
 def test_update_data(sensor):
     """Test the update_data method of the sensor."""
-    sensor.update_data({"state": {"__typename": "GridRewardDelivering"}})
+    sensor.update_data(GridRewardSnapshot(state="GridRewardDelivering"))
     assert sensor.is_on
     sensor.async_write_ha_state.assert_called_once()
 
-    sensor.update_data({"state": {"__typename": "GridRewardAvailable"}})
+    sensor.update_data(GridRewardSnapshot(state="GridRewardAvailable"))
     assert not sensor.is_on
     assert sensor.async_write_ha_state.call_count == 2
+
+
+def test_identical_frames_are_not_written(sensor):
+    """Test that replaying identical frames writes the state only once."""
+    for _ in range(10):
+        sensor.update_data(GridRewardSnapshot(state="GridRewardDelivering"))
+
+    sensor.async_write_ha_state.assert_called_once()
+    assert sensor.skipped_writes == 9
+
+
+async def test_restore_state(sensor):
+    """Test that the last state is restored until the first frame."""
+    sensor.async_get_last_state = AsyncMock(
+        return_value=State("binary_sensor.grid_reward_active", "on")
+    )
+    with patch.object(RestoreEntity, "async_added_to_hass", AsyncMock()):
+        await sensor.async_added_to_hass()
+    assert sensor.is_on
+
+
+async def test_no_restore_after_first_frame(sensor):
+    """Test that a frame that arrived first is not overwritten."""
+    sensor.update_data(GridRewardSnapshot(state="GridRewardAvailable"))
+    sensor.async_get_last_state = AsyncMock(
+        return_value=State("binary_sensor.grid_reward_active", "on")
+    )
+    with patch.object(RestoreEntity, "async_added_to_hass", AsyncMock()):
+        await sensor.async_added_to_hass()
+    assert not sensor.is_on
@@ -0,0 +1,154 @@
+"""Tests for the ChargingPlanner."""
+import datetime
+from datetime import timedelta
+
+import pytest
+
+from custom_components.tibber_grid_reward.charging_planner import (
+    ChargingPlanner,
+    departure_times_from_settings,
+    next_departure,
+)
+from custom_components.tibber_grid_reward.cheapest_window import PriceSlots
+
+# 2024-01-01 is a Monday.
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)
+PRICES = (0.5, 0.4, 0.1, 0.9, 0.2, 0.05, 0.8, 0.3)
+
+
+def _settings(**days):
+    """Build vehicle settings with departure times."""
+    return {
+        f"online.vehicle.smartCharging.departureTimes.{day}": value
+        for day, value in days.items()
+    }
+
+
+@pytest.fixture
+def planner():
+    """Fixture for a planner with hourly prices and a Monday departure."""
+    planner_instance = ChargingPlanner(energy_kwh=30.0, power_kw=11.0)
+    planner_instance.update_prices(
+        PriceSlots(
+            tuple(START + timedelta(hours=i) for i in range(len(PRICES))),
+            PRICES,
+            timedelta(hours=1),
+        )
+    )
+    planner_instance.update_vehicle_settings("vehicle1", _settings(monday="07:00"))
+    return planner_instance
+
+
+def test_departure_times_from_settings():
+    """Test extracting departure times from vehicle settings."""
+    times = departure_times_from_settings(
+        {
+            **_settings(monday="07:30", tuesday=None, friday="bad"),
+            "online.vehicle.other": "1",
+        }
+    )
+    assert times["monday"] == datetime.time(7, 30)
+    assert times["tuesday"] is None
+    assert times["friday"] is None
+    assert len(times) == 7
+
+
+def test_next_departure():
+    """Test finding the next departure time."""
+    times = departure_times_from_settings(_settings(monday="07:00", wednesday="06:00"))
+    assert next_departure(times, START) == START + timedelta(hours=7)
+    assert next_departure(times, START + timedelta(hours=8)) == START + timedelta(days=2, hours=6)
+    assert next_departure(dict.fromkeys(times), START) is None
+
+
+def test_plan_picks_cheapest_slots(planner):
+    """Test that the plan selects the cheapest slots before departure."""
+    plan = planner.plan("vehicle1", START)
+
+    # 30 kWh at 11 kW needs three hourly slots among the seven before 07:00.
+    assert [start for start, _ in plan.slots] == [
+        START + timedelta(hours=2),
+        START + timedelta(hours=4),
+        START + timedelta(hours=5),
+    ]
+    assert plan.complete
+    assert plan.next_start == START + timedelta(hours=2)
+    assert plan.average_price == pytest.approx((0.1 + 0.2 + 0.05) / 3)
+    assert plan.schedule == [
+        {
+            "start": (START + timedelta(hours=2)).isoformat(),
+            "end": (START + timedelta(hours=3)).isoformat(),
+        },
+        {
+            "start": (START + timedelta(hours=4)).isoformat(),
+            "end": (START + timedelta(hours=6)).isoformat(),
+        },
+    ]
+
+
+def test_plan_skips_past_slots(planner):
+    """Test that slots that have already ended are not planned."""
+    plan = planner.plan("vehicle1", START + timedelta(hours=3, minutes=30))
+    assert [start for start, _ in plan.slots] == [
+        START + timedelta(hours=4),
+        START + timedelta(hours=5),
+        START + timedelta(hours=6),
+    ]
+
+
+def test_plan_incomplete(planner):
+    """Test a plan that cannot cover the energy need before departure."""
+    plan = planner.plan("vehicle1", START, energy_kwh=200.0)
+    assert len(plan.slots) == 7
+    assert not plan.complete
+
+
+def test_plan_without_departure():
+    """Test planning without a departure time or prices."""
+    planner = ChargingPlanner(energy_kwh=10.0, power_kw=11.0)
+    plan = planner.plan("vehicle1", START)
+    assert plan.departure is None
+    assert plan.slots == ()
+    assert not plan.complete
+
+
+def test_plan_recomputed_only_on_change(planner):
+    """Test that the plan is cached until an input changes."""
+    first = planner.plan("vehicle1", START)
+    assert planner.plan("vehicle1", START + timedelta(minutes=10)) is first
+
+    assert planner.update_vehicle_settings("vehicle1", _settings(monday="07:00")) == {}
+    assert planner.plan("vehicle1", START) is first
+
+    assert planner.update_vehicle_settings("vehicle1", _settings(monday="05:00")) == {
+        "monday": datetime.time(5, 0)
+    }
+    second = planner.plan("vehicle1", START)
+    assert second is not first
+    assert second.departure == START + timedelta(hours=5)
+
+
+def test_plugged_in_state(planner):
+    """Test tracking the plug-in state of a vehicle."""
+    assert not planner.is_plugged_in("vehicle1")
+    assert planner.update_plugged_in("vehicle1", True) is True
+    assert planner.update_plugged_in("vehicle1", True) is False
+    assert planner.is_plugged_in("vehicle1")
+
+
+def test_update_vehicle_settings_returns_changed_days():
+    """Test that only the days whose departure time changed are returned."""
+    planner = ChargingPlanner(energy_kwh=30.0, power_kw=11.0)
+
+    changed = planner.update_vehicle_settings("vehicle1", _settings(monday="07:00"))
+    assert len(changed) == 7
+    assert changed["monday"] == datetime.time(7, 0)
+    assert changed["sunday"] is None
+
+    # Another setting changed, but no departure time did.
+    settings = {**_settings(monday="07:00"), "online.vehicle.other": "1"}
+    assert planner.update_vehicle_settings("vehicle1", settings) == {}
+
+    assert planner.update_vehicle_settings(
+        "vehicle1", _settings(monday="07:00", friday="bad", sunday="09:15")
+    ) == {"sunday": datetime.time(9, 15)}
@@ -0,0 +1,110 @@
+"""Tests for the CheapestWindowFinder."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from custom_components.tibber_grid_reward.cheapest_window import (
+    CheapestWindowFinder,
+    parse_price_slots,
+)
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+PRICES = [0.5, 0.4, 0.1, 0.2, 0.9, 0.05, 0.05, 0.8]
+
+
+def _price_info(prices, slot_length=timedelta(hours=1)):
+    """Build a priceInfo payload split across today and tomorrow."""
+    slots = [
+        {"total": price, "startsAt": (START + i * slot_length).isoformat()}
+        for i, price in enumerate(prices)
+    ]
+    half = len(slots) // 2
+    return {"current": slots[0], "today": slots[:half], "tomorrow": slots[half:]}
+
+
+@pytest.fixture
+def finder():
+    """Fixture for a finder loaded with hourly prices."""
+    finder_instance = CheapestWindowFinder()
+    finder_instance.update_prices(_price_info(PRICES))
+    return finder_instance
+
+
+def test_parse_price_slots():
+    """Test parsing a priceInfo payload into a slot vector."""
+    slots = parse_price_slots(_price_info(PRICES))
+    assert slots.prices == tuple(PRICES)
+    assert slots.slot_length == timedelta(hours=1)
+    assert slots.end == START + timedelta(hours=len(PRICES))
+    assert parse_price_slots(None) is None
+    assert parse_price_slots({"today": [], "tomorrow": None}) is None
+
+
+@pytest.mark.parametrize("length", [1, 2, 3, 5, len(PRICES)])
+def test_find_matches_brute_force(finder, length):
+    """Test that the sliding window matches a brute force search."""
+    window = finder.find([timedelta(hours=length)])[timedelta(hours=length)]
+
+    totals = [sum(PRICES[i:i + length]) for i in range(len(PRICES) - length + 1)]
+    best = min(range(len(totals)), key=totals.__getitem__)
+    assert window.start == START + timedelta(hours=best)
+    assert window.end == START + timedelta(hours=best + length)
+    assert window.average_price == pytest.approx(totals[best] / length)
+
+
+def test_find_several_lengths(finder):
+    """Test finding several window lengths at once."""
+    windows = finder.find([timedelta(hours=1), timedelta(hours=2), timedelta(hours=9)])
+    assert windows[timedelta(hours=1)].start == START + timedelta(hours=5)
+    assert windows[timedelta(hours=2)].start == START + timedelta(hours=5)
+    assert windows[timedelta(hours=9)] is None
+
+
+def test_find_within_range(finder):
+    """Test that windows respect the after and before bounds."""
+    window = finder.find(
+        [timedelta(hours=2)],
+        after=START + timedelta(minutes=90),
+        before=START + timedelta(hours=5),
+    )[timedelta(hours=2)]
+    assert window.start == START + timedelta(hours=2)
+    assert window.end == START + timedelta(hours=4)
+
+    # The window may start in the slot that is currently in progress.
+    window = finder.find([timedelta(hours=1)], after=START + timedelta(minutes=150))[
+        timedelta(hours=1)
+    ]
+    assert window.start == START + timedelta(hours=5)
+
+
+def test_partial_duration_rounds_up_to_slots(finder):
+    """Test that a duration is covered by whole slots."""
+    window = finder.find([timedelta(minutes=90)])[timedelta(minutes=90)]
+    assert window.slots == 2
+    assert window.duration == timedelta(hours=2)
+
+
+def test_quarter_hour_slots():
+    """Test a price vector with 15 minute slots."""
+    finder = CheapestWindowFinder()
+    finder.update_prices(_price_info(PRICES, timedelta(minutes=15)))
+    window = finder.find([timedelta(minutes=30)])[timedelta(minutes=30)]
+    assert window.slots == 2
+    assert window.start == START + timedelta(minutes=75)
+
+
+def test_recompute_only_on_price_change(finder):
+    """Test that unchanged prices keep the memoized results."""
+    duration = timedelta(hours=3)
+    first = finder.find([duration])[duration]
+    assert finder.update_prices(_price_info(PRICES)) is False
+    assert finder.find([duration])[duration] is first
+
+    assert finder.update_prices(_price_info(list(reversed(PRICES)))) is True
+    assert finder.find([duration])[duration] is not first
+
+
+def test_no_prices():
+    """Test finding windows without prices."""
+    finder = CheapestWindowFinder()
+    assert finder.find([timedelta(hours=1)]) == {timedelta(hours=1): None}
@@ -1,5 +1,7 @@
 """Tests for the Tibber API client."""
-from unittest.mock import AsyncMock, MagicMock, patch
+import base64
+import json
+from unittest.mock import AsyncMock, MagicMock
 
 import httpx
 import pytest
@@ -7,6 +9,9 @@ import pytest
 from custom_components.tibber_grid_reward.client import (
     TibberAPI,
     TibberAuthError,
+    TibberConnectionError,
+    TibberException,
+    _token_expiry,
 )
 
 
@@ -19,17 +24,37 @@ def client() -> TibberAPI:
     return api
 
 
+def _jwt(claims: dict) -> str:
+    """Return an unsigned JWT with the given claims."""
+    header = base64.urlsafe_b64encode(b'{"alg":"none"}').rstrip(b"=").decode()
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
+    return f"{header}.{payload}."
+
+
 async def test_fetch_token(client: TibberAPI):
     """Test fetching a token."""
+    token = _jwt({"exp": 9999999999, "sub": "user"})
     mock_response = MagicMock(spec=httpx.Response)
     mock_response.status_code = 200
-    mock_response.json.return_value = {"token": "test_token"}
+    mock_response.json.return_value = {"token": token}
     client._client.post.return_value = mock_response
 
-    with patch("jwt.decode", return_value={"exp": 9999999999}):
-        token = await client.fetch_token()
+    assert await client.fetch_token() == token
+    assert client._cached_exp == 9999999999
+
+    # The cached token is reused until it is about to expire.
+    assert await client.fetch_token() == token
+    client._client.post.assert_called_once()
 
-    assert token == "test_token"
+
+def test_token_expiry():
+    """Test decoding the expiry of a token."""
+    assert _token_expiry(_jwt({"exp": 1700000000})) == 1700000000
+    assert _token_expiry(_jwt({})) == 0
+    with pytest.raises(TibberException):
+        _token_expiry("not-a-token")
+    with pytest.raises(TibberException):
+        _token_expiry("a.%%%.c")
 
 
 async def test_fetch_token_auth_error(client: TibberAPI):
@@ -43,3 +68,27 @@ async def test_fetch_token_auth_error(client: TibberAPI):
 
     with pytest.raises(TibberAuthError):
         await client.fetch_token()
+
+
+async def test_fetch_token_server_error(client: TibberAPI):
+    """Test that a server error on login is not taken for rejected credentials."""
+    mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = 503
+    mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
+        "503 Service Unavailable", request=MagicMock(), response=mock_response
+    )
+    client._client.post.return_value = mock_response
+
+    with pytest.raises(TibberConnectionError):
+        await client.fetch_token()
+
+
+async def test_subscriptions_end_on_auth_error(client: TibberAPI):
+    """Test that the subscriptions stop retrying once the login is rejected."""
+    client.fetch_token = AsyncMock(side_effect=TibberAuthError)
+
+    with pytest.raises(TibberAuthError):
+        await client.subscribe_grid_reward("home")
+    with pytest.raises(TibberAuthError):
+        await client.subscribe_vehicle_state("vehicle")
+    assert client.fetch_token.await_count == 2
@@ -0,0 +1,248 @@
+"""End-to-end tests of the Tibber API clients against a fake Tibber server."""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from custom_components.tibber_grid_reward.client import (
+    TibberAPI,
+    TibberAuthError,
+    TibberException,
+)
+from custom_components.tibber_grid_reward.public_client import (
+    TibberPublicAPI,
+    TibberPublicAuthError,
+)
+
+from .fake_tibber import (
+    API_KEY,
+    GRID_REWARD,
+    HOME_ID,
+    PASSWORD,
+    USERNAME,
+    VEHICLE_ID,
+    FakeTibber,
+    grid_reward_frame,
+)
+
+DEPARTURE_TIME_MONDAY = "online.vehicle.smartCharging.departureTimes.monday"
+
+
+@pytest.fixture
+async def api(fake_tibber: FakeTibber):
+    """Return a client of the fake server."""
+    async with fake_tibber.http_client() as http_client:
+        yield TibberAPI(USERNAME, PASSWORD, http_client)
+
+
+@asynccontextmanager
+async def running(coro):
+    """Run a subscription loop for the duration of the block."""
+    task = asyncio.create_task(coro)
+    try:
+        yield task
+    finally:
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+
+class Frames:
+    """Collect the frames passed to a callback."""
+
+    def __init__(self):
+        self.frames = []
+        self._received = asyncio.Event()
+
+    def __call__(self, payload):
+        self.frames.append(payload)
+        self._received.set()
+
+    async def wait_for(self, count, timeout=5):
+        """Wait until a number of frames were received."""
+        async with asyncio.timeout(timeout):
+            while len(self.frames) < count:
+                self._received.clear()
+                await self._received.wait()
+
+
+async def test_get_homes(fake_tibber: FakeTibber, api: TibberAPI):
+    """Test logging in and fetching the homes."""
+    assert await api.get_homes() == [{"id": HOME_ID, "title": "Home"}]
+    assert await api.get_homes() == [{"id": HOME_ID, "title": "Home"}]
+    assert fake_tibber.logins == 1
+
+
+async def test_invalid_credentials(fake_tibber: FakeTibber):
+    """Test that invalid credentials raise an authentication error."""
+    async with fake_tibber.http_client() as http_client:
+        api = TibberAPI(USERNAME, "wrong", http_client)
+        with pytest.raises(TibberAuthError):
+            await api.get_homes()
+
+
+async def test_subscriptions_end_on_invalid_credentials(fake_tibber: FakeTibber):
+    """Test that the subscriptions stop retrying once the login is rejected."""
+    async with fake_tibber.http_client() as http_client:
+        api = TibberAPI(USERNAME, "wrong", http_client)
+        with pytest.raises(TibberAuthError):
+            await api.subscribe_grid_reward(HOME_ID)
+        with pytest.raises(TibberAuthError):
+            await api.subscribe_vehicle_state(VEHICLE_ID)
+
+    assert fake_tibber.rejected_logins == 2
+    assert fake_tibber.connections == 0
+
+
+async def test_expired_token_is_refreshed():
+    """Test that a token about to expire is replaced."""
+    fake = FakeTibber(token_lifetime=10)
+    async with fake.http_client() as http_client:
+        api = TibberAPI(USERNAME, PASSWORD, http_client)
+        first = await api.fetch_token()
+        second = await api.fetch_token()
+
+    assert first != second
+    assert fake.logins == 2
+
+
+async def test_validate_grid_reward(fake_tibber: FakeTibber, api: TibberAPI):
+    """Test validating the grid reward of a home."""
+    fake_tibber.grid_reward = grid_reward_frame()
+
+    assert await api.validate_grid_reward(HOME_ID) == fake_tibber.grid_reward
+
+
+async def test_grid_reward_frames(fake_tibber: FakeTibber, api: TibberAPI):
+    """Test that pushed frames reach the callback in order."""
+    frames = Frames()
+    api.register_grid_reward_callback(frames)
+
+    async with running(api.subscribe_grid_reward(HOME_ID)):
+        await fake_tibber.wait_for_subscriptions(GRID_REWARD)
+        await fake_tibber.push_grid_reward(grid_reward_frame("GridRewardAvailable", 1.0))
+        await fake_tibber.push_grid_reward(grid_reward_frame("GridRewardDelivering", 2.0))
+        await frames.wait_for(2)
+
+    assert [frame["rewardCurrentMonth"] for frame in frames.frames] == [1.0, 2.0]
+
+
+async def test_reconnect_after_disconnect(fake_tibber: FakeTibber, api: TibberAPI):
+    """Test that the client reconnects and subscribes again after a disconnect."""
+    fake_tibber.grid_reward = grid_reward_frame()
+    frames = Frames()
+    api.register_grid_reward_callback(frames)
+
+    async with running(api.subscribe_grid_reward(HOME_ID)):
+        await frames.wait_for(1)
+        await fake_tibber.disconnect()
+        await frames.wait_for(2)
+
+    assert fake_tibber.connections == 2
+
+
+async def test_drop_after_frames(fake_tibber: FakeTibber, api: TibberAPI):
+    """Test that no frames are lost around a connection dropped by the server."""
+    fake_tibber.drop_after_frames = 3
+    frames = Frames()
+    api.register_grid_reward_callback(frames)
+
+    async with running(api.subscribe_grid_reward(HOME_ID)):
+        await fake_tibber.wait_for_subscriptions(GRID_REWARD)
+        for reward in range(3):
+            await fake_tibber.push_grid_reward(grid_reward_frame(reward_current_month=reward))
+        await frames.wait_for(3)
+        await fake_tibber.wait_for(lambda: fake_tibber.connections == 2)
+        await fake_tibber.wait_for_subscriptions(GRID_REWARD)
+        await frames.wait_for(4)
+
+    # The current frame is sent again on the new subscription.
+    assert frames.frames[-1]["rewardCurrentMonth"] == 2
+
+
+async def test_resubscribe_after_complete(fake_tibber: FakeTibber, api: TibberAPI):
+    """Test that a completed subscription is renewed on the same connection."""
+    fake_tibber.grid_reward = grid_reward_frame()
+    frames = Frames()
+    api.register_grid_reward_callback(frames)
+
+    async with running(api.subscribe_grid_reward(HOME_ID)):
+        await frames.wait_for(1)
+        await fake_tibber.complete_subscriptions()
+        await frames.wait_for(2)
+
+    assert fake_tibber.connections == 1
+
+
+async def test_set_departure_time(fake_tibber: FakeTibber, api: TibberAPI):
+    """Test that a changed departure time comes back as a vehicle state."""
+    frames = Frames()
+    api.register_vehicle_callback(VEHICLE_ID, frames)
+
+    async with running(api.subscribe_vehicle_state(VEHICLE_ID)):
+        await frames.wait_for(1)
+        await api.set_departure_time(HOME_ID, VEHICLE_ID, "Monday", "07:30")
+        await frames.wait_for(2)
+
+    assert frames.frames[0]["userSettings"] == []
+    assert frames.frames[1]["userSettings"] == [
+        {
+            "__typename": "Setting",
+            "key": DEPARTURE_TIME_MONDAY,
+            "value": "07:30",
+            "isReadOnly": False,
+        }
+    ]
+
+
+async def test_grid_reward_sessions(fake_tibber: FakeTibber, api: TibberAPI):
+    """Test fetching the sessions that ended in a period."""
+    fake_tibber.serves_history = True
+    fake_tibber.sessions = [
+        {"start": "2024-05-01T10:00:00Z", "end": "2024-05-01T11:00:00Z", "reward": 0.5},
+        {"start": "2024-06-01T10:00:00Z", "end": "2024-06-01T11:00:00Z", "reward": 0.7},
+    ]
+
+    sessions = await api.get_grid_reward_sessions(
+        HOME_ID, "2024-05-01T00:00:00Z", "2024-06-01T00:00:00Z"
+    )
+
+    assert [session["reward"] for session in sessions] == [0.5]
+
+
+async def test_grid_reward_sessions_unknown_field(fake_tibber: FakeTibber, api: TibberAPI):
+    """Test that the history query raises when the schema lacks it."""
+    with pytest.raises(TibberException):
+        await api.get_grid_reward_sessions(
+            HOME_ID, "2024-05-01T00:00:00Z", "2024-06-01T00:00:00Z"
+        )
+
+
+async def test_public_price_info(fake_tibber: FakeTibber):
+    """Test fetching homes and prices from the public API."""
+    fake_tibber.price_info["current"] = {"total": 0.25, "startsAt": "2024-05-01T10:00:00Z"}
+    async with fake_tibber.http_client() as http_client:
+        public_api = TibberPublicAPI(API_KEY, http_client)
+        homes = await public_api.get_homes()
+        price_info = await public_api.get_price_info(HOME_ID)
+
+        with pytest.raises(TibberPublicAuthError):
+            await TibberPublicAPI("wrong", http_client).get_homes()
+
+    assert homes[0]["title"] == "Home"
+    assert price_info["current"]["total"] == 0.25
+
+
+async def test_frame_stream(fake_tibber: FakeTibber, api: TibberAPI):
+    """Test that a fast stream of frames is delivered completely."""
+    frames = Frames()
+    api.register_grid_reward_callback(frames)
+
+    async with running(api.subscribe_grid_reward(HOME_ID)):
+        await fake_tibber.wait_for_subscriptions(GRID_REWARD)
+        await fake_tibber.stream_grid_reward(
+            grid_reward_frame(reward_current_month=reward) for reward in range(500)
+        )
+        await frames.wait_for(500)
+
+    assert [frame["rewardCurrentMonth"] for frame in frames.frames] == list(range(500))
@@ -1,9 +1,12 @@
 import pytest
 from unittest.mock import AsyncMock, patch
 
+import voluptuous_serialize
+
 from homeassistant.core import HomeAssistant
 from homeassistant.const import CONF_PASSWORD, CONF_API_KEY
 from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.helpers import config_validation as cv
 
 from custom_components.tibber_grid_reward.const import DOMAIN
 from custom_components.tibber_grid_reward.client import TibberAuthError
@@ -57,11 +60,13 @@ async def test_reauth_flow_success(hass: HomeAssistant, mock_tibber_api, mock_ti
     mock_entry.add_to_hass(hass)
 
     result = await hass.config_entries.flow.async_init(
-        DOMAIN, context={"source": "reauth", "entry_id": mock_entry.entry_id}
+        DOMAIN,
+        context={"source": "reauth", "entry_id": mock_entry.entry_id},
+        data=mock_entry.data,
     )
 
     assert result["type"] == FlowResultType.FORM
-    assert result["step_id"] == "reauth"
+    assert result["step_id"] == "reauth_confirm"
 
     # Simulate user providing new credentials
     new_password = "new_password"
@@ -91,7 +96,9 @@ async def test_reauth_flow_invalid_creds(hass: HomeAssistant, mock_tibber_api, m
     mock_tibber_api.return_value.get_homes.side_effect = TibberAuthError
 
     result = await hass.config_entries.flow.async_init(
-        DOMAIN, context={"source": "reauth", "entry_id": mock_entry.entry_id}
+        DOMAIN,
+        context={"source": "reauth", "entry_id": mock_entry.entry_id},
+        data=mock_entry.data,
     )
 
     result2 = await hass.config_entries.flow.async_configure(
@@ -103,7 +110,7 @@ async def test_reauth_flow_invalid_creds(hass: HomeAssistant, mock_tibber_api, m
     )
 
     assert result2["type"] == FlowResultType.FORM
-    assert result2["step_id"] == "reauth"
+    assert result2["step_id"] == "reauth_confirm"
     assert result2["errors"] == {"base": "auth"}
 
 async def test_reconfigure_flow(hass: HomeAssistant, mock_tibber_api, mock_tibber_public_api):
@@ -136,4 +143,57 @@ async def test_reconfigure_flow(hass: HomeAssistant, mock_tibber_api, mock_tibbe
     assert len(mock_entry.data["flex_devices"]) == 1
     assert mock_entry.data["flex_devices"][0]["id"] == "flex2"
     assert mock_entry.data["flex_devices"][0]["name"] == "Battery"
-    assert len(mock_setup_entry.mock_calls) == 1
\ No newline at end of file
+    assert len(mock_setup_entry.mock_calls) == 1
+
+async def test_options_flow_form_can_be_serialized(hass: HomeAssistant, mock_tibber_public_api):
+    """Test that the frontend can render the options form."""
+    mock_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA)
+    mock_entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(mock_entry.entry_id)
+
+    assert result["type"] == FlowResultType.FORM
+    fields = voluptuous_serialize.convert(
+        result["data_schema"], custom_serializer=cv.custom_serializer
+    )
+    assert {"name": "current_reward_session_deadband", "type": "string"}.items() <= next(
+        field for field in fields if field["name"] == "current_reward_session_deadband"
+    ).items()
+
+
+async def test_options_flow_invalid_deadband(hass: HomeAssistant, mock_tibber_public_api):
+    """Test that a deadband that cannot be parsed is reported on its field."""
+    mock_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA)
+    mock_entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(mock_entry.entry_id)
+    result2 = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {CONF_API_KEY: MOCK_API_KEY, "current_reward_session_deadband": "a lot"},
+    )
+
+    assert result2["type"] == FlowResultType.FORM
+    assert result2["errors"] == {"current_reward_session_deadband": "invalid_deadband"}
+
+    result3 = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {CONF_API_KEY: MOCK_API_KEY, "current_reward_session_deadband": "1%"},
+    )
+
+    assert result3["type"] == FlowResultType.CREATE_ENTRY
+    assert mock_entry.options["current_reward_session_deadband"] == "1%"
+
+
+async def test_options_flow_without_api_key(hass: HomeAssistant, mock_tibber_public_api):
+    """Test that the options are saved without an API key, which is not checked."""
+    mock_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA)
+    mock_entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(mock_entry.entry_id)
+    result2 = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_API_KEY: "", "charge_energy_kwh": 30}
+    )
+
+    assert result2["type"] == FlowResultType.CREATE_ENTRY
+    assert mock_entry.options["charge_energy_kwh"] == 30
+    mock_tibber_public_api.return_value.get_homes.assert_not_called()
@@ -0,0 +1,49 @@
+"""Tests for the diagnostics of Tibber Grid Reward."""
+from unittest.mock import MagicMock
+
+from homeassistant.components.diagnostics import REDACTED
+
+from custom_components.tibber_grid_reward.const import DOMAIN
+from custom_components.tibber_grid_reward.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.tibber_grid_reward.flight_recorder import FlightRecorder
+
+
+async def test_diagnostics():
+    """Test that the diagnostics redact credentials and sum the skipped writes."""
+    recorder = FlightRecorder()
+    recorder.record_frame("grid_reward", "entry1", {"homeId": "home1", "rewardAllTime": 1.5})
+    entry = MagicMock(
+        entry_id="entry1",
+        data={"username": "user", "password": "secret", "home_id": "home1"},
+        options={"api_key": "key", "save_interval": 60},
+    )
+    hass = MagicMock()
+    hass.data = {
+        DOMAIN: {
+            "entry1": {
+                "grid_reward_devices": [MagicMock(skipped_writes=2, held_back_writes=1)],
+                "flex_device_entities": {
+                    "vehicle1": [MagicMock(skipped_writes=3, held_back_writes=0)]
+                },
+                "profiler": MagicMock(running=False),
+                "flight_recorder": recorder,
+            }
+        }
+    }
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"] == {
+        "username": REDACTED,
+        "password": REDACTED,
+        "home_id": REDACTED,
+    }
+    assert diagnostics["entry"]["options"] == {"api_key": REDACTED, "save_interval": 60}
+    assert diagnostics["skipped_writes"] == 5
+    assert diagnostics["held_back_writes"] == 1
+    assert diagnostics["flight_recorder"][0]["data"] == {
+        "homeId": REDACTED,
+        "rewardAllTime": 1.5,
+    }
@@ -0,0 +1,124 @@
+"""Tests for the shared entity helpers."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.tibber_grid_reward.entity import (
+    WriteOnChangeMixin,
+    WritePolicy,
+    parse_deadband,
+)
+
+
+class FakeEntity(WriteOnChangeMixin):
+    """A minimal entity with a numeric value."""
+
+    hass = None
+
+    def __init__(self, policy=None):
+        self.write_policy = policy
+        self.native_value = None
+        self.async_write_ha_state = MagicMock()
+
+    def set(self, value):
+        self.native_value = value
+        self.async_write_ha_state_if_changed()
+
+
+@pytest.fixture
+def clock():
+    """Patch the monotonic clock of the write policy."""
+    with patch(
+        "custom_components.tibber_grid_reward.entity.monotonic", return_value=0.0
+    ) as mock_clock:
+        yield mock_clock
+
+
+def test_parse_deadband():
+    """Test parsing absolute and relative deadbands."""
+    assert parse_deadband("0.05") == (0.05, False)
+    assert parse_deadband(" 2% ") == (0.02, True)
+    with pytest.raises(ValueError):
+        parse_deadband("-1")
+    with pytest.raises(ValueError):
+        parse_deadband("cents")
+
+
+def test_write_policy_from_options():
+    """Test building the policy of a sensor from the options."""
+    assert WritePolicy.from_options({}, "grid_reward_current_month") is None
+    assert WritePolicy.from_options(
+        {
+            "grid_reward_current_month_min_write_interval": 60,
+            "grid_reward_current_month_deadband": "1%",
+        },
+        "grid_reward_current_month",
+    ) == WritePolicy(60.0, 0.01, True)
+
+
+def test_absolute_deadband(clock):
+    """Test that small changes are held back until they add up."""
+    entity = FakeEntity(WritePolicy(deadband=0.05))
+
+    entity.set(1.00)
+    entity.set(1.02)
+    entity.set(1.04)
+    assert entity.async_write_ha_state.call_count == 1
+    assert entity.held_back_writes == 2
+    assert entity.skipped_writes == 0
+
+    entity.set(1.05)
+    assert entity.async_write_ha_state.call_count == 2
+
+
+def test_relative_deadband(clock):
+    """Test a deadband relative to the last written value."""
+    entity = FakeEntity(WritePolicy(deadband=0.1, relative=True))
+
+    entity.set(100.0)
+    entity.set(109.0)
+    assert entity.async_write_ha_state.call_count == 1
+    entity.set(111.0)
+    assert entity.async_write_ha_state.call_count == 2
+
+    # Values that are not numbers are always written.
+    entity.set(None)
+    assert entity.async_write_ha_state.call_count == 3
+
+
+def test_min_interval(clock):
+    """Test that changes within the interval wait for it to expire."""
+    hass = MagicMock()
+    entity = FakeEntity(WritePolicy(min_interval=60))
+    entity.hass = hass
+
+    with patch(
+        "custom_components.tibber_grid_reward.entity.async_call_later"
+    ) as mock_call_later:
+        entity.set(1.0)
+        clock.return_value = 10.0
+        entity.set(2.0)
+        entity.set(3.0)
+
+        assert entity.async_write_ha_state.call_count == 1
+        mock_call_later.assert_called_once()
+        assert mock_call_later.call_args[0][1] == 50.0
+
+        clock.return_value = 60.0
+        mock_call_later.call_args[0][2](None)
+
+    assert entity.async_write_ha_state.call_count == 2
+    assert entity.native_value == 3.0
+
+
+def test_flush_writes_held_back_state(clock):
+    """Test that a flush writes a held back state, and only once."""
+    entity = FakeEntity(WritePolicy(deadband=1.0))
+
+    entity.set(1.0)
+    entity.set(1.5)
+    assert entity.async_write_ha_state.call_count == 1
+
+    entity.async_flush_pending_write()
+    entity.async_flush_pending_write()
+    assert entity.async_write_ha_state.call_count == 2
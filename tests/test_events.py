@@ -0,0 +1,111 @@
+"""Tests for the TransitionEvents."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.tibber_grid_reward.events import (
+    EVENT_GRID_REWARD,
+    TransitionEvents,
+)
+from custom_components.tibber_grid_reward.flight_recorder import FlightRecorder
+
+
+@pytest.fixture
+def events():
+    """Fixture for TransitionEvents with a mock device registry."""
+    hass = MagicMock()
+    registry = MagicMock()
+    registry.async_get_device.side_effect = lambda identifiers: MagicMock(
+        id=f"device_{next(iter(identifiers))[1]}"
+    )
+    with patch(
+        "custom_components.tibber_grid_reward.events.dr.async_get",
+        return_value=registry,
+    ):
+        yield TransitionEvents(hass, "entry1")
+
+
+def _fired(events):
+    """Return the data of all fired events."""
+    return [call[0][1] for call in events._hass.bus.async_fire.call_args_list]
+
+
+def test_delivering_started_and_stopped(events):
+    """Test the events of a grid reward session."""
+    events.grid_reward_state("GridRewardAvailable")
+    events.grid_reward_state("GridRewardDelivering")
+    events.grid_reward_state("GridRewardUnavailable")
+
+    assert {call[0][0] for call in events._hass.bus.async_fire.call_args_list} == {
+        EVENT_GRID_REWARD
+    }
+    assert [(data["device_id"], data["type"]) for data in _fired(events)] == [
+        ("device_entry1", "state_changed"),
+        ("device_entry1", "delivering_started"),
+        ("device_entry1", "state_changed"),
+        ("device_entry1", "delivering_stopped"),
+    ]
+    assert _fired(events)[0]["to_state"] == "GridRewardDelivering"
+
+
+def test_no_event_without_transition(events):
+    """Test that unchanged and first seen states fire nothing."""
+    events.grid_reward_state("GridRewardDelivering")
+    events.grid_reward_state(None)
+    events.grid_reward_state("GridRewardDelivering")
+    events.flex_device_state("vehicle1", "Idle")
+    events.flex_device_state("vehicle1", "Idle")
+    events.plugged_in("vehicle1", True)
+    events.plugged_in("vehicle1", True)
+
+    events._hass.bus.async_fire.assert_not_called()
+
+
+def test_flex_device_events(events):
+    """Test the events of a vehicle."""
+    events.flex_device_state("vehicle1", "Idle")
+    events.flex_device_state("vehicle1", "Charging")
+    events.plugged_in("vehicle1", False)
+    events.plugged_in("vehicle1", True)
+
+    assert [(data["device_id"], data["type"]) for data in _fired(events)] == [
+        ("device_vehicle1", "state_changed"),
+        ("device_vehicle1", "plugged_in"),
+    ]
+
+
+def test_no_event_for_the_first_frame_after_a_restart(events):
+    """Test that the state from before a restart is not a previous state.
+
+    The time in state tracker keeps the last state across restarts, so the
+    previous state must come from the frames seen since startup.
+    """
+    events.grid_reward_state("GridRewardAvailable")
+    restarted = TransitionEvents(events._hass, "entry1")
+    events._hass.bus.async_fire.reset_mock()
+
+    restarted.grid_reward_state("GridRewardDelivering")
+    restarted.flex_device_state("vehicle1", "Charging")
+    events._hass.bus.async_fire.assert_not_called()
+
+    restarted.grid_reward_state("GridRewardAvailable")
+    assert [data["type"] for data in _fired(events)] == [
+        "state_changed",
+        "delivering_stopped",
+    ]
+
+
+def test_events_are_recorded(events):
+    """Test that fired events go into the flight recorder."""
+    events._flight_recorder = recorder = FlightRecorder()
+
+    events.flex_device_state("vehicle1", "Idle")
+    events.flex_device_state("vehicle1", "Charging")
+
+    [record] = recorder.dump()
+    assert (record["type"], record["kind"], record["key"]) == (
+        "event",
+        "state_changed",
+        "vehicle1",
+    )
+    assert record["data"] == {"from_state": "Idle", "to_state": "Charging"}
@@ -0,0 +1,62 @@
+"""Tests for the FlightRecorder."""
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.tibber_grid_reward.flight_recorder import FlightRecorder
+
+
+@pytest.fixture
+def clock():
+    """Patch the monotonic clock of the payload sampling."""
+    with patch(
+        "custom_components.tibber_grid_reward.flight_recorder.monotonic",
+        return_value=0.0,
+    ) as mock_clock:
+        yield mock_clock
+
+
+def test_ring_buffer_keeps_last_records():
+    """Test that only the last records are kept, oldest first."""
+    recorder = FlightRecorder(size=3)
+
+    for frame in range(4):
+        recorder.record_frame("grid_reward", "home1", {"frame": frame})
+    recorder.record_event("plugged_in", "vehicle1", {})
+
+    records = recorder.dump()
+    assert len(recorder) == 3
+    assert [record["data"] for record in records] == [{"frame": 2}, {"frame": 3}, {}]
+    assert records[-1]["type"] == "event"
+    assert records[-1]["kind"] == "plugged_in"
+    assert records[-1]["key"] == "vehicle1"
+
+
+def test_payloads_are_logged_sampled(caplog, clock):
+    """Test that at most one payload per stream is logged per interval."""
+    recorder = FlightRecorder(log_interval=60)
+    caplog.set_level(logging.DEBUG)
+
+    for frame in range(5):
+        recorder.record_frame("grid_reward", "home1", {"frame": frame})
+    recorder.record_frame("vehicle_state", "vehicle1", {"frame": 0})
+    clock.return_value = 60.0
+    recorder.record_frame("grid_reward", "home1", {"frame": 5})
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 3
+    assert "{'frame': 0}" in messages[0]
+    assert "vehicle1" in messages[1]
+    assert "4 not logged" in messages[2]
+
+
+def test_payloads_are_not_logged_without_debug(caplog, clock):
+    """Test that nothing is logged or tracked when debug logging is off."""
+    recorder = FlightRecorder()
+    caplog.set_level(logging.INFO)
+
+    recorder.record_frame("grid_reward", "home1", {"frame": 0})
+
+    assert not caplog.records
+    assert len(recorder) == 1
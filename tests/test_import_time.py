@@ -0,0 +1,67 @@
+"""Tests for the import time of the integration."""
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+PACKAGE = "custom_components.tibber_grid_reward"
+PACKAGE_DIR = Path(__file__).parents[1] / "custom_components" / "tibber_grid_reward"
+REPO_DIR = PACKAGE_DIR.parents[1]
+
+# Importing every module of the integration may take at most this long,
+# once the modules Home Assistant loads before it are loaded.
+BUDGET_US = 200_000
+
+# Home Assistant has loaded these before any integration is imported: the
+# core, and the helpers the integration used before this budget was set.
+# Any other Home Assistant module it imports counts against the budget.
+PRELOAD = (
+    "homeassistant.core",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.device_registry",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.entity_registry",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.httpx_client",
+    "homeassistant.helpers.storage",
+)
+
+# Dependencies that are only imported when they are first used.
+DEFERRED = ("jwt", "websockets")
+
+IMPORT_TIME = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)")
+
+
+def _modules() -> list[str]:
+    """Return all modules of the integration."""
+    return [PACKAGE] + [
+        f"{PACKAGE}.{path.stem}"
+        for path in sorted(PACKAGE_DIR.glob("*.py"))
+        if path.stem != "__init__"
+    ]
+
+
+def test_import_time_budget():
+    """Test that importing the integration stays within its budget."""
+    preload = "".join(f"import {module}\n" for module in PRELOAD)
+    code = (
+        f"import sys\n{preload}"
+        f"before = set(sys.modules)\n"
+        + "".join(f"import {module}\n" for module in _modules())
+        + f"print(','.join(m for m in {DEFERRED!r} if m in sys.modules and m not in before))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        cwd=REPO_DIR,
+        text=True,
+    )
+
+    assert result.stdout.strip() == "", "Imported eagerly: " + result.stdout
+    cumulative = sum(
+        int(match[1])
+        for match in map(IMPORT_TIME.match, result.stderr.splitlines())
+        if match and not match[2] and match[3].startswith("custom_components")
+    )
+    assert 0 < cumulative <= BUDGET_US, f"Import took {cumulative} us"
@@ -0,0 +1,164 @@
+"""Tests for the setup of Tibber Grid Reward against a fake Tibber server."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_state_change_event
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.tibber_grid_reward.const import DOMAIN
+
+from .fake_tibber import (
+    GRID_REWARD,
+    HOME_ID,
+    PASSWORD,
+    USERNAME,
+    VEHICLE_ID,
+    FakeTibber,
+    grid_reward_frame,
+)
+
+
+@pytest.fixture
+async def setup_entry(hass: HomeAssistant, fake_tibber: FakeTibber):
+    """Return a function that sets up an entry connected to the fake server."""
+    entries = []
+    async with fake_tibber.http_client() as http_client:
+        with patch(
+            "custom_components.tibber_grid_reward.get_async_client",
+            return_value=http_client,
+        ):
+
+            async def setup(options=None, **data):
+                entry = MockConfigEntry(
+                    domain=DOMAIN,
+                    data={
+                        "username": USERNAME,
+                        "password": PASSWORD,
+                        "home_id": HOME_ID,
+                        "flex_devices": [
+                            {"id": VEHICLE_ID, "type": "vehicle", "name": "Car"}
+                        ],
+                        **data,
+                    },
+                    options=options or {},
+                )
+                entry.add_to_hass(hass)
+                assert await hass.config_entries.async_setup(entry.entry_id)
+                await hass.async_block_till_done()
+                entries.append(entry)
+                return entry
+
+            yield setup
+
+            for entry in entries:
+                await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+
+
+async def wait_for_state(hass: HomeAssistant, entity_id: str, state: str, timeout=5):
+    """Wait until an entity has a state."""
+    async with asyncio.timeout(timeout):
+        while (current := hass.states.get(entity_id)) is None or current.state != state:
+            await asyncio.sleep(0.01)
+    await hass.async_block_till_done()
+
+
+async def test_last_delivering_value_is_written(
+    hass: HomeAssistant, fake_tibber: FakeTibber, setup_entry
+):
+    """Test that a throttled session reward writes its final value at a transition."""
+    entry = await setup_entry({"current_reward_session_min_write_interval": 3600})
+    registry = er.async_get(hass)
+    entity_id = registry.async_get_entity_id(
+        "sensor", DOMAIN, f"{entry.entry_id}_current_reward_session"
+    )
+    written = []
+    async_track_state_change_event(
+        hass, entity_id, lambda event: written.append(event.data["new_state"].state)
+    )
+    await fake_tibber.wait_for_subscriptions(GRID_REWARD)
+
+    frames = [
+        grid_reward_frame("GridRewardAvailable", 10.0),
+        grid_reward_frame("GridRewardDelivering", 10.0),
+        grid_reward_frame("GridRewardDelivering", 10.5),
+        grid_reward_frame("GridRewardDelivering", 11.25),
+        grid_reward_frame("GridRewardAvailable", 11.25),
+        # The frames are handled in order, so once the monthly reward of
+        # this one is written, all of the above were handled.
+        grid_reward_frame("GridRewardAvailable", 12.0),
+    ]
+    for frame in frames:
+        await fake_tibber.push_grid_reward(frame)
+    await wait_for_state(
+        hass,
+        registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{entry.entry_id}_grid_reward_current_month"
+        ),
+        "12.0",
+    )
+
+    # The changes within the interval were held back, but the last value
+    # of the session was written before the transition closed it.
+    assert "0.5" not in written
+    assert written[-2:] == ["1.25", "0.0"]
+
+
+async def test_rejected_credentials_start_reauth(
+    hass: HomeAssistant, fake_tibber: FakeTibber, setup_entry
+):
+    """Test that a rejected login starts a reauthentication and stops retrying."""
+    entry = await setup_entry(password="wrong")
+    async with asyncio.timeout(5):
+        while not (flows := hass.config_entries.flow.async_progress_by_handler(DOMAIN)):
+            await asyncio.sleep(0.01)
+
+    assert [flow["context"]["source"] for flow in flows] == ["reauth"]
+    assert flows[0]["context"]["entry_id"] == entry.entry_id
+
+    # The subscriptions do not log in again, which they would every 10 ms.
+    rejected_logins = fake_tibber.rejected_logins
+    await asyncio.sleep(0.1)
+    assert fake_tibber.rejected_logins == rejected_logins
+    assert fake_tibber.connections == 0
+
+
+async def test_services_resolve_the_entry(hass: HomeAssistant, setup_entry):
+    """Test that the services act on the entry of the call and outlive an unload."""
+    first = await setup_entry()
+    second = await setup_entry(
+        flex_devices=[{"id": "vehicle-2", "type": "vehicle", "name": "Second car"}]
+    )
+    recorder = hass.data[DOMAIN][second.entry_id]["flight_recorder"]
+    recorder.record_event("transition", "grid_reward", {"state": "GridRewardDelivering"})
+    recorder.record_frame(
+        "grid_reward", second.entry_id, {"homeId": HOME_ID, "rewardAllTime": 1.5}
+    )
+
+    async def dump(**data):
+        return await hass.services.async_call(
+            DOMAIN, "dump_flight_recorder", data, blocking=True, return_response=True
+        )
+
+    assert not any(
+        record["type"] == "event"
+        for record in (await dump(entry_id=first.entry_id))["records"]
+    )
+    records = (await dump(entry_id=second.entry_id))["records"]
+    assert any(record["type"] == "event" for record in records)
+    assert records[-1]["data"] == {"homeId": REDACTED, "rewardAllTime": 1.5}
+    with pytest.raises(HomeAssistantError):
+        await dump()
+
+    # Unloading an entry keeps the services of the other entry.
+    await hass.config_entries.async_unload(second.entry_id)
+    await hass.async_block_till_done()
+    assert hass.services.has_service(DOMAIN, "dump_flight_recorder")
+    assert (await dump())["records"] is not None
+    with pytest.raises(HomeAssistantError):
+        await dump(entry_id=second.entry_id)
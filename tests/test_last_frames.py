@@ -0,0 +1,62 @@
+"""Tests for the LastFrames."""
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.tibber_grid_reward.last_frames import LastFrames
+from custom_components.tibber_grid_reward.models import (
+    GridRewardSnapshot,
+    VehicleState,
+)
+
+FRAME = {
+    "state": {"__typename": "GridRewardDelivering", "reason": "peak"},
+    "rewardCurrency": "EUR",
+    "rewardCurrentMonth": 1.5,
+    "flexDevices": [{"vehicleId": "vehicle1", "isPluggedIn": True}],
+}
+VEHICLE_FRAME = {
+    "userSettings": [
+        {"key": "online.vehicle.smartCharging.departureTimes.monday", "value": "07:00"}
+    ]
+}
+
+
+@pytest.fixture
+def ledger():
+    """Fixture for a mock ledger."""
+    ledger = MagicMock()
+    ledger.data = {}
+    return ledger
+
+
+def test_frames_survive_a_restart(ledger):
+    """Test that the stored frames parse to the last snapshots after a reload."""
+    frames = LastFrames(ledger)
+    assert frames.grid_reward is None
+    assert frames.vehicle("vehicle1") is None
+
+    frames.update_grid_reward(GridRewardSnapshot.from_payload(FRAME), FRAME)
+    frames.update_vehicle(VehicleState.from_payload("vehicle1", VEHICLE_FRAME), VEHICLE_FRAME)
+
+    restored = LastFrames(ledger)
+    assert restored.grid_reward == GridRewardSnapshot.from_payload(FRAME)
+    assert restored.vehicle("vehicle1") == VehicleState.from_payload(
+        "vehicle1", VEHICLE_FRAME
+    )
+
+
+def test_unchanged_frames_are_not_saved(ledger):
+    """Test that only frames with a changed snapshot schedule a save."""
+    frames = LastFrames(ledger)
+    for _ in range(5):
+        frames.update_grid_reward(GridRewardSnapshot.from_payload(FRAME), dict(FRAME))
+        frames.update_vehicle(
+            VehicleState.from_payload("vehicle1", VEHICLE_FRAME), VEHICLE_FRAME
+        )
+    assert ledger.schedule_save.call_count == 2
+
+    changed = {**FRAME, "rewardCurrentMonth": 1.6}
+    frames.update_grid_reward(GridRewardSnapshot.from_payload(changed), changed)
+    assert ledger.schedule_save.call_count == 3
+    assert ledger.data["last_frames"]["grid_reward"] is changed
@@ -0,0 +1,92 @@
+"""Tests for the parsed frame models."""
+import dataclasses
+
+import pytest
+
+from custom_components.tibber_grid_reward.models import (
+    FlexDevice,
+    GridRewardSnapshot,
+    VehicleState,
+)
+
+FRAME = {
+    "__typename": "GridReward",
+    "homeId": "home1",
+    "state": {"__typename": "GridRewardUnavailable", "reasons": ["a", "b"]},
+    "rewardCurrency": "EUR",
+    "rewardCurrentMonth": 12.5,
+    "rewardAllTime": 99.0,
+    "flexDevices": [
+        {
+            "__typename": "GridRewardVehicle",
+            "vehicleId": "vehicle1",
+            "isPluggedIn": True,
+            "state": {"__typename": "GridRewardAvailable", "kind": "x"},
+        },
+        {
+            "__typename": "GridRewardBattery",
+            "batteryId": "battery1",
+            "state": {"__typename": "GridRewardDelivering", "reason": "r"},
+        },
+        {"__typename": "GridRewardVehicle"},
+    ],
+}
+
+
+def test_grid_reward_snapshot_from_payload():
+    """Test parsing a gridRewardStatus frame."""
+    snapshot = GridRewardSnapshot.from_payload(FRAME)
+
+    assert snapshot.state == "GridRewardUnavailable"
+    assert snapshot.reason == "a, b"
+    assert snapshot.reward_current_month == 12.5
+    assert snapshot.reward_all_time == 99.0
+    assert snapshot.currency == "EUR"
+    assert snapshot.flex_devices == (
+        FlexDevice("vehicle1", "vehicle", "GridRewardAvailable", True),
+        FlexDevice("battery1", "battery", "GridRewardDelivering", False),
+    )
+    assert snapshot.flex_devices[0].is_vehicle
+    assert not snapshot.flex_devices[1].is_vehicle
+
+
+def test_grid_reward_snapshot_reason_and_missing_fields():
+    """Test the single reason and a sparse frame."""
+    snapshot = GridRewardSnapshot.from_payload(
+        {"state": {"__typename": "GridRewardDelivering", "reason": "peak"}}
+    )
+    assert snapshot.reason == "peak"
+    assert snapshot.flex_devices == ()
+    assert GridRewardSnapshot.from_payload({}) == GridRewardSnapshot()
+
+
+def test_snapshots_are_immutable_and_compare_by_value():
+    """Test that identical frames parse to equal, frozen snapshots."""
+    first = GridRewardSnapshot.from_payload(FRAME)
+    second = GridRewardSnapshot.from_payload(FRAME)
+
+    assert first == second
+    assert first != dataclasses.replace(first, reward_current_month=12.6)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.state = "GridRewardDelivering"
+    assert not hasattr(first, "__dict__")
+
+
+def test_vehicle_state_from_payload():
+    """Test mapping the userSettings of a vehicleState frame by key."""
+    settings = [
+        {"key": "online.vehicle.smartCharging.departureTimes.monday", "value": "07:00"},
+        {"key": "online.vehicle.other", "value": None},
+    ]
+    vehicle = VehicleState.from_payload(
+        "vehicle1", {"userSettings": [*settings, {"value": "ignored"}]}
+    )
+
+    assert vehicle.vehicle_id == "vehicle1"
+    assert dict(vehicle.settings) == {
+        "online.vehicle.smartCharging.departureTimes.monday": "07:00",
+        "online.vehicle.other": None,
+    }
+    assert vehicle == VehicleState.from_payload("vehicle1", {"userSettings": settings})
+    with pytest.raises(TypeError):
+        vehicle.settings["online.vehicle.other"] = "1"
@@ -0,0 +1,76 @@
+"""Tests for the FrameProfiler."""
+import asyncio
+import pstats
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.tibber_grid_reward.profiler import FrameProfiler
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    """Fixture for a FrameProfiler writing to a temporary directory."""
+    hass = MagicMock()
+    hass.config.path.side_effect = lambda name: str(tmp_path / name)
+
+    async def add_executor_job(target, *args):
+        return target(*args)
+
+    hass.async_add_executor_job.side_effect = add_executor_job
+    return FrameProfiler(hass)
+
+
+def handle_frame(payload):
+    """Stand in for a dispatch callback."""
+    return sum(range(payload))
+
+
+def test_wrapped_callback_without_profile(profiler):
+    """Test that a wrapped callback is only called while no profile runs."""
+    target = MagicMock()
+
+    profiler.wrap(target)({"frame": 1})
+
+    target.assert_called_once_with({"frame": 1})
+    assert not profiler.running
+
+
+async def test_profile_writes_stats(profiler):
+    """Test that the frames handled during a profile are written as pstats."""
+    callback = profiler.wrap(handle_frame)
+    task = asyncio.create_task(profiler.async_profile(0.05))
+    await asyncio.sleep(0)
+    assert profiler.running
+
+    callback(1000)
+    callback(1000)
+    result = await task
+
+    assert not profiler.running
+    assert result["frames"] == 2
+    stats = pstats.Stats(result["path"])
+    assert any(name == "handle_frame" for _, _, name in stats.stats)
+    assert any(
+        function["function"].endswith("(handle_frame)") and function["calls"] == 2
+        for function in result["top_functions"]
+    )
+
+    # Frames after the profile are not recorded.
+    callback(1000)
+    assert result["frames"] == 2
+
+
+async def test_one_profile_at_a_time(profiler):
+    """Test that a second profile is refused while one runs."""
+    task = asyncio.create_task(profiler.async_profile(0.05))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HomeAssistantError):
+        await profiler.async_profile(0.05)
+
+    # Without frames there is nothing to write.
+    result = await task
+    assert result["frames"] == 0
+    assert result["path"] is None
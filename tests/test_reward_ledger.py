@@ -0,0 +1,172 @@
+"""Tests for the RewardLedger."""
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.tibber_grid_reward.reward_ledger import RewardLedger
+
+NOW = datetime(2024, 1, 31, 23, 50)
+
+
+@pytest.fixture
+@patch("custom_components.tibber_grid_reward.reward_ledger.Store")
+def ledger(MockStore):
+    """Fixture for a RewardLedger instance."""
+    mock_store = MockStore.return_value
+    mock_store.async_load = AsyncMock(return_value=None)
+    mock_store.async_save = AsyncMock()
+    mock_store.async_remove = AsyncMock()
+    mock_store.async_delay_save = MagicMock()
+    return RewardLedger(MagicMock(), "entry_id", save_interval=60)
+
+
+@pytest.fixture(autouse=True)
+def mock_now():
+    """Fix the local time used by the ledger views."""
+    with patch(
+        "custom_components.tibber_grid_reward.reward_ledger.dt_util.now",
+        return_value=NOW,
+    ) as mock:
+        yield mock
+
+
+def test_first_frame_is_the_baseline(ledger):
+    """Test that rewards before the first frame do not count for the day."""
+    ledger.update_monthly_reward(100.0, NOW)
+
+    assert ledger.cumulative == 100.0
+    assert ledger.day_reward == 0.0
+    assert ledger.month_reward == 100.0
+
+
+def test_increments(ledger):
+    """Test that increments of the monthly reward add to all views."""
+    ledger.update_monthly_reward(100.0, NOW)
+    ledger.update_monthly_reward(110.5, NOW)
+
+    assert ledger.cumulative == 110.5
+    assert ledger.day_reward == 10.5
+    assert ledger.month_reward == 110.5
+
+
+def test_new_day_and_month(ledger, mock_now):
+    """Test that the cumulative reward keeps growing over a month rollover."""
+    ledger.update_monthly_reward(100.0, NOW)
+    ledger.update_monthly_reward(101.0, NOW)
+
+    # Before the first frame of the new day, the day view is already empty.
+    tomorrow = NOW + timedelta(minutes=20)
+    mock_now.return_value = tomorrow
+    assert ledger.day_reward == 0.0
+
+    ledger.update_monthly_reward(0.5, tomorrow)
+
+    assert ledger.cumulative == 101.5
+    assert ledger.day_reward == 0.5
+    assert ledger.month_reward == 0.5
+
+
+def test_unchanged_reward_is_not_saved(ledger):
+    """Test that frames with an unchanged monthly reward do not save."""
+    ledger.update_monthly_reward(110.5, NOW)
+    ledger._store.async_delay_save.reset_mock()
+    ledger._save_pending = False
+
+    for _ in range(10):
+        ledger.update_monthly_reward(110.5, NOW)
+
+    ledger._store.async_delay_save.assert_not_called()
+
+
+def test_changes_coalesce_into_pending_save(ledger):
+    """Test that changes made while a save is pending do not reschedule it."""
+    for reward in range(1, 11):
+        ledger.update_monthly_reward(float(reward), NOW)
+
+    ledger._store.async_delay_save.assert_called_once()
+    # The delayed write picks up the latest data.
+    assert ledger._data_to_save()["last_monthly_reward"] == 10.0
+
+    ledger.update_monthly_reward(11.0, NOW)
+    assert ledger._store.async_delay_save.call_count == 2
+
+
+async def test_flush_writes_pending_save(ledger):
+    """Test that a flush writes a pending save only once."""
+    ledger.update_monthly_reward(12.0, NOW)
+
+    await ledger.async_flush()
+    ledger._store.async_save.assert_awaited_once_with(ledger.data)
+
+    await ledger.async_flush()
+    ledger._store.async_save.assert_awaited_once()
+
+
+async def test_load_migrates_daily_tracker_store(ledger):
+    """Test that the released daily tracker store becomes the ledger record."""
+    legacy = {
+        "tibber_grid_reward_daily_tracker": {
+            "reward_at_start_of_day": 100.0,
+            "daily_reward": 10.0,
+            "last_known_monthly_reward": 110.0,
+        },
+    }
+
+    def make_store(hass, version, key):
+        store = MagicMock()
+        store.async_load = AsyncMock(return_value=legacy.get(key))
+        store.async_save = AsyncMock()
+        store.async_remove = AsyncMock()
+        return store
+
+    with patch(
+        "custom_components.tibber_grid_reward.reward_ledger.Store", side_effect=make_store
+    ):
+        await ledger.async_load()
+
+    assert ledger.cumulative == 110.0
+    assert ledger.day_reward == 10.0
+    assert ledger.sessions["active_session"] is None
+    ledger._store.async_save.assert_awaited_with(ledger.data)
+
+
+def test_decrease_within_a_month(ledger):
+    """Test that a correction within a month is subtracted, not a new month."""
+    ledger.update_monthly_reward(100.0, NOW)
+    ledger.update_monthly_reward(110.0, NOW)
+    ledger.update_monthly_reward(108.0, NOW)
+
+    assert ledger.cumulative == 108.0
+    assert ledger.month_reward == 108.0
+
+    ledger.update_monthly_reward(109.0, NOW)
+    assert ledger.cumulative == 109.0
+
+
+def test_restart_after_the_first_frame_of_a_month(ledger, mock_now):
+    """Test that the monthly reward may restart a few frames into a new month."""
+    ledger.update_monthly_reward(100.0, NOW)
+    ledger.update_monthly_reward(101.0, NOW)
+
+    tomorrow = NOW + timedelta(minutes=20)
+    mock_now.return_value = tomorrow
+    ledger.update_monthly_reward(101.0, tomorrow)
+    ledger.update_monthly_reward(0.5, tomorrow)
+    # A later drop in the same month is a correction.
+    ledger.update_monthly_reward(0.4, tomorrow)
+
+    assert ledger.cumulative == 101.4
+    assert ledger.month_reward == 0.4
+
+
+def test_data_to_save_is_a_copy(ledger):
+    """Test that the delayed write gets data the frames no longer change."""
+    ledger.update_monthly_reward(100.0, NOW)
+    data = ledger._data_to_save()
+
+    ledger.update_monthly_reward(101.0, NOW)
+    ledger.sessions["active_session"] = {"start_time": NOW.isoformat()}
+
+    assert data["cumulative"] == 100.0
+    assert data["sessions"]["active_session"] is None
@@ -0,0 +1,82 @@
+"""Tests for the RewardStatistics."""
+from datetime import UTC, datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.tibber_grid_reward.const import DOMAIN
+from custom_components.tibber_grid_reward.reward_statistics import RewardStatistics
+
+HOUR = datetime(2024, 1, 1, 10, tzinfo=UTC)
+
+
+@pytest.fixture
+def mock_hass():
+    """Fixture for a mock Home Assistant instance with the recorder loaded."""
+    hass = MagicMock()
+    hass.config.components = {"recorder"}
+    return hass
+
+
+@pytest.fixture
+def statistics(mock_hass):
+    """Fixture for a RewardStatistics instance."""
+    return RewardStatistics(mock_hass, "ENTRY1")
+
+
+def test_statistic_ids(statistics):
+    """Test that statistic ids are valid external statistic ids."""
+    assert statistics.reward_statistic_id == f"{DOMAIN}:grid_reward_entry1"
+    assert statistics.session_statistic_id == f"{DOMAIN}:session_reward_entry1"
+
+
+@patch("homeassistant.components.recorder.statistics.async_add_external_statistics")
+def test_hourly_rows_written_in_batches(mock_add, statistics):
+    """Test that frames collapse into one row per hour written in one batch."""
+    for minute in range(0, 60, 5):
+        statistics.update_reward(100.0 + minute, "SEK", HOUR.replace(minute=minute))
+    statistics.update_reward(200.0, "SEK", HOUR.replace(hour=11, minute=30))
+    statistics.update_reward(210.0, "SEK", HOUR.replace(hour=12, minute=5))
+
+    statistics._async_flush_completed(HOUR.replace(hour=12, second=10))
+
+    mock_add.assert_called_once()
+    metadata, rows = mock_add.call_args[0][1:]
+    assert metadata["statistic_id"] == statistics.reward_statistic_id
+    assert metadata["unit_of_measurement"] == "SEK"
+    assert metadata["has_sum"]
+    assert rows == [
+        {"start": HOUR, "state": 155.0, "sum": 155.0},
+        {"start": HOUR.replace(hour=11), "state": 200.0, "sum": 200.0},
+    ]
+
+    # The hour in progress is written on unload.
+    statistics.async_unload()
+    assert mock_add.call_args[0][2] == [
+        {"start": HOUR.replace(hour=12), "state": 210.0, "sum": 210.0}
+    ]
+
+
+@patch("homeassistant.components.recorder.statistics.async_add_external_statistics")
+def test_session_rows(mock_add, statistics):
+    """Test that sessions are recorded in the hour they ended."""
+    statistics.add_session({"end_time": "2024-01-01T10:45:00+00:00"}, 1.5, "SEK")
+    statistics.add_session({"end_time": "2024-01-01T10:50:00+00:00"}, 2.0, "SEK")
+
+    statistics.async_unload()
+
+    metadata, rows = mock_add.call_args[0][1:]
+    assert metadata["statistic_id"] == statistics.session_statistic_id
+    assert rows == [{"start": HOUR, "state": 2.0, "sum": 2.0}]
+
+
+@patch("homeassistant.components.recorder.statistics.async_add_external_statistics")
+def test_no_recorder(mock_add, statistics, mock_hass):
+    """Test that nothing is written or buffered without the recorder."""
+    mock_hass.config.components = set()
+    statistics.update_reward(100.0, "SEK", HOUR)
+
+    statistics.async_unload()
+
+    mock_add.assert_not_called()
+    assert statistics._pending[statistics.reward_statistic_id] == {}
@@ -0,0 +1,63 @@
+"""Tests for the RewardTimeline."""
+from custom_components.tibber_grid_reward.reward_timeline import RewardTimeline
+
+
+def test_rate_per_hour():
+    """Test the reward rate over the sliding window."""
+    timeline = RewardTimeline(rate_window=900)
+    assert timeline.rate_per_hour == 0.0
+
+    for minute in range(31):
+        timeline.add(minute * 60.0, minute * 0.01)
+
+    # 15 minutes at 0.01 per minute.
+    assert timeline.rate_per_hour == 0.6
+    assert timeline.times[timeline._window_start] == 15 * 60.0
+
+
+def test_rate_follows_recent_rewards():
+    """Test that the rate drops when the reward stops increasing."""
+    timeline = RewardTimeline(rate_window=900)
+    for minute in range(16):
+        timeline.add(minute * 60.0, minute * 0.01)
+    for minute in range(16, 60):
+        timeline.add(minute * 60.0, 0.15)
+
+    assert timeline.rate_per_hour == 0.0
+
+
+def test_plateau_keeps_two_points():
+    """Test that unchanged rewards only move the end of the plateau."""
+    timeline = RewardTimeline()
+    timeline.add(0.0, 0.0)
+    for second in range(1, 100):
+        timeline.add(float(second), 1.0)
+
+    assert list(timeline.times) == [0.0, 1.0, 99.0]
+    assert list(timeline.rewards) == [0.0, 1.0, 1.0]
+
+
+def test_size_is_bounded():
+    """Test that the timeline is downsampled at the maximum size."""
+    timeline = RewardTimeline(max_points=64, rate_window=900)
+    for second in range(10000):
+        timeline.add(float(second), second * 0.001)
+
+    assert len(timeline) <= 64
+    assert timeline.times[0] == 0.0
+    assert timeline.times[-1] == 9999.0
+    assert round(timeline.rate_per_hour, 1) == 3.6
+
+
+def test_trace():
+    """Test the downsampled trace of a session."""
+    timeline = RewardTimeline()
+    assert timeline.trace() == []
+
+    for second in range(100):
+        timeline.add(1000.0 + second, second * 0.5)
+
+    trace = timeline.trace(points=10)
+    assert len(trace) <= 10
+    assert trace[0] == [0.0, 0.0]
+    assert trace[-1] == [99.0, 49.5]
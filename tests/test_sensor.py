@@ -1,14 +1,25 @@
-from unittest.mock import MagicMock, patch
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
+from homeassistant.components.sensor import SensorEntity, SensorExtraStoredData
 from homeassistant.util import dt as dt_util
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
 from custom_components.tibber_grid_reward.const import DOMAIN
+from custom_components.tibber_grid_reward.models import (
+    FlexDevice,
+    GridRewardSnapshot,
+)
+from custom_components.tibber_grid_reward.state_time import StateTimeTracker
 from custom_components.tibber_grid_reward.sensor import (
     GridRewardSensor,
     GridRewardCurrentDaySensor,
     RewardSessionSensor,
+    SessionRollupSensor,
+    SESSION_ROLLUP_SENSORS,
+    StateTimeSensor,
+    STATE_TIME_SENSORS,
     FlexDeviceSensor,
     GRID_REWARD_SENSORS,
     FLEX_DEVICE_SENSORS,
@@ -42,15 +53,17 @@ async def test_grid_reward_sensors(mock_api, entry_id, description):
     assert sensor.unique_id == f"{entry_id}_{description.key}"
 
     # Test update_data and state logic
-    data = {
-        "state": {
-            "__typename": "GridRewardDelivering",
-            "reasons": ["reason1", "reason2"],
-            "reason": "delivering",
-        },
-        "rewardCurrentMonth": 100,
-        "rewardCurrency": "EUR",
-    }
+    data = GridRewardSnapshot.from_payload(
+        {
+            "state": {
+                "__typename": "GridRewardDelivering",
+                "reasons": ["reason1", "reason2"],
+                "reason": "delivering",
+            },
+            "rewardCurrentMonth": 100,
+            "rewardCurrency": "EUR",
+        }
+    )
     sensor.update_data(data)
 
     state = sensor._get_state(data)
@@ -76,7 +89,7 @@ async def test_grid_reward_current_day_sensor(mock_api, entry_id):
     assert sensor.name == "Grid Reward Current Day"
     assert sensor.unique_id == f"{entry_id}_grid_reward_current_day"
 
-    data = {"rewardCurrency": "EUR"}
+    data = GridRewardSnapshot(currency="EUR")
     sensor.update_data(data)
     state = sensor._get_state(data)
     assert state == 10.5
@@ -86,7 +99,11 @@ async def test_grid_reward_current_day_sensor(mock_api, entry_id):
 
 @pytest.mark.parametrize(
     "description",
-    [d for d in GRID_REWARD_SENSORS if d.key in ("last_reward_session", "current_reward_session")],
+    [
+        d
+        for d in GRID_REWARD_SENSORS
+        if d.key in ("last_reward_session", "current_reward_session", "reward_rate")
+    ],
 )
 async def test_reward_session_sensor(mock_api, entry_id, description):
     """Test the RewardSessionSensor."""
@@ -98,13 +115,14 @@ async def test_reward_session_sensor(mock_api, entry_id, description):
         "reward": 1.23,
     }
     mock_session_tracker.current_session_reward = 0.5
+    mock_session_tracker.reward_rate = 1.2
     sensor = RewardSessionSensor(mock_api, entry_id, mock_session_tracker, description)
     sensor.async_write_ha_state = MagicMock()
 
     assert sensor.name == description.name
     assert sensor.unique_id == f"{entry_id}_{description.key}"
 
-    data = {"rewardCurrency": "EUR"}
+    data = GridRewardSnapshot(currency="EUR")
     sensor.update_data(data)
     state = sensor._get_state(data)
 
@@ -114,7 +132,36 @@ async def test_reward_session_sensor(mock_api, entry_id, description):
     elif description.key == "current_reward_session":
         assert state == 0.5
         assert sensor.native_unit_of_measurement == "EUR"
+    elif description.key == "reward_rate":
+        assert state == 1.2
+        assert sensor.native_unit_of_measurement == "EUR/h"
+
+    sensor.async_write_ha_state.assert_called_once()
+
+
+@pytest.mark.parametrize(("period", "description"), SESSION_ROLLUP_SENSORS.items())
+async def test_session_rollup_sensor(mock_api, entry_id, period, description):
+    """Test the SessionRollupSensor."""
+    mock_session_tracker = MagicMock()
+    mock_session_tracker.rollups.current.return_value = {
+        "count": 2,
+        "total_reward": 3.5,
+        "total_duration_minutes": 90.0,
+        "best_session": {"reward": 2.5},
+    }
+    sensor = SessionRollupSensor(
+        mock_api, entry_id, mock_session_tracker, period, description
+    )
+    sensor.async_write_ha_state = MagicMock()
+
+    assert sensor.unique_id == f"{entry_id}_{description.key}"
 
+    sensor.update_data(GridRewardSnapshot(currency="EUR"))
+
+    mock_session_tracker.rollups.current.assert_called_with(period)
+    assert sensor.native_value == 3.5
+    assert sensor.native_unit_of_measurement == "EUR"
+    assert sensor.extra_state_attributes["count"] == 2
     sensor.async_write_ha_state.assert_called_once()
 
 
@@ -128,18 +175,9 @@ async def test_flex_device_sensor(mock_api, entry_id, description):
     assert sensor.name == f"My Car {description.name}"
     assert sensor.unique_id == f"vehicle1_{description.key}"
 
-    data = {
-        "flexDevices": [
-            {
-                "vehicleId": "vehicle1",
-                "state": {"__typename": "PluggedIn"},
-                "isPluggedIn": True,
-            }
-        ]
-    }
-    sensor.update_data(data)
+    device_data = FlexDevice("vehicle1", "vehicle", "PluggedIn", True)
+    sensor.update_data(device_data)
 
-    device_data = data["flexDevices"][0]
     state = sensor._get_state(device_data)
 
     if description.key == "state":
@@ -151,6 +189,78 @@ async def test_flex_device_sensor(mock_api, entry_id, description):
     sensor.async_write_ha_state.assert_called_once()
 
 
+async def test_identical_frames_are_not_written(mock_api, entry_id):
+    """Test that replaying identical frames writes each state only once."""
+    device = {"id": "vehicle1", "type": "vehicle", "name": "My Car"}
+    sensors = [
+        GridRewardSensor(mock_api, entry_id, description)
+        for description in GRID_REWARD_SENSORS
+    ]
+    flex_sensors = [
+        FlexDeviceSensor(mock_api, entry_id, device, description)
+        for description in FLEX_DEVICE_SENSORS
+    ]
+    for sensor in sensors + flex_sensors:
+        sensor.async_write_ha_state = MagicMock()
+
+    def frame():
+        return {
+            "state": {"__typename": "GridRewardDelivering", "reasons": ["reason1"]},
+            "rewardCurrentMonth": 100,
+            "rewardCurrency": "EUR",
+            "flexDevices": [
+                {
+                    "vehicleId": "vehicle1",
+                    "state": {"__typename": "PluggedIn"},
+                    "isPluggedIn": True,
+                }
+            ],
+        }
+
+    def replay():
+        snapshot = GridRewardSnapshot.from_payload(frame())
+        for sensor in sensors:
+            sensor.update_data(snapshot)
+        for sensor in flex_sensors:
+            sensor.update_data(snapshot.flex_devices[0])
+
+    replay()
+    for sensor in sensors + flex_sensors:
+        sensor.async_write_ha_state.reset_mock()
+
+    for _ in range(10):
+        replay()
+
+    for sensor in sensors + flex_sensors:
+        sensor.async_write_ha_state.assert_not_called()
+        assert sensor.skipped_writes == 10
+
+    changed = frame()
+    changed["rewardCurrentMonth"] = 101
+    sensors[2].update_data(GridRewardSnapshot.from_payload(changed))
+    sensors[2].async_write_ha_state.assert_called_once()
+
+
+async def test_grid_reward_sensor_restores_last_state(mock_api, entry_id):
+    """Test that a sensor shows its last state until the first frame."""
+    description = next(d for d in GRID_REWARD_SENSORS if d.key == "grid_reward_current_month")
+    sensor = GridRewardSensor(mock_api, entry_id, description)
+    sensor.async_write_ha_state = MagicMock()
+    sensor.async_get_last_sensor_data = AsyncMock(
+        return_value=SensorExtraStoredData(12.5, "EUR")
+    )
+
+    with patch.object(SensorEntity, "async_added_to_hass", AsyncMock()):
+        await sensor.async_added_to_hass()
+
+    assert sensor.native_value == 12.5
+    assert sensor.native_unit_of_measurement == "EUR"
+
+    sensor.update_data(GridRewardSnapshot(reward_current_month=13.0, currency="EUR"))
+    assert sensor.native_value == 13.0
+    sensor.async_write_ha_state.assert_called_once()
+
+
 @pytest.fixture
 def mock_hass():
     """Mock HomeAssistant instance."""
@@ -159,6 +269,52 @@ def mock_hass():
     return hass
 
 
+@pytest.mark.parametrize(("period", "description"), STATE_TIME_SENSORS.items())
+async def test_state_time_sensor(mock_api, entry_id, period, description):
+    """Test the StateTimeSensor."""
+    mock_state_tracker = MagicMock()
+    mock_state_tracker.summary.return_value = {
+        "hours": {"GridRewardDelivering": 1.5, "GridRewardAvailable": 3.0},
+        "transitions": {"GridRewardDelivering": 2},
+    }
+    sensor = StateTimeSensor(mock_api, entry_id, mock_state_tracker, period, description)
+    sensor.async_write_ha_state = MagicMock()
+
+    sensor.update_data(GridRewardSnapshot())
+
+    mock_state_tracker.summary.assert_called_with("grid_reward", period)
+    assert sensor.native_value == 1.5
+    assert sensor.extra_state_attributes["transitions"] == {"GridRewardDelivering": 2}
+    sensor.async_write_ha_state.assert_called_once()
+
+
+async def test_state_time_sensor_is_refreshed_on_transitions(mock_api, entry_id, freezer):
+    """Test that frames without a transition do not write the time in state."""
+    freezer.move_to("2024-01-31 10:00:00+00:00")
+    ledger = MagicMock()
+    ledger.data = {}
+    state_tracker = StateTimeTracker(ledger)
+    sensor = StateTimeSensor(
+        mock_api, entry_id, state_tracker, "day", STATE_TIME_SENSORS["day"]
+    )
+    sensor.async_write_ha_state = MagicMock()
+    state_tracker.update("grid_reward", "GridRewardDelivering")
+    sensor.update_data(GridRewardSnapshot())
+    sensor.async_write_ha_state.reset_mock()
+
+    # A minute of frames in the same state.
+    for _ in range(30):
+        freezer.tick(timedelta(seconds=2))
+        state_tracker.update("grid_reward", "GridRewardDelivering")
+        sensor.update_data(GridRewardSnapshot())
+    sensor.async_write_ha_state.assert_not_called()
+
+    state_tracker.update("grid_reward", "GridRewardAvailable")
+    sensor.update_data(GridRewardSnapshot())
+    sensor.async_write_ha_state.assert_called_once()
+    assert sensor.native_value == round(60 / 3600, 3)
+
+
 @pytest.fixture
 def mock_config_entry():
     """Mock ConfigEntry instance."""
@@ -184,8 +340,14 @@ async def test_price_sensor_isolation(
         "public_api": mock_public_api,
         "flex_devices": [],
         "grid_reward_devices": [],
+        "flex_device_entities": {},
+        "price_devices": [],
+        "plan_devices": [],
         "daily_tracker": MagicMock(),
         "session_tracker": MagicMock(),
+        "state_tracker": MagicMock(),
+        "histogram": MagicMock(),
+        "planner": MagicMock(),
     }
 
     async_add_entities = MagicMock()
@@ -204,3 +366,41 @@ async def test_price_sensor_isolation(
     assert any(
         isinstance(entity, PriceSensor) for entity in added_entities
     ), "PriceSensor should be added to entities"
+    # Only the price sensor polls, the other sensors are pushed by the frames.
+    assert [entity for entity in added_entities if entity.should_poll] == [
+        entity for entity in added_entities if isinstance(entity, PriceSensor)
+    ]
+
+
+@patch("custom_components.tibber_grid_reward.sensor.TibberPublicAPI")
+async def test_flex_device_sensors_are_indexed_by_device(
+    mock_public_api, mock_hass, mock_config_entry
+):
+    """Test that flex device sensors are registered under their device id."""
+    device = {"id": "vehicle1", "type": "vehicle", "name": "My Car"}
+    mock_config_entry.data["flex_devices"] = [device]
+    mock_hass.data[DOMAIN][mock_config_entry.entry_id] = {
+        "api": MagicMock(),
+        "public_api": mock_public_api,
+        "flex_devices": [device],
+        "grid_reward_devices": [],
+        "flex_device_entities": {"vehicle1": []},
+        "price_devices": [],
+        "plan_devices": [],
+        "daily_tracker": MagicMock(),
+        "session_tracker": MagicMock(),
+        "state_tracker": MagicMock(),
+        "histogram": MagicMock(),
+        "planner": MagicMock(),
+    }
+
+    await async_setup_entry(mock_hass, mock_config_entry, MagicMock())
+
+    entry_data = mock_hass.data[DOMAIN][mock_config_entry.entry_id]
+    device_entities = entry_data["flex_device_entities"]["vehicle1"]
+    assert len(device_entities) == len(FLEX_DEVICE_SENSORS) + 1
+    assert all(entity._device_id == "vehicle1" for entity in device_entities)
+    assert not any(
+        isinstance(entity, FlexDeviceSensor)
+        for entity in entry_data["grid_reward_devices"]
+    )
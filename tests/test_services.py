@@ -0,0 +1,142 @@
+"""Tests for the services of Tibber Grid Reward."""
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.tibber_grid_reward.const import DOMAIN
+from custom_components.tibber_grid_reward.services import async_setup_services
+
+
+def _entry_data(home_id):
+    """Build the data of a loaded entry with mocked trackers and APIs."""
+    session_tracker = MagicMock()
+    session_tracker.rollups.data = {"day": {"2024-01-01": {"home": home_id}}}
+    return {
+        "api": MagicMock(set_departure_time=AsyncMock()),
+        "public_api": None,
+        "home_id": home_id,
+        "session_tracker": session_tracker,
+        "window_finder": MagicMock(),
+        "planner": MagicMock(),
+        "histogram": MagicMock(profile=MagicMock(return_value=[{"home": home_id}])),
+        "profiler": MagicMock(
+            async_profile=AsyncMock(return_value={"path": None, "home": home_id})
+        ),
+    }
+
+
+@pytest.fixture
+def entries(hass: HomeAssistant):
+    """Fixture for two loaded entries, each with one vehicle device."""
+    async_setup_services(hass)
+    entries = {}
+    for home_id in ("home1", "home2"):
+        entry = MockConfigEntry(domain=DOMAIN, data={"home_id": home_id})
+        entry.add_to_hass(hass)
+        dr.async_get(hass).async_get_or_create(
+            config_entry_id=entry.entry_id,
+            identifiers={(DOMAIN, f"vehicle-{home_id}")},
+        )
+        hass.data.setdefault(DOMAIN, {})[entry.entry_id] = _entry_data(home_id)
+        entries[home_id] = entry
+    return entries
+
+
+async def _get_rollups(hass: HomeAssistant, **data):
+    """Call the session rollups service."""
+    return await hass.services.async_call(
+        DOMAIN,
+        "get_session_rollups",
+        {"period": "day", **data},
+        blocking=True,
+        return_response=True,
+    )
+
+
+async def test_services_resolve_the_entry(hass: HomeAssistant, entries):
+    """Test that the services act on the entry selected with entry_id."""
+    response = await _get_rollups(hass, entry_id=entries["home2"].entry_id)
+    assert response["rollups"]["2024-01-01"]["home"] == "home2"
+
+    with pytest.raises(HomeAssistantError):
+        await _get_rollups(hass)
+    with pytest.raises(HomeAssistantError):
+        await _get_rollups(hass, entry_id="unknown")
+
+    # The entry may be left out when only one entry is loaded.
+    hass.data[DOMAIN].pop(entries["home2"].entry_id)
+    response = await _get_rollups(hass)
+    assert response["rollups"]["2024-01-01"]["home"] == "home1"
+
+
+async def test_availability_profile_uses_the_entry(hass: HomeAssistant, entries):
+    """Test that the availability profile is the one of the selected entry."""
+    response = await hass.services.async_call(
+        DOMAIN,
+        "get_availability_profile",
+        {"entry_id": entries["home1"].entry_id},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["profile"] == [{"home": "home1"}]
+
+
+async def test_profile_uses_the_entry(hass: HomeAssistant, entries):
+    """Test that the profile service profiles the frames of the selected entry."""
+    response = await hass.services.async_call(
+        DOMAIN,
+        "profile",
+        {"entry_id": entries["home2"].entry_id, "duration": 5},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["home"] == "home2"
+    entry_data = hass.data[DOMAIN][entries["home2"].entry_id]
+    entry_data["profiler"].async_profile.assert_awaited_once_with(5.0)
+
+
+async def test_device_services_use_the_device_entry(hass: HomeAssistant, entries):
+    """Test that the device services act on the entry of the device."""
+    device = dr.async_get(hass).async_get_device({(DOMAIN, "vehicle-home2")})
+
+    await hass.services.async_call(
+        DOMAIN,
+        "set_departure_time",
+        {"device_id": device.id, "day": "monday", "time": "07:30"},
+        blocking=True,
+    )
+
+    entry_data = hass.data[DOMAIN]
+    entry_data[entries["home1"].entry_id]["api"].set_departure_time.assert_not_awaited()
+    entry_data[entries["home2"].entry_id]["api"].set_departure_time.assert_awaited_once_with(
+        home_id="home2", vehicle_id="vehicle-home2", day="monday", time_str="07:30"
+    )
+
+
+async def test_plan_charging_unknown_device(hass: HomeAssistant, entries):
+    """Test that planning for a device that is not a vehicle raises."""
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN,
+            "plan_charging",
+            {"device_id": "unknown"},
+            blocking=True,
+            return_response=True,
+        )
+
+
+async def test_price_services_need_an_api_key(hass: HomeAssistant, entries):
+    """Test that the price services raise without a public API key."""
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN,
+            "find_cheapest_window",
+            {"duration": "01:00:00", "entry_id": entries["home1"].entry_id},
+            blocking=True,
+            return_response=True,
+        )
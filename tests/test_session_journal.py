@@ -0,0 +1,90 @@
+"""Tests for the SessionJournal."""
+import asyncio
+import os
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.tibber_grid_reward.session_journal import SessionJournal
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def _session(day):
+    """Build a completed session ending on the given day offset."""
+    end_time = START + timedelta(days=day)
+    return {
+        "start_time": (end_time - timedelta(hours=1)).isoformat(),
+        "end_time": end_time.isoformat(),
+        "duration_minutes": 60.0,
+        "reward": 1.0,
+    }
+
+
+def _read_file(path):
+    """Read a file, in the executor as it blocks."""
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+def _append_to_file(path, text):
+    """Append text to a file, in the executor as it blocks."""
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(text)
+
+
+async def _in_executor(func, *args):
+    """Run a blocking function in the executor."""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    """Fixture for a journal in a temporary config directory."""
+    hass = MagicMock()
+    hass.config.path.side_effect = lambda *parts: os.path.join(tmp_path, *parts)
+    hass.async_add_executor_job.side_effect = (
+        lambda func, *args: asyncio.get_running_loop().run_in_executor(None, func, *args)
+    )
+    return SessionJournal(hass, "test_sessions")
+
+
+async def test_append_and_read(journal):
+    """Test appending sessions and reading them back."""
+    assert await journal.async_read() == []
+
+    await journal.async_append(_session(0))
+    await journal.async_append_many([_session(1), _session(2)])
+
+    assert await journal.async_read() == [_session(0), _session(1), _session(2)]
+
+
+async def test_append_does_not_rewrite(journal):
+    """Test that appending leaves the existing journal content untouched."""
+    await journal.async_append(_session(0))
+    first = await _in_executor(_read_file, journal.path)
+
+    await journal.async_append(_session(1))
+    assert (await _in_executor(_read_file, journal.path)).startswith(first)
+
+
+async def test_read_skips_damaged_lines(journal):
+    """Test that a torn write does not lose the other sessions."""
+    await journal.async_append(_session(0))
+    await _in_executor(_append_to_file, journal.path, '{"start_time": "2024\n')
+    await journal.async_append(_session(1))
+
+    assert await journal.async_read() == [_session(0), _session(1)]
+
+
+async def test_compact(journal):
+    """Test that compaction drops sessions before the horizon."""
+    await journal.async_append_many([_session(day) for day in range(10)])
+
+    kept = await journal.async_compact(START + timedelta(days=7))
+
+    assert kept == 3
+    assert await journal.async_read() == [_session(7), _session(8), _session(9)]
+    assert not os.path.exists(f"{journal.path}.tmp")
+
@@ -0,0 +1,78 @@
+"""Tests for the SessionRollups."""
+from datetime import UTC, date, datetime
+
+from custom_components.tibber_grid_reward.session_rollups import (
+    SessionRollups,
+    period_key,
+)
+
+
+def _session(end_time, reward, duration_minutes=60.0):
+    """Build a completed session."""
+    return {
+        "start_time": end_time,
+        "end_time": end_time,
+        "duration_minutes": duration_minutes,
+        "reward": reward,
+    }
+
+
+def test_period_key():
+    """Test the bucket keys of each period."""
+    day = date(2024, 12, 30)
+    assert period_key("day", day) == "2024-12-30"
+    assert period_key("week", day) == "2025-W01"
+    assert period_key("month", day) == "2024-12"
+    assert period_key("year", day) == "2024"
+
+
+def test_add_sessions():
+    """Test that sessions are aggregated per period."""
+    rollups = SessionRollups()
+    rollups.add(_session("2024-01-01T10:00:00+00:00", 1.0))
+    rollups.add(_session("2024-01-01T18:00:00+00:00", 2.5, 30.0))
+    rollups.add(_session("2024-01-15T10:00:00+00:00", 0.5))
+
+    day = rollups.get("day", date(2024, 1, 1))
+    assert day["count"] == 2
+    assert day["total_reward"] == 3.5
+    assert day["total_duration_minutes"] == 90.0
+    assert day["best_session"]["reward"] == 2.5
+
+    month = rollups.get("month", date(2024, 1, 31))
+    assert month["count"] == 3
+    assert month["total_reward"] == 4.0
+    assert rollups.get("week", date(2024, 1, 7))["count"] == 2
+    assert rollups.get("year", date(2024, 6, 1))["count"] == 3
+    assert rollups.get("day", date(2024, 1, 2)) is None
+
+
+def test_current():
+    """Test returning the bucket of the current period."""
+    rollups = SessionRollups()
+    rollups.add(_session("2024-03-05T10:00:00+00:00", 1.0))
+    now = datetime(2024, 3, 20, 12, tzinfo=UTC)
+    assert rollups.current("day", now) is None
+    assert rollups.current("month", now)["total_reward"] == 1.0
+
+
+def test_rollups_share_persisted_data():
+    """Test that the rollups update the dict they were created from."""
+    data = {}
+    rollups = SessionRollups(data)
+    rollups.add(_session("2024-03-05T10:00:00+00:00", 1.0))
+    assert data["year"]["2024"]["count"] == 1
+
+
+def test_prune():
+    """Test that day and week buckets before the horizon are dropped."""
+    rollups = SessionRollups()
+    rollups.add(_session("2023-01-01T10:00:00+00:00", 1.0))
+    rollups.add(_session("2024-01-10T10:00:00+00:00", 1.0))
+
+    rollups.prune(datetime(2024, 1, 1, tzinfo=UTC))
+
+    assert list(rollups.data["day"]) == ["2024-01-10"]
+    assert list(rollups.data["week"]) == ["2024-W02"]
+    assert list(rollups.data["month"]) == ["2023-01", "2024-01"]
+    assert list(rollups.data["year"]) == ["2023", "2024"]
@@ -0,0 +1,113 @@
+"""Tests for the RewardSessionTracker."""
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.tibber_grid_reward.reward_ledger import RewardLedger
+from custom_components.tibber_grid_reward.session_tracker import RewardSessionTracker
+
+SESSIONS = [
+    {
+        "start_time": "2024-01-01T12:00:00+00:00",
+        "end_time": "2024-01-01T13:00:00+00:00",
+        "duration_minutes": 60.0,
+        "reward": 1.5,
+    },
+    {
+        "start_time": "2024-01-02T12:00:00+00:00",
+        "end_time": "2024-01-02T12:30:00+00:00",
+        "duration_minutes": 30.0,
+        "reward": 0.5,
+    },
+]
+
+
+@pytest.fixture
+def mock_hass():
+    """Fixture for a mock Home Assistant instance."""
+    hass = MagicMock()
+    hass.async_create_task.side_effect = lambda coro: asyncio.create_task(coro)
+    return hass
+
+
+@pytest.fixture
+def mock_ledger():
+    """Fixture for a mock reward ledger."""
+    ledger = MagicMock()
+    ledger.cumulative = 0.0
+    ledger.sessions = {"active_session": None, "last_session": None, "rollups": {}}
+    ledger.async_save = AsyncMock()
+    return ledger
+
+
+@pytest.fixture
+@patch("custom_components.tibber_grid_reward.session_tracker.SessionJournal")
+def tracker(MockJournal, mock_hass, mock_ledger):
+    """Fixture for a RewardSessionTracker instance."""
+
+    mock_journal = MockJournal.return_value
+    mock_journal.async_append = AsyncMock()
+    mock_journal.async_append_many = AsyncMock()
+    mock_journal.async_read = AsyncMock(return_value=SESSIONS)
+
+    return RewardSessionTracker(mock_hass, "entry_id", mock_ledger)
+
+
+async def test_load_keeps_journal_lazy(tracker):
+    """Test that loading does not read the session journal."""
+    tracker._ledger.sessions = {
+        "active_session": None,
+        "last_session": SESSIONS[-1],
+        "rollups": {},
+    }
+
+    await tracker.async_load()
+
+    tracker._journal.async_read.assert_not_awaited()
+    tracker._ledger.async_save.assert_not_awaited()
+    assert tracker.last_session == SESSIONS[-1]
+    assert await tracker.async_get_sessions() == SESSIONS
+
+
+async def test_session_is_appended_to_journal(tracker):
+    """Test that completing a session appends it to the journal."""
+    tracker._ledger.cumulative = 1.0
+    tracker.update_state("GridRewardDelivering")
+    await asyncio.sleep(0)
+    assert tracker.current_session_reward == 0.0
+
+    tracker._ledger.cumulative = 1.75
+    tracker.update_state("GridRewardDelivering")
+    assert tracker.current_session_reward == 0.75
+
+    tracker._ledger.cumulative = 2.0
+    tracker.update_state("GridRewardAvailable")
+    await asyncio.sleep(0)
+
+    session = tracker._journal.async_append.await_args[0][0]
+    assert session["reward"] == 1.0
+    assert session["trace"][0] == [0.0, 0.0]
+    assert session["trace"][-1][1] == 1.0
+    assert tracker.last_session == session
+    assert tracker.current_session_reward == 0.0
+    tracker._ledger.schedule_save.assert_called()
+    assert tracker.rollups.current("day")["total_reward"] == 1.0
+
+
+@patch("custom_components.tibber_grid_reward.reward_ledger.Store")
+async def test_session_across_month_rollover(MockStore, tracker, mock_hass):
+    """Test that a session spanning a new month keeps its reward."""
+    ledger = RewardLedger(mock_hass, "entry_id")
+    tracker._ledger = ledger
+    tracker._data = ledger.sessions
+    end_of_month = datetime(2024, 1, 31, 23, 50)
+
+    ledger.update_monthly_reward(100.0, end_of_month)
+    tracker.update_state("GridRewardDelivering")
+    ledger.update_monthly_reward(100.4, end_of_month)
+    ledger.update_monthly_reward(0.3, end_of_month + timedelta(minutes=20))
+    session = tracker.update_state("GridRewardAvailable")
+
+    assert session["reward"] == 0.7
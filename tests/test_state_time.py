@@ -0,0 +1,102 @@
+"""Tests for the StateTimeTracker."""
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.tibber_grid_reward.state_time import StateTimeTracker
+
+START = datetime(2024, 1, 31, 22, 0, tzinfo=UTC)
+
+
+@pytest.fixture(autouse=True)
+def utc_time_zone(hass):
+    """Run the tests in UTC, where START is two hours before midnight."""
+    dt_util.set_default_time_zone(dt_util.UTC)
+
+
+@pytest.fixture
+def tracker():
+    """Fixture for a StateTimeTracker over a mock ledger."""
+    ledger = MagicMock()
+    ledger.data = {}
+    return StateTimeTracker(ledger)
+
+
+def test_time_in_state(tracker):
+    """Test that time is accumulated in the state it was spent in."""
+    assert tracker.update("grid_reward", "GridRewardAvailable", START)
+    assert tracker.update("grid_reward", "GridRewardDelivering", START + timedelta(minutes=30))
+
+    summary = tracker.summary("grid_reward", "day", START + timedelta(minutes=75))
+
+    assert summary["hours"] == {"GridRewardAvailable": 0.5, "GridRewardDelivering": 0.75}
+    assert summary["transitions"] == {"GridRewardDelivering": 1}
+
+
+def test_unchanged_state_is_not_saved(tracker):
+    """Test that frames without a transition do not touch the record."""
+    tracker.update("grid_reward", "GridRewardAvailable", START)
+    tracker._ledger.schedule_save.reset_mock()
+
+    for minute in range(60):
+        assert not tracker.update(
+            "grid_reward", "GridRewardAvailable", START + timedelta(minutes=minute)
+        )
+
+    tracker._ledger.schedule_save.assert_not_called()
+
+
+def test_time_is_split_at_midnight(tracker):
+    """Test that a new day and month start their counters at midnight."""
+    tracker.update("vehicle1", "Charging", START)
+    tracker.update("vehicle1", "Idle", START + timedelta(hours=3))
+
+    day = tracker.summary("vehicle1", "day", START + timedelta(hours=4))
+    month = tracker.summary("vehicle1", "month", START + timedelta(hours=4))
+
+    assert day["hours"] == {"Charging": 1.0, "Idle": 1.0}
+    assert day["transitions"] == {"Idle": 1}
+    assert month == day
+
+
+def test_unknown_subject(tracker):
+    """Test the summary of a subject that was never seen."""
+    assert tracker.summary("battery1", "day") == {"hours": {}, "transitions": {}}
+    assert tracker.state("battery1") is None
+
+
+def test_summary_does_not_change_the_record(tracker):
+    """Test that reading a summary leaves the record and the ledger alone."""
+    tracker.update("grid_reward", "GridRewardAvailable", START)
+    tracker._ledger.schedule_save.reset_mock()
+    record = tracker._ledger.data["state_time"]["grid_reward"]
+    before = {**record, "day_seconds": dict(record["day_seconds"])}
+
+    first = tracker.summary("grid_reward", "day", START + timedelta(minutes=30))
+    second = tracker.summary("grid_reward", "day", START + timedelta(minutes=60))
+
+    assert first["hours"] == {"GridRewardAvailable": 0.5}
+    assert second["hours"] == {"GridRewardAvailable": 1.0}
+    assert record == before
+    tracker._ledger.schedule_save.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("downtime", "hours"), [(timedelta(minutes=30), 2.0), (timedelta(hours=8), 1.5)]
+)
+def test_downtime_is_not_counted(tracker, downtime, hours):
+    """Test that a long gap after a restart is not added to the stored state."""
+    morning = START.replace(hour=8)
+    tracker.update("vehicle1", "Charging", morning)
+    tracker.advance(morning + timedelta(minutes=30))
+
+    # A new tracker over the same ledger, as after a restart.
+    restarted = StateTimeTracker(tracker._ledger)
+    start = morning + timedelta(minutes=30) + downtime
+    assert not restarted.update("vehicle1", "Charging", start)
+
+    summary = restarted.summary("vehicle1", "day", start + timedelta(hours=1))
+
+    assert summary["hours"] == {"Charging": hours}
@@ -0,0 +1,52 @@
+"""Tests for the per-entry storage helpers."""
+from unittest.mock import AsyncMock, MagicMock
+
+from custom_components.tibber_grid_reward.storage import (
+    async_load_entry_store,
+    entry_storage_key,
+)
+
+
+def _store(data):
+    """Build a mock store holding some data."""
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value=data)
+    store.async_save = AsyncMock()
+    store.async_remove = AsyncMock()
+    return store
+
+
+def test_entry_storage_key():
+    """Test that each entry gets its own storage key."""
+    assert entry_storage_key("tibber_grid_reward_daily_tracker", "abc") == (
+        "tibber_grid_reward_daily_tracker.abc"
+    )
+
+
+async def test_load_entry_store():
+    """Test that an existing shard is used without touching the legacy store."""
+    store = _store({"daily_reward": 1.0})
+    legacy_store = _store({"daily_reward": 2.0})
+
+    assert await async_load_entry_store({}, store, legacy_store) == {"daily_reward": 1.0}
+    legacy_store.async_load.assert_not_awaited()
+
+
+async def test_load_entry_store_migrates_legacy():
+    """Test that the legacy store is moved to the first shard that loads."""
+    hass_data = {}
+    hass = MagicMock(data=hass_data)
+    store = _store(None)
+    legacy_store = _store({"daily_reward": 2.0})
+
+    assert await async_load_entry_store(hass, store, legacy_store) == {
+        "daily_reward": 2.0
+    }
+    store.async_save.assert_awaited_once_with({"daily_reward": 2.0})
+    legacy_store.async_remove.assert_awaited_once()
+
+    # A second entry finds no legacy data once it has been claimed.
+    legacy_store.async_load.return_value = None
+    other_store = _store(None)
+    assert await async_load_entry_store(hass, other_store, legacy_store) is None
+    other_store.async_save.assert_not_awaited()
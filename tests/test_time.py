@@ -1,7 +1,11 @@
-from unittest.mock import MagicMock, AsyncMock
+from unittest.mock import MagicMock, AsyncMock, patch
 import datetime
 import pytest
 
+from homeassistant.core import State
+from homeassistant.helpers.restore_state import RestoreEntity
+
+from custom_components.tibber_grid_reward.charging_planner import ChargingPlanner
 from custom_components.tibber_grid_reward.time import DepartureTimeEntity
 from custom_components.tibber_grid_reward.const import DOMAIN
 
@@ -16,8 +20,18 @@ def device():
     return {"id": "vehicle1", "type": "vehicle", "name": "My Car"}
 
 @pytest.fixture
-def sensor(mock_api, device):
-    sensor = DepartureTimeEntity(mock_api, "test_entry_id", device, 0)
+def planner():
+    return ChargingPlanner(energy_kwh=30.0, power_kw=11.0)
+
+@pytest.fixture
+def plan_sensor():
+    return MagicMock()
+
+@pytest.fixture
+def sensor(mock_api, device, planner, plan_sensor):
+    sensor = DepartureTimeEntity(mock_api, "test_entry_id", device, 0, planner)
+    sensor.hass = MagicMock()
+    sensor.hass.data = {DOMAIN: {"test_entry_id": {"plan_devices": [plan_sensor]}}}
     sensor.async_write_ha_state = MagicMock()
     return sensor
 
@@ -32,19 +46,21 @@ def test_device_info(sensor):
     }
 
 def test_update_data(sensor):
-    sensor.update_data(
-        {
-            "userSettings": [
-                {
-                    "key": "online.vehicle.smartCharging.departureTimes.monday",
-                    "value": "08:00",
-                }
-            ]
-        }
-    )
+    sensor.update_data(datetime.time(8, 0))
     assert sensor.native_value == datetime.time(8, 0)
     sensor.async_write_ha_state.assert_called_once()
 
+    sensor.update_data(None)
+    assert sensor.native_value is None
+    assert sensor.async_write_ha_state.call_count == 2
+
+def test_identical_frames_are_not_written(sensor):
+    for _ in range(10):
+        sensor.update_data(datetime.time(8, 0))
+
+    sensor.async_write_ha_state.assert_called_once()
+    assert sensor.skipped_writes == 9
+
 async def test_async_set_value(sensor, mock_api):
     await sensor.async_set_value(datetime.time(9, 30))
     mock_api.set_departure_time.assert_called_once_with(
@@ -54,4 +70,32 @@ async def test_async_set_value(sensor, mock_api):
         time_str="09:30",
     )
     assert sensor.native_value == datetime.time(9, 30)
-    sensor.async_write_ha_state.assert_called_once()
\ No newline at end of file
+    sensor.async_write_ha_state.assert_called_once()
+async def test_async_set_value_updates_the_planner(sensor, planner, plan_sensor):
+    await sensor.async_set_value(datetime.time(9, 30))
+    plan_sensor.update_data.assert_called_once()
+
+    # The frame that confirms the new time is no change.
+    settings = {"online.vehicle.smartCharging.departureTimes.monday": "09:30"}
+    assert planner.update_vehicle_settings("vehicle1", settings) == {}
+
+    # A frame that still has the previous time reverts it.
+    settings = {"online.vehicle.smartCharging.departureTimes.monday": None}
+    assert planner.update_vehicle_settings("vehicle1", settings) == {"monday": None}
+
+async def test_async_set_value_midnight_clears(sensor, mock_api, planner):
+    await sensor.async_set_value(datetime.time(0, 0))
+    assert mock_api.set_departure_time.call_args.kwargs["time_str"] is None
+    assert sensor.native_value is None
+
+@pytest.mark.parametrize(
+    ("last_state", "expected"),
+    [("07:45:00", datetime.time(7, 45)), ("unknown", None), ("bad", None)],
+)
+async def test_restore_state(sensor, last_state, expected):
+    sensor.async_get_last_state = AsyncMock(
+        return_value=State("time.my_car_departure_time_monday", last_state)
+    )
+    with patch.object(RestoreEntity, "async_added_to_hass", AsyncMock()):
+        await sensor.async_added_to_hass()
+    assert sensor.native_value == expected